@@ -51,6 +51,11 @@ import argparse
 
 host = 'slumbot.com'
 
+# Seconds to wait for the connection to be established and for the response, respectively.
+# None waits forever.
+connect_timeout = 5.0
+read_timeout = 30.0
+
 NUM_STREETS = 4
 SMALL_BLIND = 50
 BIG_BLIND = 100
@@ -217,62 +222,130 @@ def ParseAction(action):
     }
 
 
-def NewHand(token):
-    data = {}
-    if token:
-        data['token'] = token
-    # Use verify=false to avoid SSL Error
-    # If porting this code to another language, make sure that the Content-Type header is
-    # set to application/json.
-    response = requests.post(f'https://{host}/api/new_hand', headers={}, json=data)
-    success = getattr(response, 'status_code') == 200
-    if not success:
-        print('Status code: %s' % repr(response.status_code))
-        try:
-            print('Error response: %s' % repr(response.json()))
-        except ValueError:
-            pass
-        sys.exit(-1)
+class SlumbotAPIError(Exception):
+    """Base class for errors returned by the API client."""
 
-    try:
-        r = response.json()
-    except ValueError:
-        print('Could not get JSON from response')
-        sys.exit(-1)
+    def __init__(self, message, status_code=None, endpoint=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.endpoint = endpoint
 
-    if 'error_msg' in r:
-        print('Error: %s' % r['error_msg'])
-        sys.exit(-1)
-        
-    return r
 
+class TransportError(SlumbotAPIError):
+    """The request did not complete (connection failure, DNS, reset, ...)."""
 
-def Act(token, action):
-    data = {'token': token, 'incr': action}
-    # Use verify=false to avoid SSL Error
+
+class RequestTimeout(TransportError):
+    """
+    The request timed out.  sent is False for a connect timeout (the request never reached
+    the server, so it is safe to resend) and True for a read timeout (the server may or may
+    not have processed it).
+    """
+
+    def __init__(self, message, sent, endpoint=None):
+        super().__init__(message, endpoint=endpoint)
+        self.sent = sent
+
+
+class ServerError(SlumbotAPIError):
+    """The server answered with a 5xx, an unexpected status or an unparseable body."""
+
+
+class AuthError(SlumbotAPIError):
+    """Login failed or the token was rejected."""
+
+
+class IllegalActionError(SlumbotAPIError):
+    """The server rejected the incremental action sent to /api/act."""
+
+
+def SetTimeouts(connect=None, read=None):
+    """Sets the connect and read timeouts (in seconds) used for every request."""
+    global connect_timeout, read_timeout
+    connect_timeout = connect
+    read_timeout = read
+
+
+def ClassifyError(endpoint, status_code, error_msg):
+    """Picks the exception type for a failed response."""
+    msg = (error_msg or '').lower()
+    # Transient failures are server errors on every endpoint, login included, so that they
+    # are retried rather than treated as bad credentials
+    if status_code is not None and (status_code >= 500 or status_code in (408, 429)):
+        return ServerError
+    if status_code in (401, 403) or endpoint == 'login' or 'token' in msg:
+        return AuthError
+    if endpoint == 'act' and (error_msg or (status_code is not None and 400 <= status_code < 500)):
+        return IllegalActionError
+    return ServerError
+
+
+def HttpPost(endpoint, data):
+    """
+    POSTs to /api/<endpoint>.  Returns (status code, decoded JSON body or None).
+    Raises TransportError (or RequestTimeout) if no response was received.
+    """
     # If porting this code to another language, make sure that the Content-Type header is
     # set to application/json.
-    response = requests.post(f'https://{host}/api/act', headers={}, json=data)
-    success = getattr(response, 'status_code') == 200
-    if not success:
-        print('Status code: %s' % repr(response.status_code))
-        try:
-            print('Error response: %s' % repr(response.json()))
-        except ValueError:
-            pass
-        sys.exit(-1)
+    try:
+        response = requests.post(f'https://{host}/api/{endpoint}', headers={}, json=data,
+                                 timeout=(connect_timeout, read_timeout))
+    except requests.ConnectTimeout as e:
+        raise RequestTimeout('%s connect timed out: %s' % (endpoint, e), sent=False,
+                             endpoint=endpoint) from e
+    except requests.Timeout as e:
+        raise RequestTimeout('%s read timed out: %s' % (endpoint, e), sent=True,
+                             endpoint=endpoint) from e
+    except requests.RequestException as e:
+        raise TransportError('%s request failed: %s' % (endpoint, e), endpoint=endpoint) from e
 
     try:
         r = response.json()
     except ValueError:
-        print('Could not get JSON from response')
-        sys.exit(-1)
+        r = None
+    return response.status_code, r
 
-    if 'error_msg' in r:
-        print('Error: %s' % r['error_msg'])
-        sys.exit(-1)
-        
+
+# The function every request goes through; same signature as HttpPost.  Replace it with
+# SetTransport, e.g. to record or replay traffic.
+transport = HttpPost
+
+
+def SetTransport(post=None):
+    """Routes all requests through post(endpoint, data); None restores HttpPost."""
+    global transport
+    transport = post or HttpPost
+
+
+def _Post(endpoint, data):
+    """
+    Sends a request through the transport and returns the decoded JSON body.
+    Raises a SlumbotAPIError subclass on any failure.
+    """
+    status_code, r = transport(endpoint, data)
+
+    error_msg = r.get('error_msg') if isinstance(r, dict) else None
+    if status_code != 200 or error_msg:
+        error_class = ClassifyError(endpoint, status_code, error_msg)
+        raise error_class('%s failed (status %s): %s'
+                          % (endpoint, status_code, error_msg or repr(r)),
+                          status_code=status_code, endpoint=endpoint)
+    if not isinstance(r, dict):
+        raise ServerError('Could not get JSON from %s response' % endpoint,
+                          status_code=status_code, endpoint=endpoint)
     return r
+
+
+def NewHand(token):
+    data = {}
+    if token:
+        data['token'] = token
+    return _Post('new_hand', data)
+
+
+def Act(token, action):
+    data = {'token': token, 'incr': action}
+    return _Post('act', data)
     
 def PlayHand(token):
     r = NewHand(token)
@@ -314,32 +387,10 @@ def PlayHand(token):
         
 def Login(username, password):
     data = {"username": username, "password": password}
-    # If porting this code to another language, make sure that the Content-Type header is
-    # set to application/json.
-    response = requests.post(f'https://{host}/api/login', json=data)
-    success = getattr(response, 'status_code') == 200
-    if not success:
-        print('Status code: %s' % repr(response.status_code))
-        try:
-            print('Error response: %s' % repr(response.json()))
-        except ValueError:
-            pass
-        sys.exit(-1)
-
-    try:
-        r = response.json()
-    except ValueError:
-        print('Could not get JSON from response')
-        sys.exit(-1)
-
-    if 'error_msg' in r:
-        print('Error: %s' % r['error_msg'])
-        sys.exit(-1)
-        
+    r = _Post('login', data)
     token = r.get('token')
     if not token:
-        print('Did not get token in response to /api/login')
-        sys.exit(-1)
+        raise AuthError('Did not get token in response to /api/login', endpoint='login')
     return token
 
 
@@ -350,19 +401,23 @@ def main():
     args = parser.parse_args()
     username = args.username
     password = args.password
-    if username and password:
-        token = Login(username, password)
-    else:
-        token = None
-
-    # To avoid SSLError:
-    #   import urllib3
-    #   urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    num_hands = 100
-    winnings = 0
-    for h in range(num_hands):
-        (token, hand_winnings) = PlayHand(token)
-        winnings += hand_winnings
+    try:
+        if username and password:
+            token = Login(username, password)
+        else:
+            token = None
+
+        # To avoid SSLError:
+        #   import urllib3
+        #   urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        num_hands = 100
+        winnings = 0
+        for h in range(num_hands):
+            (token, hand_winnings) = PlayHand(token)
+            winnings += hand_winnings
+    except SlumbotAPIError as e:
+        print('Error: %s' % e)
+        sys.exit(-1)
     print('Total winnings: %i' % winnings)
 
     
@@ -0,0 +1,249 @@
+# src/analysis/batch_analysis.py
+
+import json
+import logging
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sample.slumbot_api import BIG_BLIND
+from session.hand_history import HAND_HISTORY_FILE, SESSION_INFO_FILE
+
+# ハンド履歴がない古いセッションで代わりに解析するログ（優先順）
+LOG_FILES = ('session.jsonl', 'session.log')
+CACHE_FILE = '.analysis_cache.json'
+# キャッシュ形式を変えたら上げる
+CACHE_VERSION = 2
+
+_STRATEGY_PATTERN = re.compile(r'Using strategy: (\w+)')
+_HAND_PATTERN = re.compile(r'Hand finished: .*, winnings (-?\d+)')
+# 1ハンドごとの結果を出さない初期のログでも、終了時のまとめは残っている
+_SUMMARY_HANDS_PATTERN = re.compile(r'Hands played: (\d+)/\d+')
+_SUMMARY_BALANCE_PATTERN = re.compile(r'Final balance: (-?[\d,]+) chips')
+
+
+def session_fingerprint(session_dir: Path) -> List[List]:
+    """Modification times and sizes of the files a session is parsed from"""
+    fingerprint = []
+    for name in (HAND_HISTORY_FILE, SESSION_INFO_FILE) + LOG_FILES:
+        path = session_dir / name
+        if path.exists():
+            stat = path.stat()
+            fingerprint.append([name, stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+def _parse_log(path: Path, result: Dict) -> None:
+    """
+    Falls back to the session log for sessions without a hand history
+
+    Per-hand results are only logged since 'Hand finished' lines were
+    added. Older logs (and any log written without --verbose) only carry
+    the end-of-session summary, which is kept in result['summary'] so the
+    session can be reported instead of silently contributing no hands.
+    """
+    is_json = path.suffix == '.jsonl'
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if is_json:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                message = entry.get('message', '')
+                hand = entry.get('hand')
+                if hand and 'winnings' in hand and message.startswith('Hand finished'):
+                    result['winnings'].append(hand['winnings'])
+                    continue
+            else:
+                message = line
+                match = _HAND_PATTERN.search(line)
+                if match:
+                    result['winnings'].append(int(match.group(1)))
+                    continue
+            match = _STRATEGY_PATTERN.search(message)
+            if match and result['strategy'] is None:
+                result['strategy'] = match.group(1)
+            match = _SUMMARY_HANDS_PATTERN.search(message)
+            if match:
+                result['summary']['hands'] = int(match.group(1))
+            match = _SUMMARY_BALANCE_PATTERN.search(message)
+            if match:
+                result['summary']['total'] = int(match.group(1).replace(',', ''))
+
+
+def parse_session(session_dir: str) -> Dict:
+    """
+    Parses one session directory
+
+    Returns {'name', 'strategy', 'started', 'winnings', 'summary'} where
+    winnings is the list of per-hand results in chips and summary holds the
+    hand count and total from a log's session summary, if any. Runs in a
+    worker process.
+    """
+    path = Path(session_dir)
+    result = {'name': path.name, 'strategy': None, 'started': None, 'winnings': [],
+              'summary': {}}
+
+    info_path = path / SESSION_INFO_FILE
+    if info_path.exists():
+        with open(info_path, encoding='utf-8') as f:
+            info = json.load(f)
+        result['strategy'] = info.get('strategy')
+        result['started'] = info.get('started')
+
+    hands_path = path / HAND_HISTORY_FILE
+    if hands_path.exists():
+        with open(hands_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 書き込み途中の行
+                result['winnings'].append(record['winnings'])
+                if result['strategy'] is None:
+                    result['strategy'] = record.get('strategy')
+    else:
+        for name in LOG_FILES:
+            if (path / name).exists():
+                _parse_log(path / name, result)
+                break
+
+    result['strategy'] = result['strategy'] or 'unknown'
+    return result
+
+
+def find_sessions(logs_dir: Path) -> List[Path]:
+    """Session directories under logs_dir, oldest first"""
+    return sorted(p for p in logs_dir.glob('session_*') if p.is_dir())
+
+
+def load_sessions(logs_dir: Path, workers: Optional[int] = None, use_cache: bool = True) -> List[Dict]:
+    """
+    Parses every session under logs_dir, reusing cached results
+
+    Directories whose files have not changed since the last run are read
+    from the cache; the rest are parsed in parallel worker processes.
+    """
+    logs_dir = Path(logs_dir)
+    cache_path = logs_dir / CACHE_FILE
+    cache = {}
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') != CACHE_VERSION:
+                cache = {}
+        except ValueError:
+            logging.warning(f"Ignoring unreadable cache: {cache_path}")
+            cache = {}
+    entries = cache.get('sessions', {})
+
+    sessions = find_sessions(logs_dir)
+    fingerprints = {p.name: session_fingerprint(p) for p in sessions}
+    stale = [p for p in sessions
+             if entries.get(p.name, {}).get('fingerprint') != fingerprints[p.name]]
+
+    if stale:
+        logging.info(f"Parsing {len(stale)} of {len(sessions)} sessions")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(parse_session, [str(p) for p in stale], chunksize=4))
+        for path, result in zip(stale, parsed):
+            entries[path.name] = {'fingerprint': fingerprints[path.name], 'result': result}
+
+    # 削除されたセッションはキャッシュからも除く
+    entries = {p.name: entries[p.name] for p in sessions}
+    if use_cache and stale:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'sessions': entries}, f)
+
+    results = [entries[p.name]['result'] for p in sessions]
+    for result in results:
+        if not result['winnings']:
+            _warn_no_hands(result)
+    return results
+
+
+def _warn_no_hands(result: Dict) -> None:
+    """Names a session that contributes no hands to the statistics"""
+    summary = result.get('summary') or {}
+    if 'hands' in summary:
+        total = summary.get('total')
+        logging.warning(
+            f"{result['name']}: no per-hand results (log summary only: "
+            f"{summary['hands']} hands"
+            + (f", {total:,} chips" if total is not None else '')
+            + "); excluded from the statistics"
+        )
+    else:
+        logging.warning(f"{result['name']}: no hands found; excluded from the statistics")
+
+
+def strategy_statistics(sessions: List[Dict]) -> Dict[str, Dict]:
+    """Combined statistics per strategy (win rates in bb/100 with a 95% interval)"""
+    totals: Dict[str, Dict] = {}
+    for session in sessions:
+        if not session['winnings']:
+            continue
+        entry = totals.setdefault(session['strategy'], {
+            'sessions': 0, 'hands': 0, 'total': 0, 'squared': 0
+        })
+        entry['sessions'] += 1
+        entry['hands'] += len(session['winnings'])
+        entry['total'] += sum(session['winnings'])
+        entry['squared'] += sum(w * w for w in session['winnings'])
+
+    statistics = {}
+    for strategy, entry in sorted(totals.items()):
+        n = entry['hands']
+        mean = entry['total'] / n
+        variance = max(entry['squared'] / n - mean ** 2, 0.0)
+        scale = 100 / BIG_BLIND
+        statistics[strategy] = {
+            'sessions': entry['sessions'],
+            'hands': n,
+            'total_winnings': entry['total'],
+            'average_per_hand': mean,
+            'bb_per_100': mean * scale,
+            'ci95_bb_per_100': 1.96 * math.sqrt(variance / n) * scale,
+        }
+    return statistics
+
+
+def create_comparison_chart(sessions: List[Dict], statistics: Dict[str, Dict], save_path: Path) -> Optional[Path]:
+    """Cumulative winnings per strategy across all its sessions, in one chart"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    series: Dict[str, List[float]] = {}
+    for session in sessions:
+        cumulative = series.setdefault(session['strategy'], [])
+        total = cumulative[-1] if cumulative else 0
+        for winnings in session['winnings']:
+            total += winnings / BIG_BLIND
+            cumulative.append(total)
+    series = {strategy: values for strategy, values in series.items() if values}
+    if not series:
+        logging.warning("No hand data available for the comparison chart")
+        return None
+
+    plt.figure(figsize=(12, 6))
+    for strategy, values in sorted(series.items()):
+        stats = statistics[strategy]
+        plt.plot(
+            range(1, len(values) + 1), values, linewidth=1.5,
+            label=f"{strategy}: {stats['bb_per_100']:,.1f} ± {stats['ci95_bb_per_100']:,.1f} bb/100 "
+                  f"({stats['hands']:,} hands)"
+        )
+    plt.axhline(y=0, color='red', linestyle='--', alpha=0.3)
+    plt.title('Strategy Comparison', fontsize=14, pad=15)
+    plt.xlabel('Number of Hands', fontsize=12)
+    plt.ylabel('Cumulative Winnings (BB)', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=10)
+    plt.savefig(save_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    return save_path
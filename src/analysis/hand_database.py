@@ -0,0 +1,245 @@
+# src/analysis/hand_database.py
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sample.slumbot_api import ParseAction
+from session.hand_history import HAND_HISTORY_FILE, SESSION_INFO_FILE
+from utils.cards import parse_cards, preflop_class, preflop_class_label
+
+PREFLOP, FLOP, TURN, RIVER = range(4)
+# 行の計算方法を変えたら上げる（古いデータベースは次の import で全て読み直す）
+SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS hands (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    position INTEGER NOT NULL,          -- client_pos: 0 = BB, 1 = SB
+    final_street INTEGER NOT NULL,      -- 0 = preflop ... 3 = river
+    action TEXT NOT NULL,
+    pot INTEGER NOT NULL,
+    showdown INTEGER NOT NULL,
+    winnings INTEGER NOT NULL,
+    preflop_class INTEGER,              -- utils.cards.preflop_class (0-168)
+    hero_check_raise INTEGER NOT NULL,
+    bot_check_raise INTEGER NOT NULL,
+    hole_cards TEXT,
+    bot_hole_cards TEXT,
+    board TEXT
+);
+CREATE TABLE IF NOT EXISTS imported_sessions (
+    session TEXT PRIMARY KEY,
+    hands INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+-- 各インデックスはよく使う集計に必要な列を全て含む（テーブルを読まずに済む）
+CREATE INDEX IF NOT EXISTS hands_by_spot
+    ON hands (position, final_street, hero_check_raise, bot_check_raise, showdown, winnings);
+CREATE INDEX IF NOT EXISTS hands_by_class
+    ON hands (strategy, preflop_class, position, winnings);
+CREATE INDEX IF NOT EXISTS hands_by_preflop_class
+    ON hands (preflop_class, winnings);
+CREATE INDEX IF NOT EXISTS hands_by_strategy
+    ON hands (strategy, session, winnings);
+'''
+
+_COLUMNS = (
+    'session', 'strategy', 'position', 'final_street', 'action', 'pot', 'showdown',
+    'winnings', 'preflop_class', 'hero_check_raise', 'bot_check_raise',
+    'hole_cards', 'bot_hole_cards', 'board'
+)
+
+
+def check_raises(action: str) -> Tuple[bool, bool]:
+    """
+    Whether each player check-raised on some street
+
+    Returns (player 0 check-raised, player 1 check-raised) with players
+    numbered like client_pos (the BB acts first after the flop).
+    """
+    raised = [False, False]
+    for street, street_action in enumerate(action.split('/')):
+        actor = 1 if street == 0 else 0
+        checked = [False, False]
+        i = 0
+        while i < len(street_action):
+            c = street_action[i]
+            i += 1
+            if c == 'b':
+                while i < len(street_action) and street_action[i].isdigit():
+                    i += 1
+                if checked[actor]:
+                    raised[actor] = True
+            elif c == 'k':
+                checked[actor] = True
+            actor = 1 - actor
+    return raised[0], raised[1]
+
+
+def final_street(action: str, board: List[str], showdown: bool) -> int:
+    """
+    Last street the hand reached (0 = preflop ... 3 = river)
+
+    Hands that reach showdown are counted by their board, so an all-in
+    runout counts the same whether or not the action has trailing slashes
+    ('b20000c' or 'b20000c///'). Folded hands use the street of the fold.
+    """
+    if showdown and board:
+        return min(max(len(board) - 2, PREFLOP), RIVER)
+    info = ParseAction(action.rstrip('/'))
+    if not isinstance(info, dict) or 'error' in info:
+        return min(action.count('/'), RIVER)
+    return info['st']
+
+
+def hand_row(record: Dict, session: str, strategy: Optional[str] = None) -> Optional[Tuple]:
+    """Converts a hands.jsonl record into a row of the hands table (None if unusable)"""
+    action = record.get('action') or ''
+    info = ParseAction(action)
+    if not isinstance(info, dict) or 'error' in info or record.get('winnings') is None:
+        return None
+
+    position = record.get('client_pos') or 0
+    folded = action.endswith('f')
+    board = record.get('board') or []
+    pot = 2 * info['total_last_bet_to'] - (info['last_bet_size'] if folded else 0)
+    hole = record.get('hole_cards') or []
+    hero_check_raise, bot_check_raise = check_raises(action)
+    if position == 1:
+        hero_check_raise, bot_check_raise = bot_check_raise, hero_check_raise
+
+    return (
+        session,
+        strategy or record.get('strategy') or 'unknown',
+        position,
+        final_street(action, board, not folded),
+        action,
+        pot,
+        int(not folded),
+        record['winnings'],
+        preflop_class(*parse_cards(hole)) if len(hole) == 2 else None,
+        int(hero_check_raise),
+        int(bot_check_raise),
+        ''.join(hole),
+        ''.join(record.get('bot_hole_cards') or []),
+        ''.join(board),
+    )
+
+
+class HandDatabase:
+    """SQLite store of hand records with covering indexes for the common queries"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(_SCHEMA)
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            # 取り込み済みの記録を消し、次の import で新しい計算方法で読み直す
+            with self.connection:
+                self.connection.execute('DELETE FROM imported_sessions')
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'HandDatabase':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def insert_hands(self, rows: Iterable[Tuple]) -> int:
+        placeholders = ', '.join('?' for _ in _COLUMNS)
+        cursor = self.connection.executemany(
+            f"INSERT INTO hands ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+            (row for row in rows if row is not None)
+        )
+        return cursor.rowcount
+
+    def import_session(self, session_dir: Union[str, Path]) -> int:
+        """
+        Imports a session directory's hands.jsonl, returning the number of new hands
+
+        A session is re-imported only if its hand history has changed since
+        the last import.
+        """
+        session_dir = Path(session_dir)
+        hands_path = session_dir / HAND_HISTORY_FILE
+        if not hands_path.exists():
+            return 0
+        size = hands_path.stat().st_size
+        previous = self.connection.execute(
+            'SELECT size FROM imported_sessions WHERE session = ?', (session_dir.name,)
+        ).fetchone()
+        if previous and previous[0] == size:
+            return 0
+
+        strategy = None
+        info_path = session_dir / SESSION_INFO_FILE
+        if info_path.exists():
+            with open(info_path, encoding='utf-8') as f:
+                strategy = json.load(f).get('strategy')
+
+        with self.connection:
+            self.connection.execute('DELETE FROM hands WHERE session = ?', (session_dir.name,))
+            count = self.insert_hands(
+                hand_row(record, session_dir.name, strategy)
+                for record in _read_records(hands_path)
+            )
+            self.connection.execute(
+                'INSERT OR REPLACE INTO imported_sessions (session, hands, size) VALUES (?, ?, ?)',
+                (session_dir.name, count, size)
+            )
+        return count
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Tuple]:
+        return self.connection.execute(sql, tuple(params)).fetchall()
+
+    def spot_results(self, position: Optional[int] = None, min_street: int = PREFLOP,
+                     hero_check_raise: Optional[bool] = None,
+                     bot_check_raise: Optional[bool] = None) -> Tuple[int, float]:
+        """
+        (hands, average winnings) for hands matching a spot
+
+        e.g. spot_results(position=0, min_street=RIVER, hero_check_raise=True)
+        for BB hands that reached the river after we check-raised.
+        """
+        conditions, params = ['final_street >= ?'], [min_street]
+        for column, value in (('position', position), ('hero_check_raise', hero_check_raise),
+                              ('bot_check_raise', bot_check_raise)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(int(value))
+        count, average = self.connection.execute(
+            f"SELECT COUNT(*), AVG(winnings) FROM hands WHERE {' AND '.join(conditions)}",
+            params
+        ).fetchone()
+        return count, average or 0.0
+
+    def ev_by_preflop_class(self, strategy: Optional[str] = None) -> List[Tuple[str, int, float]]:
+        """(class label, hands, average winnings) for each preflop hand class"""
+        sql = 'SELECT preflop_class, COUNT(*), AVG(winnings) FROM hands'
+        params = []
+        if strategy:
+            sql += ' WHERE strategy = ?'
+            params.append(strategy)
+        sql += ' GROUP BY preflop_class ORDER BY AVG(winnings) DESC'
+        return [
+            (preflop_class_label(index) if index is not None else '?', count, average)
+            for index, count, average in self.connection.execute(sql, params)
+        ]
+
+
+def _read_records(path: Path) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # 書き込み途中の行
@@ -1,36 +1,72 @@
 # src/analysis/session_analyzer.py
 
-import matplotlib.pyplot as plt
 from pathlib import Path
 import logging
 from datetime import datetime
 
+from .variance_reduction import VarianceReducedEstimator
+
 class SessionAnalyzer:
-    def __init__(self):
+    def __init__(self, variance_reduction=False):
         self.winnings_history = []
         self.cumulative_winnings = 0
         self.hands_played = 0
+        # Running sums for the variance-reduced estimate (raw and adjusted, per hand)
+        self.estimator = VarianceReducedEstimator() if variance_reduction else None
+        self.squared_winnings = 0.0
+        self.adjusted_winnings = 0.0
+        self.squared_adjusted = 0.0
         
-    def record_hand(self, hand_winnings):
-        """Record the results of a single hand"""
+    def record_hand(self, hand_winnings, game_state=None):
+        """Record the results of a single hand (game_state enables the variance-reduced estimate)"""
         self.hands_played += 1
         self.cumulative_winnings += hand_winnings
         self.winnings_history.append(self.cumulative_winnings)
         
+        self.squared_winnings += hand_winnings ** 2
+        adjusted = hand_winnings
+        if self.estimator and game_state:
+            adjusted = self.estimator.adjusted_winnings(game_state)
+        self.adjusted_winnings += adjusted
+        self.squared_adjusted += adjusted ** 2
+        
     def merge_results(self, other_analyzer):
         """Merge results from another analyzer"""
+        offset = self.cumulative_winnings
         for winnings in other_analyzer.winnings_history:
             # 相対的な収支を計算して追加
-            relative_winnings = winnings - other_analyzer.winnings_history[0] + (self.cumulative_winnings if self.winnings_history else 0)
-            self.winnings_history.append(relative_winnings)
+            self.winnings_history.append(winnings + offset)
             
         self.cumulative_winnings = self.winnings_history[-1] if self.winnings_history else 0
         self.hands_played += other_analyzer.hands_played
+        self.squared_winnings += other_analyzer.squared_winnings
+        self.adjusted_winnings += other_analyzer.adjusted_winnings
+        self.squared_adjusted += other_analyzer.squared_adjusted
+        
+    def variance_reduction(self):
+        """Variance-reduced average per hand and the variance reduction factor"""
+        if self.hands_played < 2:
+            return None
+        n = self.hands_played
+        raw_variance = self.squared_winnings / n - (self.cumulative_winnings / n) ** 2
+        adjusted_average = self.adjusted_winnings / n
+        adjusted_variance = self.squared_adjusted / n - adjusted_average ** 2
+        factor = raw_variance / adjusted_variance if adjusted_variance > 0 else float('inf')
+        return {
+            'adjusted_average_per_hand': adjusted_average,
+            'adjusted_std_error': (max(adjusted_variance, 0.0) / n) ** 0.5,
+            'raw_std_error': (max(raw_variance, 0.0) / n) ** 0.5,
+            'variance_reduction_factor': factor
+        }
+        
     def create_graph(self, save_dir):
         """Create and save the winnings graph"""
         if not self.winnings_history:
             logging.warning("No hand data available for graph creation")
             return None
+        
+        # Imported here so that runs without a graph never load matplotlib
+        import matplotlib.pyplot as plt
             
         # Create figure
         plt.figure(figsize=(12, 6))
@@ -85,10 +121,13 @@ class SessionAnalyzer:
         if not self.winnings_history:
             return None
             
-        return {
+        statistics = {
             'hands_played': self.hands_played,
             'final_balance': self.cumulative_winnings,
             'average_per_hand': self.cumulative_winnings / self.hands_played,
             'max_balance': max(self.winnings_history),
             'min_balance': min(self.winnings_history)
         }
+        if self.estimator:
+            statistics.update(self.variance_reduction() or {})
+        return statistics
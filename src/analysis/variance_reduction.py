@@ -0,0 +1,175 @@
+# src/analysis/variance_reduction.py
+
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sample.slumbot_api import STACK_SIZE, ParseAction
+from utils.cards import parse_cards
+from utils.hand_eval import evaluate_many
+
+# Board size after each chance node (flop, turn, river)
+BOARD_SIZES = (3, 4, 5)
+
+
+class VarianceReducedEstimator:
+    """
+    AIVAT-style correction of our per-hand winnings
+
+    Each hand's result is adjusted by control variates with zero mean, so
+    the adjusted winnings are an unbiased estimate of the win rate with far
+    less variance:
+
+    - Chance nodes: when a board card is dealt, the value of the hand under
+      the actual card minus its expectation over all possible cards. The
+      value function is our showdown equity against a uniformly random
+      opponent hand times the pot at the start of the street. It uses no
+      private information of the opponent, so every hand that sees a flop is
+      corrected the same way whether or not its cards are revealed at showdown.
+    - All-in: once both players are all in, the rest of the board is pure
+      luck, so the runout is replaced by its expectation: the winnings
+      become pot x our equity at the all-in point minus our chips in. The
+      opponent's cards are always shown after an all-in call, so the equity
+      is against them (against a random hand if they are missing), and the
+      per-street terms for the runout are skipped.
+    - Our decisions: when the strategy reports the policy it sampled from
+      and its action values, the value of the chosen action minus the
+      policy-weighted average.
+
+    Since the expected equity after a card is dealt equals the equity
+    before it, each chance correction is the change in equity across the
+    deal times the pot. Equity is enumerated over opponent hands on the
+    river and estimated from sampled opponent hands and runouts before it
+    (the samples are independent of the deal, so the estimate stays
+    unbiased).
+    """
+
+    def __init__(self, samples: int = 400, seed: Optional[int] = None):
+        self.samples = samples
+        self.rng = np.random.default_rng(seed)
+
+    def adjusted_winnings(self, game_state: Dict) -> float:
+        """The hand's winnings minus the chance and action corrections"""
+        return (
+            game_state['winnings']
+            - self.chance_correction(game_state)
+            - self.action_correction(game_state)
+        )
+
+    def action_correction(self, game_state: Dict) -> float:
+        """Sum over our decisions of Q(chosen) - sum_a pi(a) Q(a)"""
+        correction = 0.0
+        for decision in game_state.get('decisions', ()):
+            policy = decision['policy']
+            values = decision['values']
+            if decision['action'] not in values or any(a not in values for a in policy):
+                continue
+            expected = sum(p * values[a] for a, p in policy.items()) / sum(policy.values())
+            correction += values[decision['action']] - expected
+        return correction
+
+    def chance_correction(self, game_state: Dict) -> float:
+        """
+        Sum over dealt streets of v(actual card) - E[v(card)], plus the
+        all-in correction (winnings minus their expectation at the all-in)
+        """
+        if not game_state.get('hole_cards'):
+            return 0.0
+        hero = parse_cards(game_state['hole_cards'])
+        board = parse_cards(game_state.get('board') or [])
+        # 'b20000c' と 'b20000c///' のように末尾の '/' の有無が異なる形式を揃える
+        action = game_state.get('action', '').rstrip('/')
+        streets = action.split('/')
+
+        correction = 0.0
+        all_in_street = _all_in_street(action)
+        if all_in_street is not None and 'winnings' in game_state:
+            dealt = board[:BOARD_SIZES[all_in_street - 1]] if all_in_street else []
+            opponent = parse_cards(game_state.get('bot_hole_cards') or [])
+            equity = (self._equity_against(hero, opponent, dealt) if len(opponent) == 2
+                      else self._equity(hero, dealt))
+            expected = 2 * STACK_SIZE * equity - STACK_SIZE
+            correction += game_state['winnings'] - expected
+        if not board:
+            return correction
+
+        equity = self._equity(hero, [])
+        for street, size in enumerate(BOARD_SIZES, start=1):
+            if len(board) < size or len(streets) <= street:
+                break
+            # 前のストリート終了時点の投入額（両者同額）
+            info = ParseAction('/'.join(streets[:street]))
+            if not isinstance(info, dict) or 'error' in info:
+                break
+            next_equity = self._equity(hero, board[:size])
+            correction += 2 * info['total_last_bet_to'] * (next_equity - equity)
+            equity = next_equity
+        return correction
+
+    def _equity_against(self, hero: List[int], opponent: List[int], board: Sequence[int]) -> float:
+        """
+        Our showdown equity against a known opponent hand on a partial board
+
+        Runouts are enumerated when at most two cards are missing and sampled
+        otherwise.
+        """
+        used = np.zeros(52, dtype=bool)
+        used[hero + opponent + list(board)] = True
+        remaining = np.nonzero(~used)[0]
+        missing = 5 - len(board)
+
+        if missing <= 2:
+            runouts = np.array(list(combinations(remaining.tolist(), missing)),
+                               dtype=np.int64).reshape(-1, missing)
+        else:
+            draws = np.argsort(self.rng.random((self.samples, remaining.size)), axis=1)
+            runouts = remaining[draws[:, :missing]]
+
+        boards = np.column_stack([
+            np.broadcast_to(np.array(board, dtype=np.int64), (len(runouts), len(board))),
+            runouts
+        ])
+        hero_scores = evaluate_many(np.column_stack([np.tile(hero, (len(boards), 1)), boards]))
+        opponent_scores = evaluate_many(np.column_stack([np.tile(opponent, (len(boards), 1)), boards]))
+        return float(np.mean((hero_scores > opponent_scores) + 0.5 * (hero_scores == opponent_scores)))
+
+    def _equity(self, hero: List[int], board: Sequence[int]) -> float:
+        """Our showdown equity against a uniformly random opponent hand on a partial board"""
+        used = np.zeros(52, dtype=bool)
+        used[hero + list(board)] = True
+        remaining = np.nonzero(~used)[0]
+        missing = 5 - len(board)
+
+        if missing == 0:
+            # リバーは相手の手を全て列挙
+            first, second = np.triu_indices(remaining.size, k=1)
+            opponents = np.column_stack([remaining[first], remaining[second]])
+            runouts = np.empty((len(opponents), 0), dtype=np.int64)
+        else:
+            # 相手の2枚と残りのボードを重複なく引く
+            draws = np.argsort(self.rng.random((self.samples, remaining.size)), axis=1)
+            dealt = remaining[draws[:, :2 + missing]]
+            opponents, runouts = dealt[:, :2], dealt[:, 2:]
+
+        boards = np.column_stack([
+            np.broadcast_to(np.array(board, dtype=np.int64), (len(runouts), len(board))),
+            runouts
+        ])
+        hero_scores = evaluate_many(np.column_stack([np.tile(hero, (len(boards), 1)), boards]))
+        opponent_scores = evaluate_many(np.column_stack([opponents, boards]))
+        return float(np.mean((hero_scores > opponent_scores) + 0.5 * (hero_scores == opponent_scores)))
+
+
+def _all_in_street(action: str) -> Optional[int]:
+    """
+    Street on which the hand ended with both players all in, or None
+
+    action must not end in '/'; the street is the number of streets closed
+    before the all-in call.
+    """
+    info = ParseAction(action)
+    if (not isinstance(info, dict) or 'error' in info or not action.endswith('c')
+            or info['total_last_bet_to'] < STACK_SIZE):
+        return None
+    return action.count('/')
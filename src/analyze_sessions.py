@@ -0,0 +1,59 @@
+# src/analyze_sessions.py
+
+import argparse
+import sys
+import logging
+from pathlib import Path
+
+# Add the project root directory to Python path to enable imports
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from analysis.batch_analysis import create_comparison_chart, load_sessions, strategy_statistics
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare strategies across past sessions')
+    parser.add_argument('--logs-dir', type=str, default=str(project_root / 'logs'),
+                        help='Directory containing session_* folders (default: logs/)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for parsing (default: CPU count)')
+    parser.add_argument('--output', type=str,
+                        help='Comparison chart path (default: <logs-dir>/strategy_comparison.png)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse every session instead of using the cache')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Enable verbose output')
+    
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
+    logs_dir = Path(args.logs_dir)
+    if not logs_dir.is_dir():
+        print(f"Logs directory not found: {logs_dir}", file=sys.stderr)
+        return 1
+    
+    sessions = load_sessions(logs_dir, workers=args.workers, use_cache=not args.no_cache)
+    statistics = strategy_statistics(sessions)
+    if not statistics:
+        print(f"No hands found in {len(sessions)} sessions under {logs_dir}")
+        return 0
+    
+    # 戦略ごとの結果の表示
+    print(f"{'Strategy':<12} {'Sessions':>8} {'Hands':>10} {'Winnings':>12} {'bb/100':>10} {'95% CI':>10}")
+    for strategy, stats in statistics.items():
+        print(f"{strategy:<12} {stats['sessions']:>8} {stats['hands']:>10,} "
+              f"{stats['total_winnings']:>12,} {stats['bb_per_100']:>10.1f} "
+              f"{'±' + format(stats['ci95_bb_per_100'], '.1f'):>10}")
+    
+    output = Path(args.output) if args.output else logs_dir / 'strategy_comparison.png'
+    chart_path = create_comparison_chart(sessions, statistics, output)
+    if chart_path:
+        print(f"\nComparison chart saved to: {chart_path}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
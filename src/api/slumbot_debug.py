@@ -5,28 +5,44 @@ import sys
 import logging
 from typing import Dict, Any
 
+from sample.slumbot_api import ServerError, TransportError, RequestTimeout, ClassifyError
+
 class SlumbotAPI:
     """Enhanced debug version of Slumbot API client"""
     
-    def __init__(self, host: str = 'slumbot.com'):
+    def __init__(self, host: str = 'slumbot.com', connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0):
         self.host = host
         self.base_url = f'https://{host}/api'
+        self.timeout = (connect_timeout, read_timeout)
     
     def _handle_response(self, response: requests.Response, endpoint: str) -> Dict[str, Any]:
         """Handle API response with enhanced error reporting"""
         status_code = response.status_code
         
         if status_code == 200:
-            return response.json()
+            try:
+                result = response.json()
+            except ValueError:
+                raise ServerError(f"Could not parse {endpoint} response as JSON",
+                                  status_code=status_code, endpoint=endpoint)
+            if 'error_msg' not in result:
+                return result
+            error_class = ClassifyError(endpoint, status_code, result['error_msg'])
+            raise error_class(f"{endpoint} failed: {result['error_msg']}",
+                              status_code=status_code, endpoint=endpoint)
             
         # エラーの詳細なログ出力
         logging.error(f"API Error for {endpoint}:")
         logging.error(f"Status code: {status_code}")
         logging.error(f"Request URL: {response.url}")
         
+        error_msg = None
         try:
             error_json = response.json()
             logging.error(f"Error response: {error_json}")
+            if isinstance(error_json, dict):
+                error_msg = error_json.get('error_msg')
         except ValueError:
             logging.error("Could not parse error response as JSON")
             logging.error(f"Raw response: {response.text}")
@@ -34,16 +50,28 @@ class SlumbotAPI:
         logging.error(f"Request headers: {response.request.headers}")
         logging.error(f"Request body: {response.request.body}")
         
-        raise Exception(f"API request failed with status code: {status_code}")
+        error_class = ClassifyError(endpoint, status_code, error_msg)
+        raise error_class(f"API request failed with status code: {status_code}",
+                          status_code=status_code, endpoint=endpoint)
+    
+    def _post(self, endpoint: str, data: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+        """Send a request, wrapping connection failures in TransportError"""
+        try:
+            return requests.post(f'{self.base_url}/{endpoint}', headers=headers, json=data,
+                                 timeout=self.timeout)
+        except requests.Timeout as e:
+            logging.error(f"API request to {endpoint} timed out: {str(e)}")
+            sent = not isinstance(e, requests.ConnectTimeout)
+            raise RequestTimeout(f"{endpoint} request timed out: {e}", sent=sent,
+                                 endpoint=endpoint) from e
+        except requests.RequestException as e:
+            logging.error(f"API request to {endpoint} failed: {str(e)}")
+            raise TransportError(f"{endpoint} request failed: {e}", endpoint=endpoint) from e
     
     def act(self, token: str, action: str) -> Dict[str, Any]:
         """Send action to the API with enhanced error handling"""
         data = {'token': token, 'incr': action}
-        response = requests.post(
-            f'{self.base_url}/act',
-            headers={'Content-Type': 'application/json'},
-            json=data
-        )
+        response = self._post('act', data, {'Content-Type': 'application/json'})
         return self._handle_response(response, 'act')
     
     def new_hand(self, token: str = None) -> Dict[str, Any]:
@@ -51,19 +79,11 @@ class SlumbotAPI:
         data = {}
         if token:
             data['token'] = token
-        response = requests.post(
-            f'{self.base_url}/new_hand',
-            headers={},
-            json=data
-        )
+        response = self._post('new_hand', data, {})
         return self._handle_response(response, 'new_hand')
     
     def login(self, username: str, password: str) -> Dict[str, Any]:
         """Login with enhanced error handling"""
         data = {"username": username, "password": password}
-        response = requests.post(
-            f'{self.base_url}/login',
-            headers={'Content-Type': 'application/json'},
-            json=data
-        )
+        response = self._post('login', data, {'Content-Type': 'application/json'})
         return self._handle_response(response, 'login')
\ No newline at end of file
@@ -0,0 +1,112 @@
+# src/api/transport.py
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from sample.slumbot_api import HttpPost, RequestTimeout, TransportError
+
+Post = Callable[[str, Dict[str, Any]], Tuple[int, Optional[Dict[str, Any]]]]
+
+# カセットに平文で残さないリクエストの項目
+_REDACTED_FIELDS = ('password',)
+
+
+def _redact(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: '***' if key in _REDACTED_FIELDS else value for key, value in data.items()}
+
+
+class RecordingTransport:
+    """
+    リクエストと応答の組（通信エラーと応答時間を含む）をカセットファイルに記録する
+
+    sample.slumbot_api.SetTransport に渡して使う。
+    """
+
+    def __init__(self, path: Union[str, Path], post: Post = HttpPost):
+        self.path = Path(path)
+        self.post = post
+        # 異常終了しても記録が残るように行ごとに書き出す
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+        self._lock = threading.Lock()
+
+    def __call__(self, endpoint: str, data: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        start = time.perf_counter()
+        entry: Dict[str, Any] = {'endpoint': endpoint, 'request': _redact(data)}
+        try:
+            status_code, body = self.post(endpoint, data)
+        except TransportError as e:
+            entry.update({
+                'error': type(e).__name__, 'message': str(e),
+                'sent': getattr(e, 'sent', True), 'latency': time.perf_counter() - start
+            })
+            self._write(entry)
+            raise
+        entry.update({'status': status_code, 'response': body, 'latency': time.perf_counter() - start})
+        self._write(entry)
+        return status_code, body
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport:
+    """
+    カセットファイルの応答を記録順に返す
+
+    realtime=True の場合は記録された応答時間だけ待つ。送られたリクエストが
+    記録と異なる場合は mismatches を数え、strict=True なら例外を送出する。
+    """
+
+    def __init__(self, path: Union[str, Path], realtime: bool = False, strict: bool = False,
+                 loop: bool = False):
+        with open(path, encoding='utf-8') as f:
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        if not self.entries:
+            raise ValueError(f"Empty cassette: {path}")
+        self.realtime = realtime
+        self.strict = strict
+        self.loop = loop
+        self.position = 0
+        self.requests = 0
+        self.mismatches = 0
+        self._lock = threading.Lock()
+
+    def _next_entry(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.position >= len(self.entries):
+                if not self.loop:
+                    raise TransportError('Cassette exhausted')
+                self.position = 0
+            entry = self.entries[self.position]
+            self.position += 1
+            self.requests += 1
+            return entry
+
+    def __call__(self, endpoint: str, data: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        entry = self._next_entry()
+        recorded = entry['request']
+        if entry['endpoint'] != endpoint or recorded.get('incr') != data.get('incr'):
+            self.mismatches += 1
+            message = (f"Replay mismatch: sent {endpoint} {data.get('incr')!r}, "
+                       f"recorded {entry['endpoint']} {recorded.get('incr')!r}")
+            if self.strict:
+                raise TransportError(message, endpoint=endpoint)
+            logging.debug(message)
+
+        if self.realtime:
+            time.sleep(entry.get('latency', 0.0))
+        if 'error' in entry:
+            if entry['error'] == RequestTimeout.__name__:
+                raise RequestTimeout(entry['message'], sent=entry['sent'], endpoint=endpoint)
+            raise TransportError(entry['message'], endpoint=endpoint)
+        return entry['status'], entry['response']
@@ -0,0 +1,209 @@
+# src/benchmark.py
+
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import resource
+import sys
+import logging
+import threading
+import time
+from pathlib import Path
+
+# Add the project root directory to Python path to enable imports
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from sample.slumbot_api import SetTransport
+from api.transport import ReplayTransport
+from strategy.registry import strategy_names
+import session.session_manager as session_manager
+from session.session_manager import SessionManager
+from session.process_runner import ProcessSessionRunner
+
+def process_tree_pss(root_pid):
+    """
+    プロセスとその子孫の PSS（共有ページを共有数で割ったメモリ量、KB）の合計
+
+    Linux の /proc が使えない場合は None を返す
+    """
+    if not os.path.exists(f'/proc/{root_pid}/smaps_rollup'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                total += sum(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        except OSError:
+            pass  # 計測中に終了したプロセス
+    return total
+
+class MemorySampler:
+    """計測中のプロセスツリーの PSS を定期的に調べ、最大値を記録する"""
+    
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_kb = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+    
+    def _sample(self):
+        pss = process_tree_pss(os.getpid())
+        if pss is not None:
+            self.peak_kb = max(self.peak_kb or 0, pss)
+    
+    def _run(self):
+        self._sample()
+        while not self._stopped.wait(self.interval):
+            self._sample()
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+def _run_processes(args):
+    """--processes: 子プロセスでカセットを再生する（停止時の CPU 時間は子プロセス分も含む）"""
+    runner = ProcessSessionRunner(
+        args.processes,
+        args.hands,
+        strategy_type=args.strategy,
+        chunk_size=args.hands,
+        api_options={
+            'replay_cassette': args.cassette,
+            'replay_realtime': args.realtime,
+            'replay_loop': True,
+        }
+    )
+    return runner.run(), None
+
+def run_benchmark(args):
+    """カセットを再生してセッションを実行し、クライアント側の処理時間とメモリを計測"""
+    transport = ReplayTransport(args.cassette, realtime=args.realtime, loop=True)
+    SetTransport(transport)
+    if not args.realtime:
+        # 記録されたエラーの後の待機は計測対象外
+        session_manager.FAILURE_BACKOFF = 0.0
+    
+    profiler = cProfile.Profile() if args.profile else None
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    memory = MemorySampler() if args.memory else None
+    with memory or contextlib.nullcontext():
+        if args.processes > 1:
+            analyzer, _ = _run_processes(args)
+        else:
+            session = SessionManager(
+                total_hands=args.hands,
+                strategy_type=args.strategy,
+                chunk_size=args.hands,
+                variance_reduction=args.variance_reduction
+            )
+            if profiler:
+                profiler.enable()
+            analyzer = session.run()
+            if profiler:
+                profiler.disable()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    children_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu += (children_end.ru_utime + children_end.ru_stime
+            - children_start.ru_utime - children_start.ru_stime)
+    SetTransport(None)
+    
+    hands = max(analyzer.hands_played, 1)
+    results = {
+        'strategy': args.strategy,
+        'processes': args.processes,
+        'hands': analyzer.hands_played,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'hands_per_second': analyzer.hands_played / wall if wall else 0.0,
+        'cpu_ms_per_hand': cpu * 1000 / hands,
+        'peak_memory_mb': memory.peak_kb / 1024 if memory and memory.peak_kb is not None else None,
+        'requests': transport.requests,
+        'replay_mismatches': transport.mismatches,
+    }
+    return results, profiler
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark client overhead by replaying a cassette')
+    parser.add_argument('cassette', type=str, help='Cassette recorded with main.py --record-cassette')
+    parser.add_argument('--hands', type=int, default=1000,
+                        help='Number of hands to play (the cassette is looped; default: 1000)')
+    parser.add_argument('--strategy', type=str, default='simple',
+                        choices=strategy_names(),
+                        help='Strategy to benchmark (default: simple)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Run the hands in this many session processes (main.py --processes)')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Wait for the recorded latency of each response')
+    parser.add_argument('--variance-reduction', action='store_true',
+                        help='Include the variance-reduced estimator in the measurement')
+    parser.add_argument('--memory', action='store_true',
+                        help='Report the peak memory (PSS) of all session processes (Linux only)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print the top functions by cumulative time')
+    parser.add_argument('--save-baseline', type=str,
+                        help='Write the results to this JSON file')
+    parser.add_argument('--baseline', type=str,
+                        help='Compare against a saved baseline and fail on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed CPU time increase over the baseline (default: 0.2 = 20%%)')
+    
+    args = parser.parse_args()
+    if args.processes > 1 and (args.profile or args.variance_reduction):
+        parser.error("--profile and --variance-reduction cannot be combined with --processes")
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    results, profiler = run_benchmark(args)
+    
+    if args.processes > 1:
+        print(f"Hands: {results['hands']} in {args.processes} processes")
+    else:
+        print(f"Hands: {results['hands']} ({results['requests']} requests, "
+              f"{results['replay_mismatches']} replay mismatches)")
+    print(f"Wall time: {results['wall_seconds']:.2f}s ({results['hands_per_second']:,.0f} hands/sec)")
+    print(f"CPU time: {results['cpu_seconds']:.2f}s ({results['cpu_ms_per_hand']:.3f} ms/hand)")
+    if results['peak_memory_mb'] is not None:
+        print(f"Peak memory (PSS of all processes): {results['peak_memory_mb']:.1f} MB")
+    
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline['cpu_ms_per_hand'] * (1 + args.tolerance)
+        print(f"Baseline: {baseline['cpu_ms_per_hand']:.3f} ms/hand (limit {limit:.3f})")
+        if results['cpu_ms_per_hand'] > limit:
+            print("Regression: CPU time per hand exceeds the baseline", file=sys.stderr)
+            return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
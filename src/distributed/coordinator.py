@@ -0,0 +1,178 @@
+# src/distributed/coordinator.py
+
+import logging
+import socket
+import threading
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from analysis.session_analyzer import SessionAnalyzer
+from distributed.protocol import recv_message, send_message
+
+
+class _Job:
+    """ワーカーに割り当てるハンド数の単位"""
+
+    def __init__(self, job_id: int, strategy: str, strategy_options: Dict[str, Any], hands: int):
+        self.job_id = job_id
+        self.strategy = strategy
+        self.strategy_options = strategy_options
+        self.hands = hands
+        self.received = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.hands - self.received
+
+
+class Coordinator:
+    """
+    ワーカーにハンドのジョブを配り、結果を戦略ごとの SessionAnalyzer にまとめる
+
+    ワーカーが切断した場合やハートビートが途絶えた場合は、そのジョブの
+    未完了分を別のジョブとして再び配布する。
+    """
+
+    def __init__(
+        self,
+        evaluations: List[Tuple[str, Dict[str, Any], int]],
+        job_size: int = 500,
+        host: str = 'localhost',
+        port: int = 0,
+        heartbeat_timeout: float = 60.0
+    ):
+        """
+        Parameters:
+        -----------
+        evaluations : List[Tuple[str, Dict[str, Any], int]]
+            (戦略タイプ, 戦略オプション, ハンド数) のリスト
+        job_size : int
+            1ジョブあたりのハンド数
+        host : str
+            待ち受けるホスト
+        port : int
+            待ち受けるポート（0 の場合は空いているポート）
+        heartbeat_timeout : float
+            この秒数メッセージがないワーカーは停止したとみなす
+        """
+        self.heartbeat_timeout = heartbeat_timeout
+        self.analyzers: Dict[str, SessionAnalyzer] = {}
+        self.failure_counts: Counter = Counter()
+        self.requeued_hands = 0
+
+        self._lock = threading.Lock()
+        self._pending: Deque[_Job] = deque()
+        self._next_job_id = 0
+        self._outstanding = 0
+        for strategy, options, hands in evaluations:
+            self.analyzers.setdefault(strategy, SessionAnalyzer())
+            for start in range(0, hands, job_size):
+                self._add_job(strategy, options, min(job_size, hands - start))
+        self._finished = threading.Event()
+        if self._outstanding == 0:
+            self._finished.set()
+
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+
+    def _add_job(self, strategy: str, options: Dict[str, Any], hands: int) -> None:
+        self._pending.append(_Job(self._next_job_id, strategy, options, hands))
+        self._next_job_id += 1
+        self._outstanding += hands
+
+    @property
+    def analyzer(self) -> SessionAnalyzer:
+        """全戦略の結果をまとめた SessionAnalyzer"""
+        merged = SessionAnalyzer()
+        for analyzer in self.analyzers.values():
+            merged.merge_results(analyzer)
+        return merged
+
+    def serve(self, timeout: Optional[float] = None) -> bool:
+        """
+        全てのハンドが完了するまでワーカーを受け付ける
+
+        Returns:
+        --------
+        bool
+            全てのハンドが完了した場合 True（timeout で打ち切った場合 False）
+        """
+        accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
+        accept_thread.start()
+        try:
+            return self._finished.wait(timeout)
+        finally:
+            self._server.close()
+
+    def _accept_loop(self) -> None:
+        while not self._finished.is_set():
+            try:
+                conn, address = self._server.accept()
+            except OSError:
+                break
+            conn.settimeout(self.heartbeat_timeout)
+            threading.Thread(target=self._handle_worker, args=(conn, address), daemon=True).start()
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._lock:
+            return self._pending.popleft() if self._pending else None
+
+    def _handle_worker(self, conn: socket.socket, address) -> None:
+        name = f"{address[0]}:{address[1]}"
+        job: Optional[_Job] = None
+        try:
+            with conn:
+                while True:
+                    message = recv_message(conn)
+                    if message is None:
+                        break
+                    kind = message.get('type')
+                    if kind == 'hello':
+                        name = message.get('worker', name)
+                        logging.info(f"Worker {name} connected")
+                    elif kind == 'request':
+                        job = self._next_job()
+                        if job:
+                            send_message(conn, {
+                                'type': 'job', 'job_id': job.job_id, 'hands': job.remaining,
+                                'strategy': job.strategy, 'strategy_options': job.strategy_options
+                            })
+                        elif self._finished.is_set():
+                            send_message(conn, {'type': 'done'})
+                            break
+                        else:
+                            send_message(conn, {'type': 'wait', 'seconds': 1.0})
+                    elif kind == 'results' and job and message.get('job_id') == job.job_id:
+                        self._record(job, message.get('winnings', []))
+                    elif kind == 'job_done' and job and message.get('job_id') == job.job_id:
+                        with self._lock:
+                            self.failure_counts.update(message.get('failures', {}))
+                        if job.remaining > 0:
+                            # ワーカー側で打ち切られた分は再配布
+                            self._requeue(job, name)
+                        job = None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Lost worker {name}: {str(e)}")
+        finally:
+            if job and job.remaining > 0:
+                self._requeue(job, name)
+
+    def _record(self, job: _Job, winnings: List[int]) -> None:
+        with self._lock:
+            winnings = winnings[:job.remaining]
+            analyzer = self.analyzers[job.strategy]
+            for value in winnings:
+                analyzer.record_hand(value)
+            job.received += len(winnings)
+            self._outstanding -= len(winnings)
+            if self._outstanding <= 0:
+                self._finished.set()
+
+    def _requeue(self, job: _Job, worker: str) -> None:
+        with self._lock:
+            remaining = job.remaining
+            job.hands = job.received  # 以降この job の結果は受け付けない
+            self._outstanding -= remaining
+            self._add_job(job.strategy, job.strategy_options, remaining)
+            self.requeued_hands += remaining
+        logging.warning(f"Requeued {remaining} hands from worker {worker}")
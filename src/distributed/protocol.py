@@ -0,0 +1,63 @@
+# src/distributed/protocol.py
+
+"""
+コーディネーターとワーカー間の通信プロトコル
+
+各メッセージは4バイト（ビッグエンディアン）の長さに続くJSONオブジェクト。
+
+ワーカー -> コーディネーター:
+    {'type': 'hello', 'worker': 名前}
+    {'type': 'request'}                                  次のジョブを要求
+    {'type': 'results', 'job_id': ID, 'winnings': [...]} 終了したハンドの収支
+    {'type': 'job_done', 'job_id': ID, 'failures': {...}}
+    {'type': 'heartbeat'}
+
+コーディネーター -> ワーカー:
+    {'type': 'job', 'job_id': ID, 'hands': N, 'strategy': 名前, 'strategy_options': {...}}
+    {'type': 'wait', 'seconds': 秒}                       未完了のジョブの結果待ち
+    {'type': 'done'}                                     全てのハンドが完了
+"""
+
+import json
+import socket
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+_HEADER = struct.Struct('>I')
+# 異常なデータで大量のメモリを確保しないための上限
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' を (host, port) に変換"""
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """次のメッセージを受信（接続が閉じられた場合は None）"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message too large: {size} bytes")
+    data = _recv_exact(sock, size)
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
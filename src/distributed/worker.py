@@ -0,0 +1,166 @@
+# src/distributed/worker.py
+
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from distributed.protocol import recv_message, send_message
+from session.session_manager import SessionManager
+
+# コーディネーターが指定できる戦略オプションと許す型（評価する戦略の設定値のみ）。
+# ファイルのパスや解法ワーカー数はワーカー自身の設定を使う
+COORDINATOR_OPTIONS: Dict[str, Tuple[type, ...]] = {
+    'time_budget': (int, float),
+    'min_root_visits': (int,),
+}
+
+
+class Worker:
+    """
+    コーディネーターからジョブを受け取り、SessionManager でハンドをプレイする
+
+    終了したハンドの収支はまとめてコーディネーターに送り、
+    API待ちが長い間もハートビートで生存を伝える。
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        name: Optional[str] = None,
+        chunk_size: int = 1000,
+        session_options: Optional[Dict[str, Any]] = None,
+        local_strategy_options: Optional[Callable[[str], Dict[str, Any]]] = None,
+        batch_size: int = 20,
+        flush_interval: float = 1.0,
+        heartbeat_interval: float = 10.0
+    ):
+        """
+        Parameters:
+        -----------
+        address : Tuple[str, int]
+            コーディネーターのアドレス
+        name : Optional[str]
+            ワーカー名（ログ用）
+        chunk_size : int
+            SessionManager のチャンクサイズ
+        session_options : Optional[Dict[str, Any]]
+            SessionManager に渡す追加の引数（username, password, token_pool など）
+        local_strategy_options : Optional[Callable[[str], Dict[str, Any]]]
+            戦略名からこのワーカーの設定による戦略オプション（policy_file など）を返す関数。
+            コーディネーターからは COORDINATOR_OPTIONS のキーだけを受け付ける
+        batch_size : int
+            この数のハンドが終わるごとに結果を送信
+        flush_interval : float
+            最後の送信からこの秒数が過ぎたら batch_size 未満でも送信
+        heartbeat_interval : float
+            ハートビートの送信間隔（秒）
+        """
+        self.address = address
+        self.name = name or socket.gethostname()
+        self.chunk_size = chunk_size
+        self.session_options = session_options or {}
+        self.local_strategy_options = local_strategy_options or (lambda strategy: {})
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.hands_played = 0
+
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._last_send = 0.0
+        self._buffer: List[int] = []
+        self._job_id: Optional[int] = None
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        with self._send_lock:
+            send_message(self._sock, message)
+            self._last_send = time.time()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            winnings, self._buffer = self._buffer, []
+            self._send({'type': 'results', 'job_id': self._job_id, 'winnings': winnings})
+
+    def _on_hand(self, game_state: Dict[str, Any]) -> None:
+        self._buffer.append(game_state['winnings'])
+        self.hands_played += 1
+        if len(self._buffer) >= self.batch_size or time.time() - self._last_send > self.flush_interval:
+            self._flush()
+
+    def _heartbeat_loop(self, stopped: threading.Event) -> None:
+        while not stopped.wait(self.heartbeat_interval / 2):
+            if time.time() - self._last_send >= self.heartbeat_interval / 2:
+                try:
+                    self._send({'type': 'heartbeat'})
+                except OSError:
+                    break
+
+    def _strategy_options(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ジョブの戦略オプション
+
+        コーディネーターは認証されないため、送られたオプションのうち
+        COORDINATOR_OPTIONS のキーと型に合うものだけを使い、残りは
+        ワーカー自身の設定から取る。
+        """
+        options = dict(self.local_strategy_options(job['strategy']))
+        sent = job.get('strategy_options') or {}
+        if not isinstance(sent, dict):
+            sent = {}
+        for key, value in sent.items():
+            allowed = COORDINATOR_OPTIONS.get(key)
+            if allowed is None or isinstance(value, bool) or not isinstance(value, allowed):
+                if key not in options:
+                    logging.warning(f"Ignoring strategy option from coordinator: {key}")
+                continue
+            options[key] = value
+        return options
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        self._job_id = job['job_id']
+        logging.info(f"Starting job {job['job_id']}: {job['hands']} hands of {job['strategy']}")
+        session = SessionManager(
+            total_hands=job['hands'],
+            strategy_type=job['strategy'],
+            chunk_size=self.chunk_size,
+            strategy_options=self._strategy_options(job),
+            on_hand=self._on_hand,
+            **self.session_options
+        )
+        session.run()
+        self._flush()
+        self._send({
+            'type': 'job_done', 'job_id': job['job_id'],
+            'failures': dict(session.failure_counts)
+        })
+
+    def run(self) -> int:
+        """
+        ジョブがなくなるまで処理する
+
+        Returns:
+        --------
+        int
+            プレイしたハンド数
+        """
+        self._sock = socket.create_connection(self.address)
+        stopped = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(stopped,), daemon=True)
+        try:
+            self._send({'type': 'hello', 'worker': self.name})
+            heartbeat.start()
+            while True:
+                self._send({'type': 'request'})
+                message = recv_message(self._sock)
+                if message is None or message['type'] == 'done':
+                    break
+                if message['type'] == 'wait':
+                    time.sleep(message.get('seconds', 1.0))
+                    continue
+                self._run_job(message)
+        finally:
+            stopped.set()
+            self._sock.close()
+        return self.hands_played
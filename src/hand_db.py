@@ -0,0 +1,70 @@
+# src/hand_db.py
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the project root directory to Python path to enable imports
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from analysis.batch_analysis import find_sessions
+from analysis.hand_database import HandDatabase, PREFLOP, FLOP, TURN, RIVER
+
+STREETS = {'preflop': PREFLOP, 'flop': FLOP, 'turn': TURN, 'river': RIVER}
+POSITIONS = {'bb': 0, 'sb': 1}
+
+def main():
+    parser = argparse.ArgumentParser(description='Indexed hand history database')
+    parser.add_argument('--db', type=str, default=str(project_root / 'logs' / 'hands.db'),
+                        help='Database file (default: logs/hands.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    import_parser = commands.add_parser('import', help='Import hands.jsonl from session directories')
+    import_parser.add_argument('--logs-dir', type=str, default=str(project_root / 'logs'),
+                               help='Directory containing session_* folders (default: logs/)')
+    
+    class_parser = commands.add_parser('ev-by-class', help='Average winnings by preflop hand class')
+    class_parser.add_argument('--strategy', type=str, help='Only hands played by this strategy')
+    
+    spot_parser = commands.add_parser('spot', help='Results for hands matching a spot')
+    spot_parser.add_argument('--position', choices=POSITIONS, help='Our position')
+    spot_parser.add_argument('--reached', choices=STREETS, default='preflop',
+                             help='Street the hand reached (default: preflop)')
+    spot_parser.add_argument('--check-raise', choices=['hero', 'bot'],
+                             help='Only hands where this player check-raised')
+    
+    sql_parser = commands.add_parser('sql', help='Run an SQL query against the hands table')
+    sql_parser.add_argument('query', type=str)
+    
+    args = parser.parse_args()
+    
+    with HandDatabase(args.db) as database:
+        start = time.perf_counter()
+        if args.command == 'import':
+            total = 0
+            for session_dir in find_sessions(Path(args.logs_dir)):
+                total += database.import_session(session_dir)
+            print(f"Imported {total:,} hands")
+        elif args.command == 'ev-by-class':
+            print(f"{'Class':<6} {'Hands':>10} {'Avg/hand':>10}")
+            for label, count, average in database.ev_by_preflop_class(args.strategy):
+                print(f"{label:<6} {count:>10,} {average:>10.1f}")
+        elif args.command == 'spot':
+            count, average = database.spot_results(
+                position=POSITIONS.get(args.position),
+                min_street=STREETS[args.reached],
+                hero_check_raise=True if args.check_raise == 'hero' else None,
+                bot_check_raise=True if args.check_raise == 'bot' else None
+            )
+            print(f"Hands: {count:,}, average per hand: {average:,.1f}")
+        else:
+            for row in database.query(args.query):
+                print(*row, sep='\t')
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,7 @@
 import argparse
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -10,8 +11,12 @@ from datetime import datetime
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
-from strategy.base_strategy import StrategyType
-from session.session_manager import SessionManager
+# 起動を速くするため、ここでは軽いモジュールだけを読み込む
+# （セッション・通信・戦略のモジュールは引数を解析した後に読み込む）
+from strategy.registry import strategy_names
+from utils.logging_utils import JsonFormatter, QueuedLogging, TEXT_FORMAT
+
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
 
 def create_session_directory():
     """セッションディレクトリの作成"""
@@ -21,57 +26,296 @@ def create_session_directory():
     session_dir.mkdir(parents=True, exist_ok=True)
     return session_dir
 
-def setup_logging(session_dir, verbose=False):
-    """ロギングの設定"""
-    log_file = session_dir / 'session.log'
+def setup_logging(session_dir, verbose=False, log_format='text', hand_log_level=None,
+                  queue_size=10000):
+    """
+    ロギングの設定
+
+    ログはキューを経由してバックグラウンドスレッドで書き出される。
+    終了時に戻り値の QueuedLogging.stop() を呼ぶこと。
+    """
+    log_file = session_dir / ('session.jsonl' if log_format == 'json' else 'session.log')
+    
+    file_handler = logging.FileHandler(log_file)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    if log_format == 'json':
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
     
-    logging.basicConfig(
+    queued_logging = QueuedLogging(
+        handlers=[file_handler, stream_handler],
         level=logging.INFO if verbose else logging.WARNING,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+        hand_level=getattr(logging, hand_log_level) if hand_log_level else None,
+        queue_size=queue_size
     )
     
-    return log_file
+    return log_file, queued_logging
 
 def main():
     parser = argparse.ArgumentParser(description='Poker Bot vs Slumbot')
     parser.add_argument('--username', type=str, help='Username for Slumbot API')
     parser.add_argument('--password', type=str, help='Password for Slumbot API')
+    parser.add_argument('--accounts-file', type=str,
+                        help='JSON file with a list of {"username", "password"} accounts to pool')
+    parser.add_argument('--concurrent-sessions', type=int, default=1,
+                        help='Number of sessions to run concurrently (default: 1)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Number of sessions to run in separate processes. Only the '
+                             'hand-evaluation tables (~100 KB) and counters are shared; each '
+                             'process loads its own interpreter, NumPy and strategy state, '
+                             'adding ~30 MB. Not combinable with --early-stop, '
+                             '--variance-reduction or --concurrent-sessions (default: 1)')
+    parser.add_argument('--connect-timeout', type=float, default=5.0,
+                        help='Seconds to wait for an API connection (default: 5.0)')
+    parser.add_argument('--read-timeout', type=float, default=30.0,
+                        help='Seconds to wait for an API response (default: 30.0)')
+    parser.add_argument('--serve', type=str, metavar='HOST:PORT',
+                        help='Run as coordinator, handing out hands to workers '
+                             '(unauthenticated: bind only to trusted networks)')
+    parser.add_argument('--connect', type=str, metavar='HOST:PORT',
+                        help='Run as worker for the coordinator at this address; file '
+                             'paths and solver workers come from this command line, not '
+                             'the coordinator')
+    parser.add_argument('--evaluate', type=str, nargs='+', choices=strategy_names(),
+                        help='Coordinator: strategies to evaluate, --hands each (default: --strategy)')
+    parser.add_argument('--job-size', type=int, default=500,
+                        help='Coordinator: hands per worker job (default: 500)')
+    parser.add_argument('--record-cassette', type=str, metavar='PATH',
+                        help='Record every API request and response to this cassette file')
+    parser.add_argument('--replay-cassette', type=str, metavar='PATH',
+                        help='Answer API requests from a recorded cassette instead of the server')
+    parser.add_argument('--replay-realtime', action='store_true',
+                        help='When replaying, wait for the recorded latency of each response')
     parser.add_argument('--hands', type=int, default=100,
                         help='Number of hands to play (default: 100)')
     parser.add_argument('--chunk-size', type=int, default=1000,
                         help='Number of hands per chunk (default: 1000)')
     parser.add_argument('--strategy', type=str, default='simple',
-                        choices=StrategyType.list_names(),
+                        choices=strategy_names(),
                         help='Strategy to use for playing (default: simple)')
+    parser.add_argument('--policy-file', type=str,
+                        help='Blueprint policy file (required for the blueprint strategy)')
+    parser.add_argument('--time-budget', type=float, default=0.2,
+                        help='Seconds per decision for the resolve strategy (default: 0.2)')
+    parser.add_argument('--solver-workers', type=int,
+                        help='Worker processes for the resolve strategy (default: CPU count - 1, '
+                             'or CPU count / --processes - 1 per process)')
+    parser.add_argument('--min-root-visits', type=int, default=300,
+                        help='Upper bound on the root visits a re-solve needs before its policy '
+                             'is used (lowered to half the visits the measured solve speed gives, '
+                             'at least 20); fewer fall back to the blueprint or check/call '
+                             '(default: 300)')
+    parser.add_argument('--portfolio-state', type=str,
+                        help='State file of the portfolio strategy, kept across sessions '
+                             '(default: logs/portfolio_state.json)')
+    parser.add_argument('--speculate', action='store_true',
+                        help='Precompute likely next decisions while waiting on the API')
+    parser.add_argument('--early-stop', action='store_true',
+                        help='Stop once a sequential test on bb/100 is conclusive')
+    parser.add_argument('--early-stop-alpha', type=float, default=0.05,
+                        help='Error rate of the early-stop test (default: 0.05)')
+    parser.add_argument('--variance-reduction', action='store_true',
+                        help='Also report an AIVAT-style variance-reduced win rate')
+    parser.add_argument('--status-interval', type=float, default=5.0,
+                        help='Seconds between rewrites of status.json in the session folder (default: 5.0)')
+    parser.add_argument('--status-port', type=int,
+                        help='Serve live status on http://127.0.0.1:PORT/status (POST /stop ends the run)')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Enable verbose output')
+    parser.add_argument('--hand-log-level', type=str, choices=LOG_LEVELS,
+                        help='Log level for per-hand records (default: same as --verbose)')
+    parser.add_argument('--log-format', type=str, default='text', choices=['text', 'json'],
+                        help='Log file format; json writes JSON lines to session.jsonl (default: text)')
+    parser.add_argument('--log-queue-size', type=int, default=10000,
+                        help='Maximum buffered log records before dropping (default: 10000)')
     
     args = parser.parse_args()
+    if args.processes > 1:
+        # 子プロセスの結果は収支だけが親に集まるため、これらは複数プロセスでは使えない
+        unsupported = [flag for flag, used in (
+            ('--early-stop', args.early_stop),
+            ('--variance-reduction', args.variance_reduction),
+            ('--concurrent-sessions', args.concurrent_sessions > 1),
+        ) if used]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be combined with --processes")
     
     # セッションの準備
     session_dir = create_session_directory()
-    setup_logging(session_dir, args.verbose)
+    log_file, queued_logging = setup_logging(
+        session_dir, args.verbose, args.log_format, args.hand_log_level, args.log_queue_size
+    )
+    
+    try:
+        return run_session(args, session_dir, log_file)
+    finally:
+        queued_logging.stop()
+        if queued_logging.dropped:
+            print(f"Warning: {queued_logging.dropped} log records were dropped "
+                  f"(log queue full)", file=sys.stderr)
+
+def build_strategy_options(args, strategy):
+    """戦略のコンストラクタに渡すオプション（その戦略が受け取るものだけ）"""
+    options = {}
+    if args.policy_file and strategy in ('blueprint', 'resolve'):
+        options['policy_file'] = args.policy_file
+    if strategy == 'resolve':
+        options['time_budget'] = args.time_budget
+        options['workers'] = args.solver_workers
+        options['min_root_visits'] = args.min_root_visits
+        if args.solver_workers is None and args.processes > 1:
+            # 各プロセスが CPU 数分の解法ワーカーを起動しないよう、空きコアを分け合う
+            from strategy.subgame_solver import default_workers
+            options['workers'] = default_workers(args.processes)
+    if strategy == 'portfolio':
+        options['state_file'] = args.portfolio_state or str(
+            project_root / 'logs' / 'portfolio_state.json'
+        )
+    return options
+
+def run_session(args, session_dir, log_file=None):
+    """セッションの実行と結果の表示"""
+    from session.session_manager import SessionManager
+    from session.process_runner import ProcessSessionRunner
+    from session.token_pool import TokenPool
+    from session.hand_history import HAND_HISTORY_FILE, HandHistoryWriter, write_session_info
+    import sample.slumbot_api as slumbot_api
+    from sample.slumbot_api import SetTimeouts, SetTransport
+    from session.progress import STATUS_FILE, ProgressTracker, StatusReporter
+    from api.transport import RecordingTransport, ReplayTransport
+    from distributed.protocol import parse_address
+    from distributed.worker import Worker
     
     logging.info("Starting poker session...")
     logging.info(f"Number of hands to play: {args.hands}")
     logging.info(f"Chunk size: {args.chunk_size}")
     logging.info(f"Using strategy: {args.strategy}")
     
-    # セッションの実行
-    try:
+    SetTimeouts(args.connect_timeout, args.read_timeout)
+    if args.replay_cassette:
+        SetTransport(ReplayTransport(args.replay_cassette, realtime=args.replay_realtime))
+        logging.info(f"Replaying API responses from {args.replay_cassette}")
+    elif args.record_cassette:
+        SetTransport(RecordingTransport(args.record_cassette))
+        logging.info(f"Recording API traffic to {args.record_cassette}")
+    
+    strategy_options = build_strategy_options(args, args.strategy)
+    
+    write_session_info(session_dir, {
+        'strategy': args.strategy,
+        'hands': args.hands,
+        'chunk_size': args.chunk_size,
+        'strategy_options': strategy_options,
+        'started': datetime.now().isoformat(timespec='seconds'),
+    })
+    if args.serve:
+        return run_coordinator(args, session_dir)
+    
+    hand_history = HandHistoryWriter(session_dir / HAND_HISTORY_FILE)
+    
+    # 進捗は status.json（と指定があれば HTTP エンドポイント）で確認できる
+    progress = ProgressTracker(0 if args.connect else args.hands, args.strategy)
+    SetTransport(progress.timed(slumbot_api.transport))
+    status = StatusReporter(
+        progress, session_dir / STATUS_FILE, args.status_interval, args.status_port
+    ).start()
+    if status.address:
+        print(f"Live status on http://{status.address[0]}:{status.address[1]}/status")
+    
+    token_pool = None
+    if args.accounts_file and args.processes <= 1:
+        # 複数プロセスの場合は各プロセスがプールを持つ
+        token_pool = TokenPool.from_file(args.accounts_file).start()
+        logging.info(f"Token pool started with accounts from {args.accounts_file}")
+    
+    if args.connect:
+        worker = Worker(
+            parse_address(args.connect),
+            chunk_size=args.chunk_size,
+            local_strategy_options=lambda strategy: build_strategy_options(args, strategy),
+            session_options={
+                'username': args.username,
+                'password': args.password,
+                'speculate': args.speculate,
+                'token_pool': token_pool,
+                'hand_history': hand_history,
+                'progress': progress,
+            }
+        )
+        try:
+            hands = worker.run()
+            print(f"Worker finished after {hands} hands")
+        except OSError as e:
+            logging.error(f"Lost connection to coordinator: {str(e)}")
+            return 1
+        finally:
+            status.stop()
+            hand_history.close()
+            if token_pool:
+                token_pool.stop()
+        return 0
+    
+    def run_one(hands):
         session = SessionManager(
-            total_hands=args.hands,
+            total_hands=hands,
             strategy_type=args.strategy,
             chunk_size=args.chunk_size,
             username=args.username,
-            password=args.password
+            password=args.password,
+            strategy_options=strategy_options,
+            speculate=args.speculate,
+            token_pool=token_pool,
+            early_stop_alpha=args.early_stop_alpha if args.early_stop else None,
+            variance_reduction=args.variance_reduction,
+            hand_history=hand_history,
+            progress=progress
         )
-        
-        analyzer = session.run()
+        return session.run()
+    
+    # セッションの実行
+    try:
+        sessions = max(1, min(args.concurrent_sessions, args.hands))
+        if args.processes > 1:
+            runner = ProcessSessionRunner(
+                args.processes,
+                args.hands,
+                strategy_type=args.strategy,
+                chunk_size=args.chunk_size,
+                strategy_options=strategy_options,
+                session_options={
+                    'username': args.username,
+                    'password': args.password,
+                    'speculate': args.speculate,
+                },
+                hand_history=str(session_dir / HAND_HISTORY_FILE),
+                accounts_file=args.accounts_file,
+                log_file=str(log_file) if log_file else None,
+                log_level=logging.INFO if args.verbose else logging.WARNING,
+                progress=progress,
+                api_options={
+                    'connect_timeout': args.connect_timeout,
+                    'read_timeout': args.read_timeout,
+                    'record_cassette': args.record_cassette,
+                    'replay_cassette': args.replay_cassette,
+                    'replay_realtime': args.replay_realtime,
+                }
+            )
+            analyzer = runner.run()
+            if runner.failure_counts:
+                logging.warning(f"Abandoned hands by error: {dict(runner.failure_counts)}")
+        elif sessions == 1:
+            analyzer = run_one(args.hands)
+        else:
+            # ハンド数を各セッションに分配し、結果をまとめる
+            quotas = [args.hands // sessions + (1 if i < args.hands % sessions else 0)
+                      for i in range(sessions)]
+            with ThreadPoolExecutor(max_workers=sessions) as executor:
+                results = list(executor.map(run_one, quotas))
+            analyzer = results[0]
+            for result in results[1:]:
+                analyzer.merge_results(result)
         
         # グラフの作成と保存
         graph_path = analyzer.create_graph(session_dir)
@@ -86,6 +330,11 @@ def main():
             print(f"Total hands played: {analyzer.hands_played}")
             print(f"Final balance: {analyzer.cumulative_winnings:,} chips")
             print(f"Average per hand: {analyzer.cumulative_winnings/analyzer.hands_played:,.1f}")
+            reduced = analyzer.variance_reduction() if args.variance_reduction else None
+            if reduced:
+                print(f"Variance-reduced average per hand: "
+                      f"{reduced['adjusted_average_per_hand']:,.1f} "
+                      f"(variance reduction factor {reduced['variance_reduction_factor']:.2f})")
             print(f"Session files saved in: {session_dir}")
         
     except KeyboardInterrupt:
@@ -93,7 +342,48 @@ def main():
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
         return 1
+    finally:
+        status.stop()
+        hand_history.close()
+        if token_pool:
+            token_pool.stop()
+    
+    return 0
+
+def run_coordinator(args, session_dir):
+    """ワーカーにハンドを配布し、まとめた結果を表示"""
+    from distributed.coordinator import Coordinator
+    from distributed.protocol import parse_address
+    
+    strategies = args.evaluate or [args.strategy]
+    coordinator = Coordinator(
+        [(strategy, build_strategy_options(args, strategy), args.hands) for strategy in strategies],
+        job_size=args.job_size,
+        host=parse_address(args.serve)[0],
+        port=parse_address(args.serve)[1]
+    )
+    host, port = coordinator.address
+    print(f"Coordinator listening on {host}:{port}")
+    
+    try:
+        coordinator.serve()
+    except KeyboardInterrupt:
+        logging.warning("Coordinator interrupted by user.")
+    
+    print(f"\nDistributed session - results by strategy:")
+    for strategy, analyzer in coordinator.analyzers.items():
+        if analyzer.hands_played:
+            print(f"{strategy}: {analyzer.hands_played} hands, "
+                  f"{analyzer.cumulative_winnings:,} chips, "
+                  f"{analyzer.cumulative_winnings / analyzer.hands_played:,.1f} per hand")
+    if coordinator.requeued_hands:
+        print(f"Hands requeued from lost workers: {coordinator.requeued_hands}")
+    if coordinator.failure_counts:
+        print(f"Abandoned hands by error: {dict(coordinator.failure_counts)}")
     
+    graph_path = coordinator.analyzer.create_graph(session_dir)
+    if graph_path:
+        logging.info(f"Session graph saved to: {graph_path}")
     return 0
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+# src/session/hand_history.py
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Union
+
+# セッションディレクトリ内のファイル名
+HAND_HISTORY_FILE = 'hands.jsonl'
+SESSION_INFO_FILE = 'session.json'
+
+# ハンド履歴に残すゲーム状態のキー
+HAND_FIELDS = ('client_pos', 'hole_cards', 'bot_hole_cards', 'board', 'action', 'winnings')
+
+
+class HandHistoryWriter:
+    """
+    終了したハンドを1行1ハンドのJSON形式で書き出す
+
+    複数のセッションから同時に書き込んでも行が混ざらないようにロックする。
+    複数のプロセスから同じファイルに書き込む場合は line_buffered=True にして、
+    1行ずつ追記させる。
+    """
+
+    def __init__(self, path: Union[str, Path], line_buffered: bool = False):
+        self.path = Path(path)
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1 if line_buffered else -1)
+        self._lock = threading.Lock()
+
+    def write(self, game_state: Dict[str, Any], strategy: str) -> None:
+        """
+        Parameters:
+        -----------
+        game_state : Dict[str, Any]
+            終了したハンドのゲーム状態
+        strategy : str
+            使用した戦略タイプ
+        """
+        record = {key: game_state.get(key) for key in HAND_FIELDS}
+        record['strategy'] = strategy
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def write_session_info(session_dir: Union[str, Path], info: Dict[str, Any]) -> None:
+    """セッションの設定（戦略など）を session.json に保存"""
+    with open(Path(session_dir) / SESSION_INFO_FILE, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, default=str)
@@ -0,0 +1,288 @@
+# src/session/process_runner.py
+
+import logging
+import multiprocessing
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from analysis.session_analyzer import SessionAnalyzer
+from session.progress import ProgressTracker
+from session.session_manager import ERROR_CATEGORIES
+from session.shared_state import SharedArray, ShardedCounter, install_tables, share_tables
+from strategy.opponent_range import NUM_ACTION_CLASSES, ActionFrequencyModel
+from utils.logging_utils import JsonFormatter, TEXT_FORMAT
+
+# 進捗をログに出す間隔（秒）
+PROGRESS_INTERVAL = 10.0
+# ActionFrequencyModel の既定の強さバケット数
+ACTION_MODEL_BUCKETS = 10
+
+
+def _setup_process_logging(log_file: Optional[str], level: int) -> None:
+    """子プロセスのログをセッションのログファイルと標準出力に書き出す"""
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        is_json = isinstance(handler, logging.FileHandler) and log_file.endswith('.jsonl')
+        handler.setFormatter(JsonFormatter() if is_json else logging.Formatter(TEXT_FORMAT))
+    logging.basicConfig(level=level, handlers=handlers, force=True)
+
+
+def _setup_api(options: Dict[str, Any]) -> None:
+    """親プロセスと同じ API の設定（タイムアウト、カセット）を子プロセスに適用する"""
+    from sample.slumbot_api import SetTimeouts, SetTransport
+    from api.transport import RecordingTransport, ReplayTransport
+
+    if 'connect_timeout' in options or 'read_timeout' in options:
+        SetTimeouts(options.get('connect_timeout', 5.0), options.get('read_timeout', 30.0))
+    if options.get('replay_cassette'):
+        SetTransport(ReplayTransport(options['replay_cassette'],
+                                     realtime=options.get('replay_realtime', False),
+                                     loop=options.get('replay_loop', False)))
+    elif options.get('record_cassette'):
+        SetTransport(RecordingTransport(options['record_cassette']))
+
+
+class _ChildProgress(ProgressTracker):
+    """子プロセスの ProgressTracker。エラーの分類ごとの数を共有メモリの行にも書き込む"""
+
+    def __init__(self, total_hands: int, strategy: str, errors: np.ndarray):
+        super().__init__(total_hands, strategy)
+        self._error_row = errors
+
+    def record_error(self, category: str, count: int = 1) -> None:
+        super().record_error(category, count)
+        column = (ERROR_CATEGORIES.index(category) if category in ERROR_CATEGORIES
+                  else ERROR_CATEGORIES.index('other'))
+        self._error_row[column] += count
+
+
+def _run_process(index: int, hands: int, config: Dict[str, Any]) -> Dict[str, int]:
+    """
+    子プロセスで1つのセッションを実行する
+
+    収支は共有メモリの自分の行に書き込み、書いたハンド数を played[index] に
+    記録する（値を書いてから数を更新するので、親は数までの値を読める）。
+    """
+    from session.hand_history import HandHistoryWriter
+    from session.session_manager import SessionManager
+    from session.token_pool import TokenPool
+
+    _setup_process_logging(config['log_file'], config['log_level'])
+    _setup_api(config['api_options'])
+    tables = install_tables(config['tables'])
+    winnings = SharedArray.attach(config['winnings'])
+    played = SharedArray.attach(config['played'])
+    action_counts = SharedArray.attach(config['action_counts'])
+    control = SharedArray.attach(config['control'])
+    errors = SharedArray.attach(config['errors'])
+    row = winnings.array[index]
+    # 親プロセスからの停止要求を SessionManager に伝え、エラー数を親に渡す
+    progress = _ChildProgress(hands, config['strategy_type'], errors.array[index])
+
+    def on_hand(game_state: Dict[str, Any]) -> None:
+        count = int(played.array[index])
+        if count < row.shape[0]:
+            row[count] = game_state['winnings']
+            played.array[index] = count + 1
+        if control.array[0]:
+            progress.stop_requested.set()
+
+    strategy_options = dict(config['strategy_options'])
+    if config['strategy_type'] == 'resolve':
+        strategy_options['action_model'] = ActionFrequencyModel(
+            ACTION_MODEL_BUCKETS, shared_counts=action_counts.array, shard=index
+        )
+
+    hand_history = (HandHistoryWriter(config['hand_history'], line_buffered=True)
+                    if config['hand_history'] else None)
+    token_pool = TokenPool.from_file(config['accounts_file']).start() if config['accounts_file'] else None
+    try:
+        session = SessionManager(
+            total_hands=hands,
+            strategy_type=config['strategy_type'],
+            chunk_size=config['chunk_size'],
+            strategy_options=strategy_options,
+            token_pool=token_pool,
+            hand_history=hand_history,
+            on_hand=on_hand,
+            progress=progress,
+            **config['session_options']
+        )
+        session.run()
+        return dict(session.failure_counts)
+    finally:
+        if hand_history:
+            hand_history.close()
+        if token_pool:
+            token_pool.stop()
+        # 共有メモリを参照する配列を手放してから閉じる
+        del row, strategy_options, progress
+        for shared in (winnings, played, action_counts, control, errors, tables):
+            try:
+                shared.close()
+            except BufferError:
+                pass  # 戦略がまだ参照している（プロセス終了時に解放される）
+
+
+class ProcessSessionRunner:
+    """
+    複数のプロセスでセッションを並行実行し、結果を共有メモリ経由でまとめる
+
+    役評価のテーブルは共有メモリに一度だけ置いて全プロセスで参照し、
+    各プロセスの収支と相手のアクション頻度はプロセスごとの行に書き込んで
+    親プロセスが合計する。共有する配列は総ハンド数分だけなのでプロセス数に
+    よらないが、各プロセスはそれぞれインタープリターと NumPy を読み込むため、
+    メモリ使用量はプロセスごとに約 30MB 増える（benchmark.py --memory で計測）。
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        total_hands: int,
+        strategy_type: str = 'simple',
+        chunk_size: int = 1000,
+        strategy_options: Optional[Dict[str, Any]] = None,
+        session_options: Optional[Dict[str, Any]] = None,
+        hand_history: Optional[str] = None,
+        accounts_file: Optional[str] = None,
+        log_file: Optional[str] = None,
+        log_level: int = logging.WARNING,
+        progress: Optional[ProgressTracker] = None,
+        api_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Parameters:
+        -----------
+        processes : int
+            子プロセスの数
+        total_hands : int
+            全プロセス合計のハンド数
+        strategy_type : str
+            使用する戦略タイプ
+        chunk_size : int
+            各セッションのチャンクサイズ
+        strategy_options : Optional[Dict[str, Any]]
+            戦略のコンストラクタに渡すオプション
+        session_options : Optional[Dict[str, Any]]
+            SessionManager に渡す追加の引数（username, password, speculate など）
+        hand_history : Optional[str]
+            ハンド履歴を追記するファイル（全プロセス共通）
+        accounts_file : Optional[str]
+            各プロセスで TokenPool を作るアカウントファイル
+        log_file : Optional[str]
+            子プロセスのログを追記するファイル
+        log_level : int
+            子プロセスのログレベル
+        progress : Optional[ProgressTracker]
+            子プロセスの収支を逐次記録する先。停止が要求されると
+            各プロセスに伝える
+        api_options : Optional[Dict[str, Any]]
+            子プロセスの API 設定（connect_timeout, read_timeout,
+            record_cassette, replay_cassette, replay_realtime, replay_loop）
+        """
+        self.processes = max(1, min(processes, total_hands))
+        self.total_hands = total_hands
+        self.strategy_type = strategy_type
+        self.chunk_size = chunk_size
+        self.strategy_options = strategy_options or {}
+        self.session_options = session_options or {}
+        self.hand_history = hand_history
+        self.accounts_file = accounts_file
+        self.log_file = log_file
+        self.log_level = log_level
+        self.progress = progress
+        self.api_options = api_options or {}
+        self.failure_counts: Counter = Counter()
+        # 全プロセスのショーダウンから集めた相手のアクション頻度（run の後に設定）
+        self.action_counts: Optional[np.ndarray] = None
+
+    def _quotas(self):
+        base, extra = divmod(self.total_hands, self.processes)
+        return [base + (1 if i < extra else 0) for i in range(self.processes)]
+
+    def _report(self, winnings: SharedArray, played: SharedArray, errors: SharedArray,
+                reported, reported_errors: np.ndarray) -> None:
+        """前回から増えた各プロセスの収支とエラー数を progress に記録"""
+        for index in range(self.processes):
+            count = int(played.array[index])
+            for value in winnings.array[index, reported[index]:count].tolist():
+                self.progress.record_hand(value)
+            reported[index] = count
+        error_counts = errors.array.sum(axis=0)
+        for category, new_errors in zip(ERROR_CATEGORIES, (error_counts - reported_errors).tolist()):
+            if new_errors:
+                self.progress.record_error(category, new_errors)
+        reported_errors[:] = error_counts
+
+    def run(self) -> SessionAnalyzer:
+        """全プロセスのセッションを実行し、結果をまとめた SessionAnalyzer を返す"""
+        quotas = self._quotas()
+        table_block, tables = share_tables()
+        winnings = SharedArray.create((self.processes, max(quotas)), np.int32)
+        played = SharedArray.create((self.processes,), np.int64)
+        control = SharedArray.create((1,), np.int8)
+        errors = SharedArray.create((self.processes, len(ERROR_CATEGORIES)), np.int64)
+        action_counts = ShardedCounter.create(
+            self.processes, (2, NUM_ACTION_CLASSES, ACTION_MODEL_BUCKETS)
+        )
+        config = {
+            'tables': tables,
+            'winnings': winnings.spec,
+            'played': played.spec,
+            'action_counts': action_counts.spec,
+            'control': control.spec,
+            'errors': errors.spec,
+            'api_options': self.api_options,
+            'strategy_type': self.strategy_type,
+            'strategy_options': self.strategy_options,
+            'session_options': self.session_options,
+            'chunk_size': self.chunk_size,
+            'hand_history': self.hand_history,
+            'accounts_file': self.accounts_file,
+            'log_file': self.log_file,
+            'log_level': self.log_level,
+        }
+
+        try:
+            # スレッドを持つ親プロセスを fork しないよう spawn で起動する
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as executor:
+                futures = [executor.submit(_run_process, i, hands, config)
+                           for i, hands in enumerate(quotas)]
+                pending = futures
+                reported = [0] * self.processes
+                reported_errors = np.zeros(len(ERROR_CATEGORIES), np.int64)
+                last_log = time.time()
+                while pending:
+                    timeout = 1.0 if self.progress else PROGRESS_INTERVAL
+                    done, pending = wait(pending, timeout=timeout, return_when=FIRST_EXCEPTION)
+                    if self.progress:
+                        self._report(winnings, played, errors, reported, reported_errors)
+                        if self.progress.stop_requested.is_set():
+                            control.array[0] = 1
+                    if time.time() - last_log >= PROGRESS_INTERVAL or not pending:
+                        logging.info(f"Hands played: {int(played.array.sum())}/{self.total_hands} "
+                                     f"in {self.processes} processes")
+                        last_log = time.time()
+                for future in futures:
+                    try:
+                        self.failure_counts.update(future.result())
+                    except Exception as e:
+                        logging.error(f"Session process failed: {str(e)}")
+
+            analyzer = SessionAnalyzer()
+            for index in range(self.processes):
+                for value in winnings.array[index, :int(played.array[index])].tolist():
+                    analyzer.record_hand(value)
+            self.action_counts = action_counts.total()
+            return analyzer
+        finally:
+            for shared in (winnings, played, action_counts, control, errors, table_block):
+                shared.close()
@@ -0,0 +1,249 @@
+# src/session/progress.py
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from sample.slumbot_api import BIG_BLIND
+
+# 直近の速度・応答時間を集計する時間幅（秒）
+ROLLING_WINDOW = 60
+# セッションディレクトリ内の進捗ファイル名
+STATUS_FILE = 'status.json'
+
+
+class ProgressTracker:
+    """
+    セッションの進捗を逐次集計する
+
+    ハンドの収支は合計と二乗和だけを、速度と応答時間は1秒ごとのバケットを
+    ROLLING_WINDOW 個だけ保持するので、記録は O(1) で行える。
+    複数のセッション（スレッド）から同時に記録してよい。
+    """
+
+    def __init__(self, total_hands: int, strategy: Optional[str] = None):
+        """
+        Parameters:
+        -----------
+        total_hands : int
+            予定している総ハンド数
+        strategy : Optional[str]
+            表示用の戦略名
+        """
+        self.total_hands = total_hands
+        self.strategy = strategy
+        self.started = time.time()
+        self.stop_requested = threading.Event()
+
+        self._lock = threading.Lock()
+        self.hands = 0
+        self.total_winnings = 0
+        self.squared_winnings = 0.0
+        self.requests = 0
+        self.request_errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.errors: Counter = Counter()
+        # バケットごとの [時刻(秒), ハンド数, リクエスト数, 応答時間の合計]
+        self._buckets = [[-1, 0, 0, 0.0] for _ in range(ROLLING_WINDOW)]
+
+    def _bucket(self, now: float):
+        second = int(now)
+        bucket = self._buckets[second % ROLLING_WINDOW]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0, 0.0]
+        return bucket
+
+    def record_hand(self, winnings: int) -> None:
+        with self._lock:
+            self.hands += 1
+            self.total_winnings += winnings
+            self.squared_winnings += winnings * winnings
+            self._bucket(time.time())[1] += 1
+
+    def record_error(self, category: str, count: int = 1) -> None:
+        """放棄したハンドのエラー分類を記録"""
+        with self._lock:
+            self.errors[category] += count
+
+    def record_request(self, latency: float, ok: bool = True) -> None:
+        """APIリクエスト1回の応答時間（秒）を記録"""
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.request_errors += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            bucket = self._bucket(time.time())
+            bucket[2] += 1
+            bucket[3] += latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の集計値（status.json と /status の内容）"""
+        now = time.time()
+        with self._lock:
+            recent = [b for b in self._buckets if now - ROLLING_WINDOW < b[0] <= now]
+            recent_hands = sum(b[1] for b in recent)
+            recent_requests = sum(b[2] for b in recent)
+            recent_latency = sum(b[3] for b in recent)
+            hands, total = self.hands, self.total_winnings
+            squared = self.squared_winnings
+            requests, total_latency = self.requests, self.total_latency
+            max_latency, request_errors = self.max_latency, self.request_errors
+            errors = dict(self.errors)
+
+        elapsed = now - self.started
+        window = min(elapsed, ROLLING_WINDOW) or 1.0
+        rolling_rate = recent_hands / window
+        status = {
+            'strategy': self.strategy,
+            'hands': hands,
+            'total_hands': self.total_hands,
+            'elapsed_seconds': round(elapsed, 1),
+            'hands_per_second': round(rolling_rate, 3),
+            'overall_hands_per_second': round(hands / elapsed, 3) if elapsed > 0 else 0.0,
+            'eta_seconds': (round((self.total_hands - hands) / rolling_rate)
+                            if rolling_rate > 0 and hands < self.total_hands else None),
+            'requests': requests,
+            'request_errors': request_errors,
+            'latency_ms': (round(1000 * recent_latency / recent_requests, 1)
+                           if recent_requests else None),
+            'overall_latency_ms': round(1000 * total_latency / requests, 1) if requests else None,
+            'max_latency_ms': round(1000 * max_latency, 1),
+            'total_winnings': total,
+            'bb_per_100': None,
+            'ci95_bb_per_100': None,
+            'errors': errors,
+            'stop_requested': self.stop_requested.is_set(),
+            'updated': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+        }
+        if hands:
+            mean = total / hands
+            variance = max(squared / hands - mean * mean, 0.0)
+            scale = 100 / BIG_BLIND
+            status['bb_per_100'] = round(mean * scale, 2)
+            status['ci95_bb_per_100'] = round(1.96 * math.sqrt(variance / hands) * scale, 2)
+        return status
+
+    def timed(self, post):
+        """API送信関数を包み、応答時間を記録する（sample.slumbot_api.SetTransport 用）"""
+        def timed_post(endpoint, data):
+            start = time.perf_counter()
+            try:
+                result = post(endpoint, data)
+            except Exception:
+                self.record_request(time.perf_counter() - start, ok=False)
+                raise
+            self.record_request(time.perf_counter() - start, ok=result[0] == 200)
+            return result
+        return timed_post
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    tracker: ProgressTracker
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path in ('/', '/status'):
+            self._send_json(200, self.tracker.snapshot())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path == '/stop':
+            self.tracker.stop_requested.set()
+            logging.warning("Stop requested through the status endpoint")
+            self._send_json(200, {'stopping': True})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        logging.debug(f"Status endpoint: {format % args}")
+
+
+class StatusReporter:
+    """
+    ProgressTracker の集計値を定期的に status.json に書き出し、
+    指定があれば localhost の HTTP エンドポイントでも返す
+
+    GET /status で現在の値を、POST /stop で現在のハンドの後にセッションを
+    終了させる。
+    """
+
+    def __init__(self, tracker: ProgressTracker, path: Optional[Union[str, Path]] = None,
+                 interval: float = 5.0, port: Optional[int] = None, host: str = '127.0.0.1'):
+        """
+        Parameters:
+        -----------
+        tracker : ProgressTracker
+            集計元
+        path : Optional[Union[str, Path]]
+            書き出すファイル（None の場合は書き出さない）
+        interval : float
+            書き出す間隔（秒）
+        port : Optional[int]
+            HTTP エンドポイントのポート（None の場合は起動しない、0 の場合は空いているポート）
+        host : str
+            HTTP エンドポイントのホスト
+        """
+        self.tracker = tracker
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self.address = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        if port is not None:
+            handler = type('StatusHandler', (_StatusHandler,), {'tracker': tracker})
+            self._server = ThreadingHTTPServer((host, port), handler)
+            self._server.daemon_threads = True
+            self.address = self._server.server_address[:2]
+
+    def start(self) -> 'StatusReporter':
+        if self.path:
+            self._thread = threading.Thread(target=self._write_loop, name='status-writer', daemon=True)
+            self._thread.start()
+        if self._server:
+            threading.Thread(target=self._server.serve_forever, name='status-endpoint',
+                             daemon=True).start()
+        return self
+
+    def write(self) -> None:
+        """現在の値を書き出す（読み手が途中の内容を見ないよう置き換える）"""
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.tracker.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _write_loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logging.warning(f"Could not write status file: {str(e)}")
+
+    def stop(self) -> None:
+        """最終的な値を書き出して終了する"""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        if self.path:
+            self.write()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -2,13 +2,49 @@
 
 import time
 import logging
-from typing import Optional, Dict, Any, Tuple
+from collections import Counter
+from typing import Optional, Dict, Any, Callable, Tuple
 from datetime import datetime, timedelta
 
-from sample.slumbot_api import NewHand, Act
+from sample.slumbot_api import (
+    NewHand, AuthError, IllegalActionError, RequestTimeout, ServerError, TransportError
+)
 from analysis.session_analyzer import SessionAnalyzer
+from analysis.sequential_test import ConfidenceSequence
 from strategy.factory import create_strategy
-from utils.session_utils import execute_with_retry, with_valid_token
+from strategy.legal_actions import sanitize_action
+from session.speculation import Speculator
+from session.token_pool import TokenPool
+from session.hand_history import HandHistoryWriter
+from session.progress import ProgressTracker
+from utils.session_utils import act_with_reconciliation, with_valid_token
+from utils.logging_utils import HAND_LOGGER_NAME
+
+hand_logger = logging.getLogger(HAND_LOGGER_NAME)
+
+# TokenPool から有効なトークンを待つ最大秒数
+TOKEN_WAIT_TIMEOUT = 60.0
+# 連続でこの回数ハンドが失敗したらチャンクを中断する
+MAX_CONSECUTIVE_FAILURES = 10
+# 通信・サーバーエラー後の待機時間の基準（秒）
+FAILURE_BACKOFF = 1.0
+
+# failure_category が返す分類
+ERROR_CATEGORIES = ('timeout', 'transport', 'server', 'auth', 'illegal_action', 'other')
+
+def failure_category(error: Exception) -> str:
+    """ハンド失敗の分類（最終サマリーでの集計用）"""
+    if isinstance(error, RequestTimeout):
+        return 'timeout'
+    if isinstance(error, TransportError):
+        return 'transport'
+    if isinstance(error, ServerError):
+        return 'server'
+    if isinstance(error, AuthError):
+        return 'auth'
+    if isinstance(error, IllegalActionError):
+        return 'illegal_action'
+    return 'other'
 
 class SessionManager:
     """ポーカーセッションの管理クラス"""
@@ -19,7 +55,15 @@ class SessionManager:
         strategy_type: str = 'simple',
         chunk_size: int = 1000,
         username: Optional[str] = None,
-        password: Optional[str] = None
+        password: Optional[str] = None,
+        strategy_options: Optional[Dict[str, Any]] = None,
+        speculate: bool = False,
+        token_pool: Optional[TokenPool] = None,
+        early_stop_alpha: Optional[float] = None,
+        variance_reduction: bool = False,
+        hand_history: Optional[HandHistoryWriter] = None,
+        on_hand: Optional[Callable[[Dict[str, Any]], None]] = None,
+        progress: Optional[ProgressTracker] = None
     ):
         """
         Parameters:
@@ -34,14 +78,43 @@ class SessionManager:
             APIユーザー名（オプション）
         password : Optional[str]
             APIパスワード（オプション）
+        strategy_options : Optional[Dict[str, Any]]
+            戦略のコンストラクタに渡すオプション（例: policy_file）
+        speculate : bool
+            API待ちの間に次の判断を先行計算するかどうか
+        token_pool : Optional[TokenPool]
+            複数アカウントのトークンを共有するプール（指定時は username/password を使わない）
+        early_stop_alpha : Optional[float]
+            指定時はチャンクごとに勝率の逐次検定を行い、この誤り率で
+            結論が出た時点でセッションを終了する
+        variance_reduction : bool
+            AIVAT 方式の分散を抑えた勝率推定を併せて計算するかどうか
+        hand_history : Optional[HandHistoryWriter]
+            終了したハンドを書き出す先（オプション）
+        on_hand : Optional[Callable[[Dict[str, Any]], None]]
+            ハンドが終了するたびに最終状態を渡して呼ぶ関数（オプション）
+        progress : Optional[ProgressTracker]
+            進捗を逐次記録する先（オプション）。停止が要求されると
+            現在のハンドの後でセッションを終了する
         """
         self.total_hands = total_hands
         self.chunk_size = min(chunk_size, total_hands)
         self.strategy_type = strategy_type
         self.username = username
         self.password = password
-        self.analyzer = SessionAnalyzer()
-        self.strategy = create_strategy(strategy_type)
+        self.variance_reduction = variance_reduction
+        self.hand_history = hand_history
+        self.on_hand = on_hand
+        self.progress = progress
+        self.analyzer = SessionAnalyzer(variance_reduction)
+        self.strategy = create_strategy(strategy_type, **(strategy_options or {}))
+        self.speculator = Speculator() if speculate else None
+        self.token_pool = token_pool
+        self.failure_counts: Counter = Counter()
+        self.sequential_test = (
+            ConfidenceSequence(alpha=early_stop_alpha, planned_hands=total_hands)
+            if early_stop_alpha else None
+        )
         
     def _play_chunk(
         self,
@@ -63,40 +136,85 @@ class SessionManager:
         Tuple[SessionAnalyzer, Optional[str]]
             (チャンクの分析結果, 更新されたトークン)
         """
-        chunk_analyzer = SessionAnalyzer()
+        chunk_analyzer = SessionAnalyzer(self.variance_reduction)
         current_token = token
         hands_played = 0
+        consecutive_failures = 0
+        # プール使用時はチャンクの間だけアカウントを借りる
+        lease = self.token_pool.acquire(TOKEN_WAIT_TIMEOUT) if self.token_pool else None
         
         try:
-            def execute_hand():
-                nonlocal current_token, hands_played
-                result = play_single_hand(
-                    strategy=self.strategy,
-                    current_token=current_token,
-                    username=self.username,
-                    password=self.password
-                )
+            while hands_played < chunk_size and not self._stop_requested():
+                try:
+                    if self.token_pool:
+                        result = play_hand(self.strategy, lease.token, self.speculator)
+                        lease.update_token(result.get('token'))
+                    else:
+                        result = play_single_hand(
+                            strategy=self.strategy,
+                            current_token=current_token,
+                            username=self.username,
+                            password=self.password,
+                            speculator=self.speculator
+                        )
+                except Exception as e:
+                    # 壊れたハンドは破棄し、次のハンドから再開する
+                    category = failure_category(e)
+                    self.failure_counts[category] += 1
+                    if self.progress:
+                        self.progress.record_error(category)
+                    consecutive_failures += 1
+                    if self.speculator:
+                        self.speculator.discard()
+                    logging.warning(f"Abandoning hand after {category} error: {str(e)}")
+                    
+                    if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                        raise
+                    if isinstance(e, AuthError):
+                        # トークンを破棄して再取得させる
+                        current_token = None
+                        if lease:
+                            lease.report_failure()
+                            lease.release()
+                            lease = None
+                            try:
+                                lease = self.token_pool.acquire(TOKEN_WAIT_TIMEOUT)
+                            except TimeoutError:
+                                # プール使用時はトークンなしでプレイせず、チャンクを中断する
+                                logging.error("No healthy token available after auth error; "
+                                              "stopping chunk")
+                                raise
+                    elif not isinstance(e, IllegalActionError):
+                        time.sleep(min(FAILURE_BACKOFF * 2 ** (consecutive_failures - 1), 30.0))
+                    continue
+                
+                consecutive_failures = 0
                 current_token = result['token']
                 if 'winnings' in result:
-                    chunk_analyzer.record_hand(result['winnings'])
+                    chunk_analyzer.record_hand(result['winnings'], result)
+                    if self.hand_history:
+                        self.hand_history.write(result, self.strategy_type)
+                    if self.on_hand:
+                        self.on_hand(result)
+                    if self.progress:
+                        self.progress.record_hand(result['winnings'])
+                    if self.sequential_test:
+                        self.sequential_test.update(result['winnings'])
                     hands_played += 1
-                return result
-            
-            while hands_played < chunk_size:
-                execute_with_retry(
-                    execute_hand,
-                    max_retries=3,
-                    delay=1.0,
-                    exponential_backoff=True
-                )
                 
         except Exception as e:
             logging.error(f"Error in chunk: {str(e)}")
             if hands_played == 0:
                 raise  # チャンク内で1ハンドも成功していない場合は例外を再送出
+        finally:
+            if lease:
+                lease.release()
             
         return chunk_analyzer, current_token
 
+    def _stop_requested(self) -> bool:
+        return bool(self.progress and self.progress.stop_requested.is_set())
+
     def run(self) -> SessionAnalyzer:
         """
         セッション全体を実行
@@ -131,6 +249,14 @@ class SessionManager:
                     # 進捗とパフォーマンスの報告
                     self._report_progress(chunk + 1, chunks, start_time)
                     
+                    # 勝率の検定で結論が出ていれば残りのハンドは省略
+                    if self.sequential_test and self.sequential_test.is_conclusive():
+                        logging.info(f"Stopping early: {self.sequential_test.summary()}")
+                        break
+                    if self._stop_requested():
+                        logging.warning("Stopping session on request")
+                        break
+                    
                     # チャンク間で待機（最後のチャンク以外）
                     if chunk < chunks - 1:
                         time.sleep(1)
@@ -142,6 +268,9 @@ class SessionManager:
         except KeyboardInterrupt:
             logging.warning("Session interrupted by user.")
         finally:
+            self.strategy.close()
+            if self.speculator:
+                self.speculator.close()
             duration = datetime.now() - start_time
             self._report_final_results(completed_chunks, chunks, duration)
             
@@ -173,16 +302,41 @@ class SessionManager:
             f"Final balance: {self.analyzer.cumulative_winnings:,} chips\n"
             f"Average per hand: {self.analyzer.cumulative_winnings/self.analyzer.hands_played:,.1f}"
         )
+        reduced = self.analyzer.variance_reduction() if self.variance_reduction else None
+        if reduced:
+            logging.info(
+                f"Variance-reduced average per hand: {reduced['adjusted_average_per_hand']:,.1f} "
+                f"(std error {reduced['adjusted_std_error']:,.1f} vs {reduced['raw_std_error']:,.1f} raw, "
+                f"variance reduction factor {reduced['variance_reduction_factor']:.2f})"
+            )
+        if self.sequential_test:
+            logging.info(self.sequential_test.summary())
+            if self.sequential_test.is_conclusive():
+                logging.info(
+                    f"Early stop saved {self.total_hands - self.analyzer.hands_played} hands"
+                )
+        if self.failure_counts:
+            failures = ', '.join(
+                f"{category}={count}" for category, count in sorted(self.failure_counts.items())
+            )
+            logging.info(f"Abandoned hands by error: {failures}")
+        if self.speculator:
+            logging.info(
+                f"Speculation: {self.speculator.hits} hits, {self.speculator.misses} misses "
+                f"({self.speculator.hit_rate * 100:.1f}% hit rate), "
+                f"{self.speculator.unpredicted} unpredicted states"
+            )
 
 @with_valid_token
 def play_single_hand(
     strategy: Any,
     current_token: Optional[str] = None,
     username: Optional[str] = None,
-    password: Optional[str] = None
+    password: Optional[str] = None,
+    speculator: Optional[Speculator] = None
 ) -> Dict[str, Any]:
     """
-    単一ハンドをプレイ
+    単一ハンドをプレイ（トークンの検証・再取得付き）
 
     Parameters:
     -----------
@@ -194,19 +348,70 @@ def play_single_hand(
         APIユーザー名（オプション）
     password : Optional[str]
         APIパスワード（オプション）
+    speculator : Optional[Speculator]
+        Act の待ち時間に次の判断を先行計算する Speculator（オプション）
 
     Returns:
     --------
     Dict[str, Any]
         ゲーム状態の辞書
     """
+    return play_hand(strategy, current_token, speculator)
+
+def play_hand(
+    strategy: Any,
+    current_token: Optional[str] = None,
+    speculator: Optional[Speculator] = None
+) -> Dict[str, Any]:
+    """
+    単一ハンドをプレイ（トークンはそのまま使用する）
+
+    TokenPool のようにトークンを呼び出し側で管理する場合に使う。
+    """
     game_state = NewHand(current_token)
     token = game_state.get('token', current_token)
+    decisions = []
     
     while 'winnings' not in game_state:
+        if speculator:
+            speculator.resolve(strategy, game_state)
         action = strategy.decide_action(game_state)
-        game_state = Act(token, action)
+        legal_action = sanitize_action(game_state.get('action', ''), action)
+        if legal_action != action:
+            logging.warning(f"Illegal action {action!r} replaced with {legal_action!r}")
+            action = legal_action
+        decision = strategy.decision_values()
+        if decision:
+            policy, values = decision
+            decisions.append({'policy': policy, 'values': values, 'action': action})
+        if hand_logger.isEnabledFor(logging.DEBUG):
+            hand_logger.debug(
+                f"Action: {game_state.get('action', '')!r} -> {action!r}",
+                extra={'hand': {'action': game_state.get('action', ''), 'decision': action}}
+            )
+        if speculator:
+            speculator.start(strategy, game_state, action)
+        game_state = act_with_reconciliation(token, game_state.get('action', ''), action)
         token = game_state.get('token', token)
         
+    if speculator:
+        speculator.discard()
+    strategy.observe_result(game_state)
+        
+    if hand_logger.isEnabledFor(logging.INFO):
+        hand_logger.info(
+            f"Hand finished: {game_state.get('action', '')!r}, "
+            f"winnings {game_state['winnings']}",
+            extra={'hand': {
+                'action': game_state.get('action', ''),
+                'client_pos': game_state.get('client_pos'),
+                'hole_cards': game_state.get('hole_cards'),
+                'bot_hole_cards': game_state.get('bot_hole_cards'),
+                'board': game_state.get('board'),
+                'winnings': game_state['winnings'],
+            }}
+        )
+        
     game_state['token'] = token
+    game_state['decisions'] = decisions
     return game_state
\ No newline at end of file
@@ -0,0 +1,168 @@
+# src/session/shared_state.py
+
+"""
+プロセス間で共有するメモリ（multiprocessing.shared_memory）
+
+読み取り専用のテーブルは親プロセスが一度だけ共有メモリに置き、子プロセスは
+それを参照する。書き込むカウンターはプロセスごとのシャードに分け、
+各シャードの書き手は1プロセスだけにすることでロックを使わずに更新し、
+親プロセスが合計する。
+"""
+
+import importlib
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 子プロセスで共有メモリ版に差し替えるモジュール変数（モジュール名: 変数名）
+SHARED_TABLES: Dict[str, Tuple[str, ...]] = {
+    'utils.hand_eval': ('COMBOS', 'CARD_MASK'),
+    'strategy.opponent_range': ('COMBOS', 'CARD_MASK', 'PREFLOP_STRENGTH'),
+}
+
+# (共有メモリ名, 形状, dtype) の組。子プロセスへ渡せるようにタプルで表す
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+class SharedArray:
+    """共有メモリ上の NumPy 配列"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Sequence[int], dtype,
+                 owner: bool):
+        self.shm = shm
+        self.array = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, shape: Sequence[int], dtype=np.float64,
+               data: Optional[np.ndarray] = None) -> 'SharedArray':
+        """
+        新しい共有メモリを確保する（ゼロ初期化、data を指定した場合はその内容）
+
+        Parameters:
+        -----------
+        shape : Sequence[int]
+            配列の形状
+        dtype :
+            要素の型
+        data : Optional[np.ndarray]
+            初期値としてコピーする配列
+        """
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, owner=True)
+        if data is not None:
+            shared.array[...] = data
+        else:
+            shared.array.fill(0)
+        return shared
+
+    @classmethod
+    def attach(cls, spec: ArraySpec, readonly: bool = False) -> 'SharedArray':
+        """親プロセスが作った共有メモリを参照する"""
+        name, shape, dtype = spec
+        shared = cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+        if readonly:
+            shared.array.flags.writeable = False
+        return shared
+
+    @property
+    def spec(self) -> ArraySpec:
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self) -> None:
+        """参照を外す（作成したプロセスでは共有メモリも解放する）"""
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ShardedCounter:
+    """
+    プロセスごとのシャードに分けたカウンター
+
+    形状 (shards, *shape) の共有配列で、プロセス i はシャード i だけに
+    書き込むためロックは不要。合計は total() で求める。
+    """
+
+    def __init__(self, shared: SharedArray):
+        self.shared = shared
+
+    @classmethod
+    def create(cls, shards: int, shape: Sequence[int] = (), dtype=np.float64) -> 'ShardedCounter':
+        return cls(SharedArray.create((shards,) + tuple(shape), dtype))
+
+    @classmethod
+    def attach(cls, spec: ArraySpec) -> 'ShardedCounter':
+        return cls(SharedArray.attach(spec))
+
+    @property
+    def spec(self) -> ArraySpec:
+        return self.shared.spec
+
+    @property
+    def shards(self) -> np.ndarray:
+        """全シャードの配列（形状 (shards, *shape)）"""
+        return self.shared.array
+
+    def shard(self, index: int) -> np.ndarray:
+        """プロセス index が書き込むシャード"""
+        return self.shared.array[index]
+
+    def total(self) -> np.ndarray:
+        return self.shared.array.sum(axis=0)
+
+    def close(self) -> None:
+        self.shared.close()
+
+
+def share_tables() -> Tuple[SharedArray, Dict[str, ArraySpec]]:
+    """
+    SHARED_TABLES のテーブルを1つの共有メモリにまとめて置く
+
+    Returns:
+    --------
+    Tuple[SharedArray, Dict[str, ArraySpec]]
+        テーブル全体を保持する共有メモリ（終了時に close する）と、
+        install_tables に渡すテーブルごとの位置
+    """
+    tables: Dict[str, np.ndarray] = {}
+    for module_name, names in SHARED_TABLES.items():
+        module = importlib.import_module(module_name)
+        for name in names:
+            tables.setdefault(name, getattr(module, name))
+
+    # 8バイト境界に揃えて1つのバッファに詰める
+    offsets, size = {}, 0
+    for name, table in tables.items():
+        offsets[name] = size
+        size += -(-table.nbytes // 8) * 8
+    block = SharedArray.create((size,), np.uint8)
+    layout = {}
+    for name, table in tables.items():
+        start = offsets[name]
+        block.array[start:start + table.nbytes] = np.ascontiguousarray(table).view(np.uint8).ravel()
+        layout[name] = (start, table.shape, table.dtype.str)
+    return block, {'block': block.spec, 'tables': layout}
+
+
+def install_tables(shared: Dict) -> SharedArray:
+    """
+    子プロセスのモジュール変数を共有メモリ上の読み取り専用テーブルに差し替える
+
+    差し替え前に作られたテーブルは参照がなくなり解放されるので、
+    プロセスが増えてもテーブルのメモリは1つ分のまま（合わせて約 100KB と
+    小さく、プロセスごとのメモリはほぼインタープリター自身が占める）。
+    戻り値の共有メモリはプロセスの終了まで保持すること。
+    """
+    block = SharedArray.attach(shared['block'], readonly=True)
+    views = {}
+    for name, (start, shape, dtype) in shared['tables'].items():
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        views[name] = block.array[start:start + nbytes].view(dtype).reshape(shape)
+    for module_name, names in SHARED_TABLES.items():
+        module = importlib.import_module(module_name)
+        for name in names:
+            setattr(module, name, views[name])
+    return block
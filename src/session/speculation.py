@@ -0,0 +1,186 @@
+# src/session/speculation.py
+
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sample.slumbot_api import ParseAction
+from strategy.base_strategy import BaseStrategy
+from strategy.blueprint_strategy import label_to_action
+
+# 相手の応答として予測するアクション（チェック/コール、ポット比のベット、オールイン）
+DEFAULT_REPLY_LABELS = ('c', 'p1', 'p0.5', 'p0.75', 'a')
+
+_BET_PATTERN = re.compile(r'^(.*b)(\d+)$')
+
+
+def _reply_class(reply: str) -> Tuple[str, int]:
+    """
+    応答の種類と額
+
+    ベットは額を除いた部分（'b' や '/b'）と額、それ以外は末尾の '/' を除いた
+    文字列そのもの（'k'、'c'、自分のアクションでストリートが終わった場合は ''）。
+    """
+    reply = reply.rstrip('/')
+    match = _BET_PATTERN.match(reply)
+    if match:
+        return match.group(1), int(match.group(2))
+    return reply, 0
+
+
+def _after(action: str, incr: str) -> Optional[Tuple[str, Dict]]:
+    """action に incr を加えた状態（ストリートが終わった場合は '/' を付ける）"""
+    before = ParseAction(action)
+    after = ParseAction(action + incr)
+    if 'error' in before or 'error' in after:
+        return None
+    if after['st'] > before['st'] and after['pos'] != -1:
+        incr += '/'
+    return action + incr, after
+
+
+def predict_next_states(
+    game_state: Dict,
+    incr: str,
+    reply_labels: Sequence[str] = DEFAULT_REPLY_LABELS
+) -> List[Dict]:
+    """
+    自分のアクションの後、次に自分が判断する可能性の高い状態を予測
+
+    同じストリートで判断が回ってくる相手のベット/レイズに加え、相手の
+    チェック/コール（または自分のコール）でストリートが終わり、次の
+    ストリートで判断が回ってくる状態も含める。次のストリートのカードは
+    分からないので、予測した状態の board は現在のまま。
+    """
+    me = game_state.get('client_pos', 0)
+    result = _after(game_state.get('action', ''), incr)
+    if result is None or result[1]['pos'] == -1:
+        return []
+    action, action_info = result
+
+    states = []
+    if action_info['pos'] == me:
+        # 自分のアクションでストリートが終わり、次も自分から行動する
+        predicted = dict(game_state)
+        predicted['action'] = action
+        states.append(predicted)
+        return states
+
+    seen = set()
+    for label in reply_labels:
+        reply = label_to_action(label, action_info)
+        if reply is None or reply in seen:
+            continue
+        seen.add(reply)
+        result = _after(action, reply)
+        # フォールドや最終ストリートの終了、相手から続けて行動する場合は除く
+        if result is None or result[1]['pos'] != me:
+            continue
+        predicted = dict(game_state)
+        predicted['action'] = result[0]
+        states.append(predicted)
+    return states
+
+
+class Speculator:
+    """
+    API待ちの間に、予測される次の状態の戦略計算を先行実行する
+
+    start() を Act の送信直前に呼び、応答を受け取った後に resolve() を呼ぶ。
+    実際の状態と応答の種類（ベットは最も近い額）が一致する予測があれば、
+    その結果を strategy.use_precomputed() に渡す。予測したどの種類にも
+    当たらない状態（unpredicted）は外れ（misses）には数えない。
+    """
+
+    def __init__(self, reply_labels: Sequence[str] = DEFAULT_REPLY_LABELS):
+        self.reply_labels = tuple(reply_labels)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speculate')
+        # 予測ごとの (応答, Future, 停止フラグ)
+        self._pending: List[Tuple[str, Future, threading.Event]] = []
+        self._prefix = ''
+        self._hole_cards: List[str] = []
+        self.hits = 0
+        self.misses = 0
+        self.unpredicted = 0
+
+    def start(self, strategy: BaseStrategy, game_state: Dict, incr: str) -> None:
+        """予測される状態ごとに先行計算を登録（可能性の高い順に実行）"""
+        self.discard()
+        self._prefix = game_state.get('action', '') + incr
+        self._hole_cards = list(game_state.get('hole_cards', []))
+        for predicted in predict_next_states(game_state, incr, self.reply_labels):
+            work = strategy.speculative_work(predicted)
+            if work is None:
+                continue
+            stop = threading.Event()
+
+            def run(work=work, stop=stop):
+                return None if stop.is_set() else work(stop)
+
+            reply = predicted['action'][len(self._prefix):]
+            self._pending.append((reply, self._executor.submit(run), stop))
+
+    def _match(self, game_state: Dict) -> Optional[int]:
+        """実際の状態と応答の種類が一致する予測の位置（ベットは最も近い額）"""
+        action = game_state.get('action', '')
+        if (list(game_state.get('hole_cards', [])) != self._hole_cards
+                or not action.startswith(self._prefix)):
+            return None
+        kind, amount = _reply_class(action[len(self._prefix):])
+        best, best_distance = None, None
+        for index, (reply, _, _) in enumerate(self._pending):
+            reply_kind, reply_amount = _reply_class(reply)
+            distance = abs(reply_amount - amount)
+            if reply_kind == kind and (best_distance is None or distance < best_distance):
+                best, best_distance = index, distance
+        return best
+
+    def resolve(self, strategy: BaseStrategy, game_state: Dict) -> bool:
+        """実際の状態に一致する先行計算があれば結果を戦略に渡す"""
+        if not self._pending:
+            return False
+        index = self._match(game_state)
+        if index is None:
+            self.discard()
+            self.unpredicted += 1
+            return False
+        _, future, _ = self._pending.pop(index)
+        # まだ開始していない計算は待たずに通常の判断に任せる
+        cancelled = future.cancel()
+        self.discard()
+        if cancelled:
+            self.misses += 1
+            return False
+
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.warning(f"Speculative precompute failed: {str(e)}")
+            self.misses += 1
+            return False
+        if result is None:
+            self.misses += 1
+            return False
+        strategy.use_precomputed(game_state, result)
+        self.hits += 1
+        return True
+
+    def discard(self) -> None:
+        """未使用の先行計算を破棄（実行中のものには停止を伝え、完了は待たない）"""
+        for _, future, stop in self._pending:
+            stop.set()
+            future.cancel()
+        self._pending = []
+
+    @property
+    def hit_rate(self) -> float:
+        """予測した状態のうち先行計算を使えた割合"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self) -> None:
+        """ワーカースレッドを停止"""
+        self.discard()
+        self._executor.shutdown(wait=False)
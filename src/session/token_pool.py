@@ -0,0 +1,236 @@
+# src/session/token_pool.py
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sample.slumbot_api import Login
+
+
+class _Account:
+    """アカウントごとのトークンと状態"""
+
+    def __init__(self, username: str, password: str):
+        self.username = username
+        self.password = password
+        self.token: Optional[str] = None
+        self.issued_at = 0.0
+        self.in_use = False
+        self.healthy = True
+        self.failures = 0
+        self.refreshing = False
+        self.needs_refresh = True
+        self.next_attempt = 0.0
+
+
+class TokenLease:
+    """TokenPool から貸し出されたアカウント"""
+
+    def __init__(self, pool: 'TokenPool', username: str):
+        self.pool = pool
+        self.username = username
+
+    @property
+    def token(self) -> Optional[str]:
+        """現在のトークン（バックグラウンド更新後は新しいトークンを返す）"""
+        return self.pool._current_token(self.username)
+
+    def update_token(self, token: Optional[str]) -> None:
+        """API応答で新しいトークンを受け取った場合に呼ぶ"""
+        if token:
+            self.pool._store_token(self.username, token)
+
+    def report_failure(self) -> None:
+        self.pool.report_failure(self.username)
+
+    def release(self) -> None:
+        self.pool.release(self)
+
+
+class TokenPool:
+    """
+    複数アカウントのトークンを管理し、並行セッションに貸し出す
+
+    ログインはバックグラウンドのスレッドで行い、期限の近いトークンは
+    事前に更新する。失敗が続いたアカウントはローテーションから外し、
+    バックオフ後に再ログインを試みる。
+    """
+
+    def __init__(
+        self,
+        credentials: List[Tuple[str, str]],
+        max_token_age: float = 1800.0,
+        refresh_margin: float = 0.2,
+        max_failures: int = 3,
+        check_interval: float = 5.0,
+        login: Callable[[str, str], str] = Login
+    ):
+        """
+        Parameters:
+        -----------
+        credentials : List[Tuple[str, str]]
+            (ユーザー名, パスワード) のリスト
+        max_token_age : float
+            トークンを使い続ける最大秒数
+        refresh_margin : float
+            期限のこの割合だけ前に更新を始める
+        max_failures : int
+            連続でこの回数失敗したアカウントを不健全とみなす
+        check_interval : float
+            バックグラウンド更新の確認間隔（秒）
+        login : Callable[[str, str], str]
+            ログイン関数（トークンを返す）
+        """
+        if not credentials:
+            raise ValueError("TokenPool requires at least one account")
+        self.max_token_age = max_token_age
+        self.refresh_margin = refresh_margin
+        self.max_failures = max_failures
+        self.check_interval = check_interval
+        self._login = login
+        self._accounts: Dict[str, _Account] = {
+            username: _Account(username, password) for username, password in credentials
+        }
+        self._order = list(self._accounts)
+        self._next = 0
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(len(self._accounts), 4), thread_name_prefix='token-login'
+        )
+        self._thread = threading.Thread(target=self._refresh_loop, name='token-refresh', daemon=True)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], **kwargs) -> 'TokenPool':
+        """[{"username": ..., "password": ...}, ...] 形式のJSONファイルから作成"""
+        with open(path) as f:
+            entries = json.load(f)
+        return cls([(entry['username'], entry['password']) for entry in entries], **kwargs)
+
+    def start(self) -> 'TokenPool':
+        """バックグラウンド更新を開始"""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """バックグラウンド更新を停止"""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._executor.shutdown(wait=False)
+
+    def _is_fresh(self, account: _Account, now: float) -> bool:
+        return account.token is not None and now - account.issued_at < self.max_token_age
+
+    def _refresh_loop(self) -> None:
+        while not self._stopped.is_set():
+            now = time.time()
+            due = []
+            with self._cond:
+                for account in self._accounts.values():
+                    if account.refreshing or now < account.next_attempt:
+                        continue
+                    age = now - account.issued_at
+                    expiring = age > self.max_token_age * (1 - self.refresh_margin)
+                    if account.needs_refresh or account.token is None or expiring:
+                        account.refreshing = True
+                        due.append(account)
+            for account in due:
+                self._executor.submit(self._refresh, account)
+            self._stopped.wait(self.check_interval)
+
+    def _refresh(self, account: _Account) -> None:
+        """1アカウントの再ログイン（ログインは他のアカウントと並行に行う）"""
+        try:
+            token = self._login(account.username, account.password)
+        except Exception as e:
+            token = None
+            logging.warning(f"Login failed for {account.username}: {str(e)}")
+
+        with self._cond:
+            account.refreshing = False
+            if token:
+                account.token = token
+                account.issued_at = time.time()
+                account.failures = 0
+                account.healthy = True
+                account.needs_refresh = False
+                account.next_attempt = 0.0
+            else:
+                account.failures += 1
+                if account.failures >= self.max_failures:
+                    account.healthy = False
+                account.next_attempt = time.time() + min(2 ** account.failures, 300)
+            self._cond.notify_all()
+
+    def acquire(self, timeout: Optional[float] = None) -> TokenLease:
+        """
+        健全で有効なトークンを持つ未使用のアカウントを貸し出す
+
+        利用可能になるまで待機し、timeout を過ぎた場合は TimeoutError を送出する。
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                for offset in range(len(self._order)):
+                    index = (self._next + offset) % len(self._order)
+                    account = self._accounts[self._order[index]]
+                    if account.in_use or not account.healthy or not self._is_fresh(account, now):
+                        continue
+                    account.in_use = True
+                    self._next = (index + 1) % len(self._order)
+                    return TokenLease(self, account.username)
+
+                if self._stopped.is_set():
+                    raise RuntimeError("TokenPool is stopped")
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No healthy token available")
+                self._cond.wait(remaining if remaining is not None else self.check_interval)
+
+    def release(self, lease: TokenLease) -> None:
+        """アカウントをプールに返却"""
+        with self._cond:
+            account = self._accounts[lease.username]
+            account.in_use = False
+            self._cond.notify_all()
+
+    def _current_token(self, username: str) -> Optional[str]:
+        with self._cond:
+            return self._accounts[username].token
+
+    def _store_token(self, username: str, token: str) -> None:
+        with self._cond:
+            account = self._accounts[username]
+            if token != account.token:
+                account.token = token
+                account.issued_at = time.time()
+
+    def report_failure(self, username: str) -> None:
+        """トークンの失敗を記録し、バックグラウンドでの再ログインを要求"""
+        with self._cond:
+            account = self._accounts[username]
+            account.failures += 1
+            account.needs_refresh = True
+            account.token = None
+            if account.failures >= self.max_failures:
+                account.healthy = False
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """アカウントごとの状態（ログ出力用）"""
+        now = time.time()
+        with self._cond:
+            return {
+                username: {
+                    'healthy': account.healthy,
+                    'in_use': account.in_use,
+                    'failures': account.failures,
+                    'token_age': now - account.issued_at if account.token else None,
+                }
+                for username, account in self._accounts.items()
+            }
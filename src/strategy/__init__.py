@@ -1,16 +1,36 @@
+import importlib
+
 from .base_strategy import BaseStrategy, StrategyType
-from .simple_strategy import SimpleStrategy
-from .aggressive_strategy import AggressiveStrategy
-from .tight_strategy import TightStrategy
-from .allin_strategy import AllinStrategy
 from .factory import create_strategy
+from .registry import register_strategy, strategy_names
+
+# Strategy classes are imported on first access (see registry.py)
+_LAZY_EXPORTS = {
+    'SimpleStrategy': '.simple_strategy',
+    'AggressiveStrategy': '.aggressive_strategy',
+    'TightStrategy': '.tight_strategy',
+    'AllinStrategy': '.allin_strategy',
+    'BlueprintStrategy': '.blueprint_strategy',
+    'ResolveStrategy': '.resolve_strategy',
+    'PortfolioStrategy': '.portfolio_strategy',
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
-    'BaseStrategy', 
+    'BaseStrategy',
     'StrategyType',
     'SimpleStrategy',
     'AggressiveStrategy',
     'TightStrategy',
     'AllinStrategy',
-    'create_strategy'
-]
\ No newline at end of file
+    'BlueprintStrategy',
+    'ResolveStrategy',
+    'PortfolioStrategy',
+    'create_strategy',
+    'register_strategy',
+    'strategy_names'
+]
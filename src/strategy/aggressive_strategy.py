@@ -2,6 +2,7 @@ from typing import Dict
 import logging
 from sample.slumbot_api import ParseAction
 from .base_strategy import BaseStrategy
+from .legal_actions import LegalActions
 
 class AggressiveStrategy(BaseStrategy):
     """Aggressive betting strategy implementation"""
@@ -17,12 +18,11 @@ class AggressiveStrategy(BaseStrategy):
                 return 'f'
             
             # ベットの機会があれば、ポットサイズのベット
+            legal = LegalActions(action_info)
             if action_info['last_bettor'] == -1:
-                current_pot = action_info['total_last_bet_to'] * 2
-                bet_size = min(current_pot, 20000 - action_info['total_last_bet_to'])
-                return f'b{bet_size}'
+                return legal.pot_bet(1.0)
             else:
-                return 'c'
+                return legal.check_or_call()
         except Exception as e:
             logging.error(f"Error in AggressiveStrategy: {str(e)}")
             return 'f'
@@ -1,13 +1,17 @@
 # src/strategy/base_strategy.py
 
+import threading
 from enum import Enum
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 class StrategyType(Enum):
     SIMPLE = "simple"
     AGGRESSIVE = "aggressive"
     TIGHT = "tight"
     ALLIN = "allin"
+    BLUEPRINT = "blueprint"
+    RESOLVE = "resolve"
+    PORTFOLIO = "portfolio"
     
     @classmethod
     def list_names(cls) -> List[str]:
@@ -29,6 +33,46 @@ class BaseStrategy:
         """
         raise NotImplementedError
         
+    def speculative_work(self, game_state: Dict) -> Optional[Callable[[threading.Event], Any]]:
+        """
+        Returns work to precompute for a state that may come next, or None
+        The callable runs in a background thread while waiting on the API and
+        receives an Event that is set once the prediction missed; long work
+        should check it and return early
+        """
+        return None
+        
+    def use_precomputed(self, game_state: Dict, result: Any) -> None:
+        """
+        Receives the result of speculative_work when the actual state matches
+        the prediction; the reply is of the same kind, but a bet may differ
+        in size from the predicted one
+        """
+        pass
+        
+    def decision_values(self) -> Optional[Tuple[Dict[str, float], Dict[str, float]]]:
+        """
+        Returns (policy, action values) behind the last decision, or None
+        Only meaningful if the action was sampled from that policy; used for
+        the variance-reduced win rate estimate
+        """
+        return None
+        
+    def observe_result(self, game_state: Dict) -> None:
+        """Receives the final state of each finished hand (with 'winnings')"""
+        pass
+        
+    def warm_up(self) -> None:
+        """
+        Performs one-time setup before the first hand (starting worker
+        processes, touching tables) so it is not paid during a decision
+        """
+        pass
+        
+    def close(self) -> None:
+        """Releases resources held by the strategy (worker processes, mapped files)"""
+        pass
+        
     def update_game_state(self, game_state: Dict) -> None:
         """Updates the internal state with the current game information"""
         self.hole_cards = game_state.get('hole_cards', [])
@@ -0,0 +1,250 @@
+# src/strategy/blueprint_policy.py
+
+"""
+Binary blueprint policy format with a memory-mapped loader.
+
+File layout (little endian, every section aligned to 8 bytes):
+
+    header   magic b'VSBP', version, value_bytes (1 = uint8, 2 = uint16),
+             num_actions, num_nodes, buckets per street (x4), labels_size
+    labels   comma separated action labels (e.g. "f,c,p0.5,p1,a")
+    keys     num_nodes x uint64, sorted node IDs
+    offsets  num_nodes x uint64, element offset of each node in the data section
+    data     per node: buckets(street) x num_actions quantized probabilities
+
+A node ID is the 64-bit FNV-1a hash of the action history string, so the
+action tree itself does not need to be stored. Probabilities are stored
+quantized and are renormalized per row on read.
+
+The file is opened with mmap and only the header is parsed at load time.
+Node lookups touch the pages they need, so startup cost does not depend on
+the file size and processes mapping the same file share its pages through
+the OS page cache.
+"""
+
+import mmap
+import struct
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+from sample.slumbot_api import ParseAction
+
+MAGIC = b'VSBP'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHHHQ4HI')
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK64 = (1 << 64) - 1
+_VALUE_FORMATS = {1: 'B', 2: 'H'}
+
+
+def node_id(history: str) -> int:
+    """Node ID of an action history (64-bit FNV-1a)"""
+    value = _FNV_OFFSET
+    for byte in history.encode('ascii'):
+        value = ((value ^ byte) * _FNV_PRIME) & _MASK64
+    return value
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def street_of(history: str) -> int:
+    """
+    Street of an action history, as ParseAction reports it
+
+    This is the street of the player to act next, so "ck" (no trailing '/')
+    is already on the flop and an all-in call is on the river.
+    """
+    action_info = ParseAction(history)
+    if not isinstance(action_info, dict) or 'error' in action_info:
+        raise ValueError(f"Invalid action history: {history!r}")
+    return action_info['st']
+
+
+def write_policy(
+    path: Union[str, Path],
+    policy: Mapping[str, Sequence[Sequence[float]]],
+    actions: Sequence[str],
+    buckets_per_street: Sequence[int],
+    value_bytes: int = 1
+) -> None:
+    """
+    Write a policy in the binary blueprint format
+
+    Parameters:
+    -----------
+    path : Union[str, Path]
+        Output file
+    policy : Mapping[str, Sequence[Sequence[float]]]
+        Action history -> [bucket][action] probabilities
+    actions : Sequence[str]
+        Action labels ('f', 'c', 'p<pot fraction>', 'a')
+    buckets_per_street : Sequence[int]
+        Number of card buckets on each street (4 entries)
+    value_bytes : int
+        Quantization width (1 = uint8, 2 = uint16)
+    """
+    if value_bytes not in _VALUE_FORMATS:
+        raise ValueError(f"value_bytes must be 1 or 2, got {value_bytes}")
+    if len(buckets_per_street) != 4:
+        raise ValueError("buckets_per_street must have 4 entries")
+
+    max_value = (1 << (8 * value_bytes)) - 1
+    value_format = '<' + _VALUE_FORMATS[value_bytes]
+    labels = ','.join(actions).encode('ascii')
+    num_actions = len(actions)
+
+    entries = sorted((node_id(history), history) for history in policy)
+    for (prev, prev_history), (key, history) in zip(entries, entries[1:]):
+        if prev == key:
+            raise ValueError(f"Node ID collision: {prev_history!r} and {history!r}")
+
+    header_end = _align(_HEADER.size)
+    keys_start = _align(header_end + len(labels))
+    offsets_start = keys_start + 8 * len(entries)
+    data_start = offsets_start + 8 * len(entries)
+
+    data = bytearray()
+    offsets = []
+    for _, history in entries:
+        rows = policy[history]
+        expected = buckets_per_street[street_of(history)]
+        if len(rows) != expected:
+            raise ValueError(
+                f"Node {history!r} has {len(rows)} buckets, expected {expected}"
+            )
+        offsets.append(len(data) // value_bytes)
+        for row in rows:
+            if len(row) != num_actions:
+                raise ValueError(f"Node {history!r} has a row with {len(row)} actions")
+            total = sum(row)
+            for prob in row:
+                quantized = round(prob / total * max_value) if total > 0 else 0
+                data += struct.pack(value_format, quantized)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, value_bytes, num_actions, 0, len(entries),
+            *buckets_per_street, len(labels)
+        ))
+        f.write(b'\0' * (header_end - _HEADER.size))
+        f.write(labels)
+        f.write(b'\0' * (keys_start - header_end - len(labels)))
+        f.write(struct.pack(f'<{len(entries)}Q', *(key for key, _ in entries)))
+        f.write(struct.pack(f'<{len(entries)}Q', *offsets))
+        f.write(bytes(data))
+
+
+class BlueprintPolicy:
+    """Read-only view of a memory-mapped blueprint policy file"""
+
+    def __init__(self, path: Union[str, Path]):
+        if sys.byteorder != 'little':
+            raise NotImplementedError("Blueprint policies require a little-endian host")
+
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        try:
+            (magic, version, value_bytes, num_actions, _, num_nodes,
+             *buckets, labels_size) = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a blueprint policy file: {self.path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported policy version: {version}")
+            if value_bytes not in _VALUE_FORMATS:
+                raise ValueError(f"Unsupported value size: {value_bytes}")
+
+            header_end = _align(_HEADER.size)
+            labels = bytes(self._mmap[header_end:header_end + labels_size])
+            self.actions: List[str] = labels.decode('ascii').split(',')
+            if len(self.actions) != num_actions:
+                raise ValueError("Action label count does not match header")
+            self.buckets_per_street: List[int] = list(buckets)
+            self.num_nodes = num_nodes
+            self.max_value = (1 << (8 * value_bytes)) - 1
+
+            keys_start = _align(header_end + labels_size)
+            offsets_start = keys_start + 8 * num_nodes
+            data_start = offsets_start + 8 * num_nodes
+
+            self._view = memoryview(self._mmap)
+            self._keys = self._view[keys_start:offsets_start].cast('Q')
+            self._offsets = self._view[offsets_start:data_start].cast('Q')
+            self._data = self._view[data_start:].cast(_VALUE_FORMATS[value_bytes])
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'BlueprintPolicy':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def __contains__(self, history: str) -> bool:
+        return self._find(history) is not None
+
+    def _find(self, history: str) -> Optional[int]:
+        key = node_id(history)
+        index = bisect_left(self._keys, key)
+        if index < self.num_nodes and self._keys[index] == key:
+            return index
+        return None
+
+    def lookup(self, history: str, bucket: int) -> Optional[List[float]]:
+        """
+        Returns the action probabilities for a node and card bucket,
+        or None if the node is not in the policy.
+        """
+        index = self._find(history)
+        if index is None:
+            return None
+        buckets = self.buckets_per_street[street_of(history)]
+        if not 0 <= bucket < buckets:
+            raise ValueError(f"Bucket {bucket} out of range (0-{buckets - 1})")
+
+        num_actions = len(self.actions)
+        start = self._offsets[index] + bucket * num_actions
+        row = self._data[start:start + num_actions].tolist()
+        total = sum(row)
+        if total == 0:
+            return [1.0 / num_actions] * num_actions
+        return [value / total for value in row]
+
+    def as_dict(self, history: str, bucket: int) -> Optional[Dict[str, float]]:
+        """Same as lookup, keyed by action label"""
+        probs = self.lookup(history, bucket)
+        if probs is None:
+            return None
+        return dict(zip(self.actions, probs))
+
+    def prefetch(self) -> None:
+        """Asks the OS to start reading the file in, so early lookups do not fault"""
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            self._mmap.madvise(mmap.MADV_WILLNEED)
+
+    def close(self) -> None:
+        """Releases the mapping"""
+        for name in ('_keys', '_offsets', '_data', '_view'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
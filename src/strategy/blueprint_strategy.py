@@ -0,0 +1,174 @@
+# src/strategy/blueprint_strategy.py
+
+import logging
+import random
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from sample.slumbot_api import ParseAction
+from utils.action_utils import split_action
+from utils.cards import (
+    NUM_PREFLOP_CLASSES, combo_strengths, hand_strength, parse_cards, preflop_class
+)
+from .base_strategy import BaseStrategy
+from .blueprint_policy import BlueprintPolicy
+from .legal_actions import LegalActions
+
+
+def card_bucket(hole_cards: List[str], board: List[str], num_buckets: int) -> int:
+    """
+    Maps our cards to a bucket of the blueprint abstraction
+
+    Preflop uses the 169 hand classes (scaled down if the policy has fewer
+    buckets); postflop uses equal-width bins of current hand strength.
+    """
+    hole = parse_cards(hole_cards)
+    if not board:
+        return preflop_class(*hole) * num_buckets // NUM_PREFLOP_CLASSES
+    strength = hand_strength(hole, parse_cards(board))
+    return min(int(strength * num_buckets), num_buckets - 1)
+
+
+def label_to_action(label: str, action_info: Dict) -> Optional[str]:
+    """Converts an abstract action label to an API action, or None if illegal"""
+    legal = LegalActions(action_info)
+
+    if label == 'f':
+        return 'f' if legal.can_fold else None
+    if label == 'c':
+        return legal.check_or_call()
+    if not legal.can_bet:
+        return None
+    if label == 'a':
+        return legal.all_in()
+    if label.startswith('p'):
+        return legal.pot_bet(float(label[1:]))
+    return None
+
+
+def _closest_label(incr: str, labels: List[str], action_info: Dict) -> Optional[int]:
+    """Index of the abstract label that best matches an observed action"""
+    if incr in ('k', 'c'):
+        return labels.index('c') if 'c' in labels else None
+    if incr == 'f':
+        return labels.index('f') if 'f' in labels else None
+
+    bet_to = int(incr[1:])
+    best, best_distance = None, None
+    for index, label in enumerate(labels):
+        action = label_to_action(label, action_info)
+        if action is None or not action.startswith('b'):
+            continue
+        distance = abs(int(action[1:]) - bet_to)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = index, distance
+    return best
+
+
+def opponent_range_from_blueprint(
+    policy: BlueprintPolicy,
+    action: str,
+    board: List[str],
+    opponent_pos: int,
+    dead_cards: List[int]
+) -> List[Tuple[Tuple[int, int], float]]:
+    """
+    Opponent range implied by assuming the opponent plays the blueprint
+
+    Every live combo starts with weight 1 and is multiplied by the blueprint
+    probability of each action the opponent took. Nodes missing from the
+    policy leave the weights unchanged.
+    """
+    board_cards = parse_cards(board)
+    excluded = set(board_cards) | set(dead_cards)
+    weights = {
+        combo: 1.0 for combo in combinations(range(52), 2)
+        if combo[0] not in excluded and combo[1] not in excluded
+    }
+    strengths_by_street: Dict[int, Dict[Tuple[int, int], float]] = {}
+
+    for history, incr in split_action(action):
+        action_info = ParseAction(history)
+        if 'error' in action_info or action_info['pos'] != opponent_pos:
+            continue
+        street = action_info['st']
+        buckets = policy.buckets_per_street[street]
+        if history not in policy:
+            continue
+        label_index = _closest_label(incr, policy.actions, action_info)
+        if label_index is None:
+            continue
+
+        if street > 0 and street not in strengths_by_street:
+            street_board = board_cards[:street + 2]
+            strengths_by_street[street] = combo_strengths(street_board, dead_cards)
+
+        likelihoods: Dict[int, float] = {}
+        for combo in weights:
+            if street == 0:
+                bucket = preflop_class(*combo) * buckets // NUM_PREFLOP_CLASSES
+            else:
+                strength = strengths_by_street[street].get(combo, 0.5)
+                bucket = min(int(strength * buckets), buckets - 1)
+            if bucket not in likelihoods:
+                likelihoods[bucket] = policy.lookup(history, bucket)[label_index]
+            weights[combo] *= likelihoods[bucket]
+
+    return [(combo, weight) for combo, weight in weights.items() if weight > 0]
+
+
+class BlueprintStrategy(BaseStrategy):
+    """Strategy that plays a precomputed blueprint policy read from a memory-mapped file"""
+
+    def __init__(self, policy_file: Optional[str] = None, seed: Optional[int] = None):
+        super().__init__()
+        if not policy_file:
+            raise ValueError("BlueprintStrategy requires a policy file")
+        self.policy = BlueprintPolicy(policy_file)
+        self.rng = random.Random(seed)
+
+    def decide_action(self, game_state: Dict) -> str:
+        self.update_game_state(game_state)
+
+        try:
+            action_info = ParseAction(self.current_action)
+
+            if 'error' in action_info:
+                logging.error(f"Error parsing action: {action_info['error']}")
+                return 'f'
+
+            street = action_info['st']
+            bucket = card_bucket(
+                self.hole_cards, self.board, self.policy.buckets_per_street[street]
+            )
+            probs = self.policy.lookup(self.current_action, bucket)
+            facing_bet = action_info['last_bettor'] != -1
+            if probs is None:
+                # ブループリント外のノードはチェック/コール
+                return 'c' if facing_bet else 'k'
+
+            candidates = []
+            weights = []
+            for label, prob in zip(self.policy.actions, probs):
+                action = label_to_action(label, action_info)
+                if action is not None and prob > 0:
+                    candidates.append(action)
+                    weights.append(prob)
+
+            if not candidates:
+                return 'c' if facing_bet else 'k'
+            return self.rng.choices(candidates, weights=weights)[0]
+        except Exception as e:
+            logging.error(f"Error in BlueprintStrategy: {str(e)}")
+            return 'f'
+
+    def warm_up(self) -> None:
+        """Starts paging in the policy file"""
+        self.policy.prefetch()
+
+    def close(self) -> None:
+        """Releases the policy mapping"""
+        self.policy.close()
+
+    def __str__(self) -> str:
+        return "Blueprint Strategy"
@@ -1,22 +1,16 @@
-from typing import Dict, Type
-from .base_strategy import BaseStrategy, StrategyType
-from .simple_strategy import SimpleStrategy
-from .aggressive_strategy import AggressiveStrategy
-from .tight_strategy import TightStrategy
-from .allin_strategy import AllinStrategy
+from typing import Any
+from .base_strategy import BaseStrategy
+from .registry import load_strategy
 
-def create_strategy(strategy_type: str) -> BaseStrategy:
-    """Factory function to create strategy instances"""
-    strategies: Dict[str, Type[BaseStrategy]] = {
-        StrategyType.SIMPLE.value: SimpleStrategy,
-        StrategyType.AGGRESSIVE.value: AggressiveStrategy,
-        StrategyType.TIGHT.value: TightStrategy,
-        StrategyType.ALLIN.value: AllinStrategy
-    }
-    
-    strategy_class = strategies.get(strategy_type)
-    if not strategy_class:
-        valid_strategies = StrategyType.list_names()
-        raise ValueError(f"Invalid strategy type. Choose from: {valid_strategies}")
-        
-    return strategy_class()
\ No newline at end of file
+def create_strategy(strategy_type: str, warm_up: bool = True, **options: Any) -> BaseStrategy:
+    """Factory function to create strategy instances
+
+    Keyword options are passed to the strategy constructor (e.g. policy_file
+    for the blueprint strategy). Only the chosen strategy's module is
+    imported. With warm_up the strategy's warm_up hook runs before it is
+    returned, so its first decision does not pay one-time setup costs.
+    """
+    strategy = load_strategy(strategy_type)(**options)
+    if warm_up:
+        strategy.warm_up()
+    return strategy
@@ -0,0 +1,97 @@
+# src/strategy/legal_actions.py
+
+from typing import Dict, Optional
+
+from sample.slumbot_api import ParseAction, BIG_BLIND, STACK_SIZE
+
+
+class LegalActions:
+    """
+    The legal actions at a decision point, derived from ParseAction output
+
+    Bet amounts follow the API: a bet is the total the player has put in on
+    the current street ("bet-to"). The limits mirror the checks in
+    ParseAction, so any action produced here is accepted by the server.
+    """
+
+    def __init__(self, action_info: Dict):
+        self.street_bet_to = action_info['street_last_bet_to']
+        self.total_bet_to = action_info['total_last_bet_to']
+        self.pot = 2 * self.total_bet_to
+        self.facing_bet = action_info['last_bet_size'] > 0
+
+        self.can_fold = self.facing_bet
+        self.can_check = not self.facing_bet
+        self.can_call = self.facing_bet
+
+        remaining = STACK_SIZE - self.total_bet_to
+        self.can_bet = remaining > 0
+        min_raise = max(action_info['last_bet_size'], BIG_BLIND) if self.facing_bet else BIG_BLIND
+        self.max_bet_to = self.street_bet_to + remaining
+        self.min_bet_to = self.street_bet_to + min(min_raise, remaining)
+
+    @classmethod
+    def from_action(cls, action: str) -> Optional['LegalActions']:
+        """Builds the legal action set for an action string, or None if it is invalid or finished"""
+        action_info = ParseAction(action)
+        if 'error' in action_info or action_info['pos'] == -1:
+            return None
+        return cls(action_info)
+
+    def check_or_call(self) -> str:
+        return 'c' if self.facing_bet else 'k'
+
+    def fold_or_check(self) -> str:
+        return 'f' if self.facing_bet else 'k'
+
+    def clamp(self, bet_to: int) -> int:
+        """Clamps a bet-to amount to [min_bet_to, max_bet_to]"""
+        return max(self.min_bet_to, min(int(bet_to), self.max_bet_to))
+
+    def bet(self, bet_to: int) -> str:
+        """A bet or raise to the clamped amount (check/call if raising is impossible)"""
+        if not self.can_bet:
+            return self.check_or_call()
+        return f'b{self.clamp(bet_to)}'
+
+    def pot_bet(self, fraction: float) -> str:
+        """A bet of the given fraction of the pot on top of the current street bet"""
+        return self.bet(self.street_bet_to + int(fraction * self.pot))
+
+    def all_in(self) -> str:
+        return self.bet(self.max_bet_to)
+
+    def is_legal(self, incr: str) -> bool:
+        if incr == 'f':
+            return self.can_fold
+        if incr == 'k':
+            return self.can_check
+        if incr == 'c':
+            return self.can_call
+        if incr.startswith('b') and incr[1:].isdigit():
+            return self.can_bet and self.min_bet_to <= int(incr[1:]) <= self.max_bet_to
+        return False
+
+    def sanitize(self, incr: str) -> str:
+        """
+        Maps an action to the closest legal one
+
+        Check and call are interchangeable, a fold with nothing to call
+        becomes a check, and bets are clamped (or turned into a check/call
+        when no raise is possible). Anything unparseable folds or checks.
+        """
+        if self.is_legal(incr):
+            return incr
+        if incr in ('k', 'c'):
+            return self.check_or_call()
+        if incr == 'f':
+            return 'k'
+        if incr.startswith('b') and incr[1:].isdigit():
+            return self.bet(int(incr[1:]))
+        return self.fold_or_check()
+
+
+def sanitize_action(action: str, incr: str) -> str:
+    """Clamps incr to a legal action for the given action string (unchanged if it cannot be parsed)"""
+    legal = LegalActions.from_action(action)
+    return legal.sanitize(incr) if legal else incr
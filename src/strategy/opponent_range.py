@@ -0,0 +1,320 @@
+# src/strategy/opponent_range.py
+
+"""
+Bayesian tracking of the opponent's hole cards over all 1326 combos.
+
+The range is a NumPy weight vector indexed like utils.hand_eval.COMBOS.
+Combos that collide with our hole cards or the board are zeroed, and every
+opponent action multiplies the weights by P(action | strength bucket) from
+an ActionFrequencyModel. Strength buckets are computed once per street, so
+an update is a single fancy-indexed multiply over 1326 floats.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sample.slumbot_api import ParseAction, STACK_SIZE
+from utils.action_utils import split_action
+from utils.cards import parse_cards
+from utils.hand_eval import CARD_MASK, COMBOS, NUM_COMBOS, combo_index, combo_scores, evaluate_many
+
+# 相手のアクションの分類
+FOLD = 0
+CHECK = 1
+CALL = 2
+BET_SMALL = 3
+BET_LARGE = 4
+ALL_IN = 5
+NUM_ACTION_CLASSES = 6
+
+# ポット比でこれ以下のベット/レイズを小さいベットとみなす
+SMALL_BET_FRACTION = 0.6
+
+
+def _chen_score(card1: int, card2: int) -> float:
+    """Chen formula score of a starting hand"""
+    points = {12: 10.0, 11: 8.0, 10: 7.0, 9: 6.0}
+    rank1, rank2 = card1 >> 2, card2 >> 2
+    high, low = max(rank1, rank2), min(rank1, rank2)
+    score = points.get(high, (high + 2) / 2)
+    if high == low:
+        return max(score * 2, 5.0)
+    if (card1 & 3) == (card2 & 3):
+        score += 2
+    gap = high - low - 1
+    score -= (0, 1, 2, 4)[gap] if gap < 4 else 5
+    if gap <= 1 and high < 10:
+        score += 1
+    return score
+
+
+def _percentiles(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Fraction of valid entries each value beats (ties count half)"""
+    ordered = np.sort(values[valid])
+    count = ordered.shape[0]
+    if count <= 1:
+        return np.full(values.shape[0], 0.5)
+    below = np.searchsorted(ordered, values, side='left')
+    equal = np.searchsorted(ordered, values, side='right') - below
+    return np.clip((below + 0.5 * (equal - 1)) / (count - 1), 0.0, 1.0)
+
+
+PREFLOP_STRENGTH = _percentiles(
+    np.array([_chen_score(int(a), int(b)) for a, b in COMBOS]),
+    np.ones(NUM_COMBOS, dtype=bool)
+)
+
+
+def board_strengths(board: Sequence[int]) -> np.ndarray:
+    """Strength percentile of every combo on a board (blocked combos are meaningless)"""
+    if len(board) < 3:
+        return PREFLOP_STRENGTH
+    scores = combo_scores(board)
+    valid = ~CARD_MASK[list(board)].any(axis=0)
+    return _percentiles(scores, valid)
+
+
+def classify_action(incr: str, action_info: Dict) -> int:
+    """Maps an increment to an action class given the state before it"""
+    if incr == 'f':
+        return FOLD
+    if incr == 'k':
+        return CHECK
+    if incr == 'c':
+        return CALL
+    bet_to = int(incr[1:])
+    raise_size = bet_to - action_info['street_last_bet_to']
+    if action_info['total_last_bet_to'] + raise_size >= STACK_SIZE:
+        return ALL_IN
+    pot = 2 * action_info['total_last_bet_to']
+    return BET_SMALL if raise_size <= SMALL_BET_FRACTION * pot else BET_LARGE
+
+
+class ActionFrequencyModel:
+    """
+    P(action class | facing a bet, strength bucket) with Dirichlet pseudo-counts
+
+    The prior encodes "stronger hands bet and raise more, weaker hands check
+    and fold more" with a floor for bluffs. record() adds observed actions
+    (e.g. from showdowns) in O(1).
+
+    Parallel sessions can pool their observations through shared_counts, an
+    array of shape (shards, 2, NUM_ACTION_CLASSES, num_buckets) in shared
+    memory: record() also adds to row `shard`, which only this model writes,
+    and sync() rebuilds the counts from the prior plus every shard.
+    """
+
+    def __init__(self, num_buckets: int = 10, prior_strength: float = 20.0,
+                 counts: Optional[np.ndarray] = None,
+                 shared_counts: Optional[np.ndarray] = None, shard: int = 0):
+        self.num_buckets = num_buckets
+        if counts is None:
+            counts = self._prior(num_buckets) * prior_strength
+        self.prior_counts = counts.copy()
+        self.shared_counts = shared_counts
+        self.shard = shard
+        self.counts = counts
+        self.totals = self.counts.sum(axis=1)
+        self.sync()
+
+    @staticmethod
+    def _prior(num_buckets: int) -> np.ndarray:
+        s = (np.arange(num_buckets) + 0.5) / num_buckets
+        prior = np.zeros((2, NUM_ACTION_CLASSES, num_buckets))
+        # ベットに直面していない場合
+        prior[0, CHECK] = 1.2 - s
+        prior[0, BET_SMALL] = 0.25 + 0.5 * s
+        prior[0, BET_LARGE] = 0.1 + 0.6 * s ** 2
+        prior[0, ALL_IN] = 0.02 + 0.2 * s ** 4
+        # ベットに直面している場合
+        prior[1, FOLD] = 0.9 * (1 - s) ** 2
+        prior[1, CALL] = 0.3 + 0.6 * s
+        prior[1, BET_SMALL] = 0.05 + 0.3 * s ** 2
+        prior[1, BET_LARGE] = 0.03 + 0.3 * s ** 3
+        prior[1, ALL_IN] = 0.01 + 0.25 * s ** 4
+        return prior / prior.sum(axis=1, keepdims=True)
+
+    def bucket_of(self, strength: np.ndarray) -> np.ndarray:
+        return np.minimum((strength * self.num_buckets).astype(np.intp), self.num_buckets - 1)
+
+    def likelihood(self, facing_bet: bool, action_class: int) -> np.ndarray:
+        """P(action | bucket) for every bucket"""
+        facing = int(facing_bet)
+        return self.counts[facing, action_class] / self.totals[facing]
+
+    def record(self, facing_bet: bool, action_class: int, bucket: int) -> None:
+        facing = int(facing_bet)
+        self.counts[facing, action_class, bucket] += 1
+        self.totals[facing, bucket] += 1
+        if self.shared_counts is not None:
+            self.shared_counts[self.shard, facing, action_class, bucket] += 1
+
+    def sync(self) -> None:
+        """Picks up the observations other sessions have added to shared_counts"""
+        if self.shared_counts is not None:
+            self.counts = self.prior_counts + self.shared_counts.sum(axis=0)
+            self.totals = self.counts.sum(axis=1)
+
+
+class OpponentRange:
+    """Opponent hole-card weights over the 1326 combos, updated as the hand goes on"""
+
+    def __init__(self, model: Optional[ActionFrequencyModel] = None, seed: Optional[int] = None):
+        self.model = model or ActionFrequencyModel()
+        self.rng = np.random.default_rng(seed)
+        self.weights = np.ones(NUM_COMBOS)
+        self.client_pos = 0
+        self._hole: List[int] = []
+        self._board: List[int] = []
+        self._action: Optional[str] = None
+        self._processed = 0
+        self._strengths: Dict[Tuple[int, ...], np.ndarray] = {}
+        self._observed: List[Tuple[bool, int, Tuple[int, ...]]] = []
+
+    def reset(self, hole_cards: Sequence[int] = (), client_pos: int = 0) -> None:
+        """Starts a new hand with a uniform range"""
+        self.weights = np.ones(NUM_COMBOS)
+        self.client_pos = client_pos
+        self._hole = []
+        self._board = []
+        self._action = None
+        self._processed = 0
+        self._strengths = {}
+        self._observed = []
+        self.remove_cards(hole_cards)
+        self._hole = list(hole_cards)
+
+    def remove_cards(self, cards: Sequence[int]) -> None:
+        """Zeroes every combo that contains one of the cards"""
+        if len(cards):
+            self.weights[CARD_MASK[list(cards)].any(axis=0)] = 0.0
+
+    def strengths(self, board: Sequence[int]) -> np.ndarray:
+        """Cached strength percentiles of every combo for a board"""
+        key = tuple(board)
+        values = self._strengths.get(key)
+        if values is None:
+            values = board_strengths(key)
+            self._strengths[key] = values
+        return values
+
+    def _apply(self, weights: np.ndarray, history: str, incr: str,
+               board: Sequence[int], record: bool) -> None:
+        action_info = ParseAction(history)
+        if 'error' in action_info or action_info['pos'] == self.client_pos:
+            return
+        street = action_info['st']
+        street_board = tuple(board[:street + 2]) if street > 0 else ()
+        facing_bet = action_info['last_bettor'] != -1
+        action_class = classify_action(incr, action_info)
+        buckets = self.model.bucket_of(self.strengths(street_board))
+        weights *= self.model.likelihood(facing_bet, action_class)[buckets]
+        if record:
+            self._observed.append((facing_bet, action_class, street_board))
+
+    def update(self, game_state: Dict) -> None:
+        """Applies the cards and opponent actions that are new since the last call"""
+        hole = parse_cards(game_state.get('hole_cards', []))
+        board = parse_cards(game_state.get('board', []))
+        action = game_state.get('action', '')
+        if (self._action is None or hole != self._hole
+                or not action.startswith(self._action)):
+            self.reset(hole, game_state.get('client_pos', 0))
+
+        if len(board) > len(self._board):
+            self.remove_cards(board[len(self._board):])
+            self._board = board
+
+        increments = split_action(action)
+        for history, incr in increments[self._processed:]:
+            self._apply(self.weights, history, incr, board, record=True)
+        self._processed = len(increments)
+        self._action = action
+
+    def preview(self, game_state: Dict) -> np.ndarray:
+        """Weights for a (possibly hypothetical) later state of this hand, without updating"""
+        weights = self.weights.copy()
+        action = game_state.get('action', '')
+        if self._action is None or not action.startswith(self._action):
+            return weights
+        board = parse_cards(game_state.get('board', []))
+        if len(board) > len(self._board):
+            weights[CARD_MASK[board[len(self._board):]].any(axis=0)] = 0.0
+        for history, incr in split_action(action)[self._processed:]:
+            self._apply(weights, history, incr, board, record=False)
+        return weights
+
+    def normalized(self, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        weights = self.weights if weights is None else weights
+        total = weights.sum()
+        return weights / total if total > 0 else weights
+
+    def as_list(self, weights: Optional[np.ndarray] = None) -> List[Tuple[Tuple[int, int], float]]:
+        """Range as [((card1, card2), weight)] for combos with positive weight"""
+        weights = self.weights if weights is None else weights
+        indices = np.nonzero(weights > 0)[0]
+        combos = COMBOS[indices].tolist()
+        return [((a, b), w) for (a, b), w in zip(combos, weights[indices].tolist())]
+
+    def win_rates(self, hole_cards: Sequence[int], board: Sequence[int],
+                  samples: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Our win probability against each combo (ties count half)
+
+        Returns (win_rates, weights), where weights are the range weights
+        with combos blocked by our cards zeroed. Pre-river the remaining
+        board is sampled `samples` times.
+        """
+        hole = list(hole_cards)
+        board = list(board)
+        dead = hole + board
+        weights = self.weights.copy()
+        weights[CARD_MASK[dead].any(axis=0)] = 0.0
+
+        missing = 5 - len(board)
+        if missing == 0:
+            runouts = np.array([board], dtype=np.int64)
+        else:
+            deck = np.array([card for card in range(52) if card not in dead], dtype=np.int64)
+            order = np.argsort(self.rng.random((samples, deck.shape[0])), axis=1)[:, :missing]
+            runouts = np.concatenate(
+                [np.broadcast_to(np.array(board, dtype=np.int64), (samples, len(board))),
+                 deck[order]], axis=1
+            )
+
+        ours = evaluate_many(np.concatenate(
+            [np.broadcast_to(np.array(hole, dtype=np.int64), (runouts.shape[0], 2)), runouts],
+            axis=1
+        ))
+        count = runouts.shape[0]
+        theirs = evaluate_many(np.concatenate(
+            [np.broadcast_to(COMBOS, (count, NUM_COMBOS, 2)),
+             np.broadcast_to(runouts[:, None, :], (count, NUM_COMBOS, 5))],
+            axis=2
+        ).reshape(-1, 7)).reshape(count, NUM_COMBOS)
+        live = ~CARD_MASK[runouts].any(axis=1)
+        results = (ours[:, None] > theirs) + 0.5 * (ours[:, None] == theirs)
+        wins = (results * live).sum(axis=0)
+        counts = live.sum(axis=0)
+        rates = np.divide(wins, counts, out=np.full(NUM_COMBOS, 0.5), where=counts > 0)
+        return rates, weights
+
+    def equity(self, hole_cards: Sequence[int], board: Sequence[int], samples: int = 16) -> float:
+        """Our equity against the current range"""
+        rates, weights = self.win_rates(hole_cards, board, samples)
+        total = weights.sum()
+        if total <= 0:
+            return 0.5
+        return float((rates * weights).sum() / total)
+
+    def record_showdown(self, opponent_cards: Sequence[str]) -> None:
+        """Feeds the opponent's revealed hand back into the action-frequency model"""
+        cards = parse_cards(opponent_cards)
+        if len(cards) != 2:
+            return
+        index = combo_index(*cards)
+        for facing_bet, action_class, street_board in self._observed:
+            bucket = self.model.bucket_of(self.strengths(street_board)[index:index + 1])[0]
+            self.model.record(facing_bet, action_class, int(bucket))
+        self._observed = []
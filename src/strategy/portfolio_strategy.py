@@ -0,0 +1,320 @@
+# src/strategy/portfolio_strategy.py
+
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.cards import parse_cards
+from .base_strategy import BaseStrategy
+from .factory import create_strategy
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are still atomic but not merged under a lock
+    fcntl = None
+
+DEFAULT_ARMS = ('simple', 'aggressive', 'tight', 'allin')
+# Bump when the layout of the saved state changes
+STATE_VERSION = 1
+
+
+def hand_context(hole_cards: List[str], position: int) -> str:
+    """
+    Coarse context for the bandit: position, pair/suited/offsuit and high-card tier
+
+    Gives 18 contexts, few enough that each one sees plenty of hands.
+    """
+    seat = 'bb' if position == 0 else 'sb'
+    if len(hole_cards) != 2:
+        return seat
+    card1, card2 = parse_cards(hole_cards)
+    rank1, rank2 = card1 >> 2, card2 >> 2
+    if rank1 == rank2:
+        shape = 'pair'
+    elif (card1 & 3) == (card2 & 3):
+        shape = 'suited'
+    else:
+        shape = 'offsuit'
+    high = max(rank1, rank2)
+    tier = 'high' if high >= 10 else 'mid' if high >= 7 else 'low'  # Q+, 9-J, 8-
+    return f"{seat}:{shape}:{tier}"
+
+
+def _normalize(state: Dict[str, List[float]]) -> None:
+    # 重みは相対値なので、最大値を 0 に揃えて桁あふれを防ぐ
+    top = max(state['log_weights'])
+    state['log_weights'] = [w - top for w in state['log_weights']]
+
+
+class PortfolioStrategy(BaseStrategy):
+    """
+    Meta-strategy that picks one of several strategies for each hand with EXP3
+
+    The choice is made per context (see hand_context) at the first decision
+    of a hand and kept for the rest of it; observe_result feeds the hand's
+    winnings back as the reward. Each context only stores one log-weight and
+    one play count per strategy, so an update takes constant time, and the
+    state is saved to state_file so learning carries over between sessions.
+    Several instances (concurrent sessions or processes) may share one
+    state_file: each save adds this instance's updates since its last save
+    to what is on disk, under a file lock.
+    """
+
+    def __init__(
+        self,
+        arms: Sequence[str] = DEFAULT_ARMS,
+        state_file: Optional[Union[str, Path]] = None,
+        gamma: float = 0.1,
+        reward_scale: float = 1000.0,
+        save_interval: int = 100,
+        seed: Optional[int] = None
+    ):
+        """
+        arms: registered strategy names to choose from
+        gamma: share of uniform exploration mixed into every choice
+        reward_scale: winnings (chips) mapped to the best/worst reward;
+            larger results are clipped so a single all-in does not dominate
+        save_interval: hands between saves of the state file
+        """
+        super().__init__()
+        if not arms:
+            raise ValueError("PortfolioStrategy needs at least one strategy")
+        self.arms = list(arms)
+        self.strategies = [create_strategy(name, warm_up=False) for name in self.arms]
+        self.state_file = Path(state_file) if state_file else None
+        self.gamma = gamma
+        self.eta = gamma / len(self.arms)
+        self.reward_scale = reward_scale
+        self.save_interval = save_interval
+        self.rng = random.Random(seed)
+
+        # context -> {'log_weights': [...], 'plays': [...]} indexed like self.arms
+        self.contexts: Dict[str, Dict[str, List[float]]] = {}
+        # Updates not yet written to state_file, in the same layout
+        self._pending: Dict[str, Dict[str, List[float]]] = {}
+        self.hands_observed = 0
+        self._load()
+
+        # (context, arm, probability, hand key) of the hand being played
+        self._active: Optional[Tuple[str, int, float, Tuple]] = None
+        self._hand_key: Optional[Tuple] = None
+        self._last_action = ''
+
+    def _context_state(self, context: str, contexts: Optional[Dict] = None) -> Dict[str, List[float]]:
+        contexts = self.contexts if contexts is None else contexts
+        state = contexts.get(context)
+        if state is None:
+            state = {'log_weights': [0.0] * len(self.arms), 'plays': [0] * len(self.arms)}
+            contexts[context] = state
+        return state
+
+    def probabilities(self, context: str) -> List[float]:
+        """Current EXP3 choice probabilities for a context"""
+        log_weights = self._context_state(context)['log_weights']
+        top = max(log_weights)
+        weights = [math.exp(w - top) for w in log_weights]
+        total = sum(weights)
+        uniform = self.gamma / len(self.arms)
+        return [(1 - self.gamma) * w / total + uniform for w in weights]
+
+    def _start_hand(self, game_state: Dict) -> None:
+        context = hand_context(game_state.get('hole_cards', []), game_state.get('client_pos', 0))
+        probs = self.probabilities(context)
+        arm = self.rng.choices(range(len(self.arms)), weights=probs)[0]
+        self._active = (context, arm, probs[arm], self._hand_key)
+
+    @staticmethod
+    def _key_of(game_state: Dict) -> Tuple:
+        return tuple(game_state.get('hole_cards', [])), game_state.get('client_pos')
+
+    def _same_hand(self, game_state: Dict) -> bool:
+        """Whether game_state continues the hand of the last decision"""
+        return (self._key_of(game_state) == self._hand_key
+                and game_state.get('action', '').startswith(self._last_action))
+
+    def _is_new_hand(self, game_state: Dict) -> bool:
+        # 中断されたハンドは observe_result が呼ばれないので、カードと履歴で判定
+        new_hand = self._active is None or not self._same_hand(game_state)
+        self._hand_key = self._key_of(game_state)
+        self._last_action = game_state.get('action', '')
+        return new_hand
+
+    @property
+    def active_strategy(self) -> Optional[BaseStrategy]:
+        return self.strategies[self._active[1]] if self._active else None
+
+    def decide_action(self, game_state: Dict) -> str:
+        self.update_game_state(game_state)
+        if self._is_new_hand(game_state):
+            self._start_hand(game_state)
+        return self.active_strategy.decide_action(game_state)
+
+    def speculative_work(self, game_state: Dict) -> Optional[Callable[[threading.Event], Any]]:
+        strategy = self.active_strategy
+        return strategy.speculative_work(game_state) if strategy else None
+
+    def use_precomputed(self, game_state: Dict, result: Any) -> None:
+        if self.active_strategy:
+            self.active_strategy.use_precomputed(game_state, result)
+
+    def decision_values(self) -> Optional[Tuple[Dict[str, float], Dict[str, float]]]:
+        # The strategy is fixed for the whole hand, so its own policy is the one sampled from
+        strategy = self.active_strategy
+        return strategy.decision_values() if strategy else None
+
+    def observe_result(self, game_state: Dict) -> None:
+        """EXP3 update of the strategy that played the hand"""
+        for strategy in self.strategies:
+            strategy.observe_result(game_state)
+        if self._active is None or game_state.get('winnings') is None:
+            return
+        context, arm, probability, hand_key = self._active
+        self._active = None
+        if hand_key != self._key_of(game_state) or not game_state.get('action', '').startswith(
+                self._last_action):
+            # 前のハンドが中断され、このハンドでは一度も判断していない
+            return
+
+        clipped = max(-1.0, min(1.0, game_state['winnings'] / self.reward_scale))
+        reward = (clipped + 1) / 2
+        for contexts in (self.contexts, self._pending):
+            state = self._context_state(context, contexts)
+            state['log_weights'][arm] += self.eta * reward / probability
+            state['plays'][arm] += 1
+        _normalize(self._context_state(context))
+
+        self.hands_observed += 1
+        if self.state_file and self.hands_observed % self.save_interval == 0:
+            try:
+                self.save()
+            except (OSError, ValueError) as e:
+                # 保存の失敗でハンドを失敗扱いにしない（次の保存で書き直す）
+                logging.warning(f"Could not save portfolio state to {self.state_file}: {str(e)}")
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        """The saved state, or None if there is none (or it cannot be used)"""
+        if not self.state_file or not self.state_file.exists():
+            return None
+        try:
+            with open(self.state_file, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') != STATE_VERSION:
+                raise ValueError(f"unsupported version {saved.get('version')}")
+        except ValueError as e:
+            logging.warning(f"Ignoring portfolio state {self.state_file}: {str(e)}")
+            return None
+        return saved
+
+    def _adopt(self, saved: Dict[str, Any]) -> None:
+        """Takes over the saved values of the strategies in self.arms"""
+        # 戦略の組み合わせが変わっても、共通する戦略の学習結果は引き継ぐ
+        index = {name: i for i, name in enumerate(saved['arms'])}
+        for context, entry in saved['contexts'].items():
+            state = self._context_state(context)
+            for arm, name in enumerate(self.arms):
+                if name in index:
+                    state['log_weights'][arm] = entry['log_weights'][index[name]]
+                    state['plays'][arm] = entry['plays'][index[name]]
+            _normalize(state)
+
+    def _load(self) -> None:
+        saved = self._read_state()
+        if saved is None:
+            return
+        self._adopt(saved)
+        logging.info(f"Loaded portfolio state for {len(saved['contexts'])} contexts "
+                     f"from {self.state_file}")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds an exclusive lock on state_file for a read-merge-write"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.state_file.with_name(self.state_file.name + '.lock'), 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """
+        Adds the updates since the last save to state_file (atomically)
+
+        Other writers' updates already in the file are kept, as are strategies
+        and contexts this instance does not use.
+        """
+        if not self.state_file:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            saved = self._read_state()
+            if saved is None:
+                saved = {'arms': list(self.arms), 'contexts': {}}
+            arms = saved['arms'] + [name for name in self.arms if name not in saved['arms']]
+            index = {name: i for i, name in enumerate(arms)}
+            contexts = {}
+            for context, entry in saved['contexts'].items():
+                padding = len(arms) - len(entry['plays'])
+                contexts[context] = {
+                    'log_weights': list(entry['log_weights']) + [0.0] * padding,
+                    'plays': list(entry['plays']) + [0] * padding,
+                }
+            for context, state in self.contexts.items():
+                pending = self._pending.get(context)
+                if context not in contexts:
+                    # ファイルにない文脈は、この戦略の値をそのまま書く
+                    pending = state
+                    contexts[context] = {'log_weights': [0.0] * len(arms), 'plays': [0] * len(arms)}
+                if pending is None:
+                    continue
+                entry = contexts[context]
+                for arm, name in enumerate(self.arms):
+                    entry['log_weights'][index[name]] += pending['log_weights'][arm]
+                    entry['plays'][index[name]] += pending['plays'][arm]
+                _normalize(entry)
+
+            merged = {'version': STATE_VERSION, 'arms': arms, 'contexts': contexts}
+            # 書き手ごとに一時ファイルを分け、置き換えで読み手に途中の内容を見せない
+            tmp_path = self.state_file.with_name(
+                f"{self.state_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f)
+                os.replace(tmp_path, self.state_file)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        self._pending = {}
+        self._adopt(merged)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Choice probabilities per context, {context: {strategy: probability}}"""
+        return {
+            context: dict(zip(self.arms, self.probabilities(context)))
+            for context in sorted(self.contexts)
+        }
+
+    def warm_up(self) -> None:
+        for strategy in self.strategies:
+            strategy.warm_up()
+
+    def close(self) -> None:
+        """Saves the state and closes the underlying strategies"""
+        try:
+            self.save()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not save portfolio state to {self.state_file}: {str(e)}")
+        for strategy in self.strategies:
+            strategy.close()
+
+    def __str__(self) -> str:
+        return "Portfolio Strategy"
@@ -0,0 +1,63 @@
+# src/strategy/registry.py
+
+import importlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+# Strategies are registered as 'module:Class' and imported only when created,
+# so choosing a lightweight strategy never pays for the heavy ones
+BUILTIN_STRATEGIES: Dict[str, str] = {
+    'simple': 'strategy.simple_strategy:SimpleStrategy',
+    'aggressive': 'strategy.aggressive_strategy:AggressiveStrategy',
+    'tight': 'strategy.tight_strategy:TightStrategy',
+    'allin': 'strategy.allin_strategy:AllinStrategy',
+    'blueprint': 'strategy.blueprint_strategy:BlueprintStrategy',
+    'resolve': 'strategy.resolve_strategy:ResolveStrategy',
+    'portfolio': 'strategy.portfolio_strategy:PortfolioStrategy',
+}
+
+# Optional JSON object of extra {"name": "module:Class"} entries
+CONFIG_FILE = Path(__file__).resolve().parent.parent.parent / 'strategies.json'
+
+_registry: Optional[Dict[str, str]] = None
+_classes: Dict[str, type] = {}
+
+
+def _load_registry() -> Dict[str, str]:
+    global _registry
+    if _registry is None:
+        _registry = dict(BUILTIN_STRATEGIES)
+        if CONFIG_FILE.exists():
+            try:
+                with open(CONFIG_FILE, encoding='utf-8') as f:
+                    extra = json.load(f)
+                _registry.update({str(name): str(target) for name, target in extra.items()})
+            except (ValueError, AttributeError) as e:
+                logging.warning(f"Ignoring invalid strategy config {CONFIG_FILE}: {str(e)}")
+    return _registry
+
+
+def register_strategy(name: str, target: str) -> None:
+    """Registers (or replaces) a strategy given as 'module:Class'"""
+    if ':' not in target:
+        raise ValueError(f"Strategy target must be 'module:Class', got {target!r}")
+    _load_registry()[name] = target
+    _classes.pop(name, None)
+
+
+def strategy_names() -> List[str]:
+    """Names of all registered strategies (nothing is imported)"""
+    return list(_load_registry())
+
+
+def load_strategy(name: str) -> Type:
+    """Imports and returns the class registered under name"""
+    if name not in _classes:
+        target = _load_registry().get(name)
+        if target is None:
+            raise ValueError(f"Invalid strategy type. Choose from: {strategy_names()}")
+        module_name, _, class_name = target.partition(':')
+        _classes[name] = getattr(importlib.import_module(module_name), class_name)
+    return _classes[name]
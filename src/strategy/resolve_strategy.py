@@ -0,0 +1,246 @@
+# src/strategy/resolve_strategy.py
+
+import logging
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sample.slumbot_api import ParseAction
+from utils.cards import parse_cards
+from .base_strategy import BaseStrategy
+from .blueprint_strategy import BlueprintStrategy, opponent_range_from_blueprint
+from .opponent_range import ActionFrequencyModel, OpponentRange
+from .simple_strategy import SimpleStrategy
+from .subgame_solver import (
+    DEFAULT_MIN_ROOT_VISITS, Range, SubgameNode, SubgameSolver, default_workers
+)
+
+
+def _map_action(incr: str, predicted_bets: List[str], actual_bets: List[str]) -> Optional[str]:
+    """Actual root action of the same class: all-in to all-in, other bets by rank"""
+    if not incr.startswith('b'):
+        return incr
+    if not actual_bets:
+        return None
+    rank = predicted_bets.index(incr)
+    if rank == len(predicted_bets) - 1 or len(actual_bets) == 1:
+        return actual_bets[-1]
+    return actual_bets[min(rank, len(actual_bets) - 2)]
+
+
+def _map_policy(policy: Dict[str, float], predicted: str, actual: str) -> Optional[Dict[str, float]]:
+    """
+    Carries a root policy solved for a predicted state over to the actual state
+
+    A predicted bet may differ in size from the actual one, and so do the
+    root actions after it; they are matched by class instead.
+    """
+    if predicted == actual:
+        return policy
+    predicted_root = SubgameNode.from_action(predicted)
+    actual_root = SubgameNode.from_action(actual)
+    if predicted_root is None or actual_root is None:
+        return None
+    predicted_bets = [a for a in predicted_root.actions if a.startswith('b')]
+    actual_bets = [a for a in actual_root.actions if a.startswith('b')]
+
+    mapped: Dict[str, float] = {}
+    for incr, prob in policy.items():
+        target = _map_action(incr, predicted_bets, actual_bets)
+        if target in actual_root.actions:
+            mapped[target] = mapped.get(target, 0.0) + prob
+    total = sum(mapped.values())
+    if total <= 0:
+        return None
+    return {incr: prob / total for incr, prob in mapped.items()}
+
+
+class ResolveStrategy(BaseStrategy):
+    """
+    Strategy that re-solves the remaining subgame at every postflop decision
+
+    Preflop decisions and fallbacks use the blueprint (if a policy file is
+    given) or check/call. A solve that visits the root fewer times than the
+    solver's threshold (see SubgameSolver.root_visit_threshold) falls back
+    as well, since its average strategy is still close to uniform. Our own
+    range comes from the blueprint when available and is uniform otherwise. The opponent range comes from the blueprint when
+    available, otherwise from a Bayesian OpponentRange that starts from a
+    uniform prior and is updated after every opponent action.
+
+    Speculative solves run on a separate in-process solver, so a prediction
+    that missed never touches the tables of the real solve.
+    """
+
+    def __init__(
+        self,
+        time_budget: float = 0.2,
+        workers: Optional[int] = None,
+        policy_file: Optional[str] = None,
+        seed: Optional[int] = None,
+        action_model: Optional[ActionFrequencyModel] = None,
+        min_root_visits: int = DEFAULT_MIN_ROOT_VISITS
+    ):
+        super().__init__()
+        self.time_budget = time_budget
+        self.fallback = BlueprintStrategy(policy_file, seed) if policy_file else SimpleStrategy()
+        self.solver = SubgameSolver(
+            workers=default_workers() if workers is None else workers,
+            seed=seed,
+            min_root_visits=min_root_visits
+        )
+        self.speculative_solver = SubgameSolver(
+            workers=0, seed=seed, min_root_visits=min_root_visits
+        )
+        self.rng = random.Random(seed)
+        self._last_decision: Optional[Tuple[Dict[str, float], Dict[str, float]]] = None
+        self.opponent_range = OpponentRange(action_model, seed=seed)
+        self._last_action: Optional[str] = None
+        self._last_hole_cards = []
+        self._precomputed: Dict[str, Dict[str, float]] = {}
+        self._precomputed_ranges: Dict[str, Range] = {}
+
+    def _start_hand_if_needed(self) -> None:
+        """Resets the solver tables when a new hand starts"""
+        same_hand = (
+            self._last_action is not None
+            and self.hole_cards == self._last_hole_cards
+            and self.current_action.startswith(self._last_action)
+        )
+        if not same_hand:
+            self.solver.reset()
+            self.speculative_solver.reset()
+            self._precomputed = {}
+            self._precomputed_ranges = {}
+        self._last_action = self.current_action
+        self._last_hole_cards = list(self.hole_cards)
+
+    def _opponent_range(self, game_state: Dict):
+        if isinstance(self.fallback, BlueprintStrategy):
+            return opponent_range_from_blueprint(
+                self.fallback.policy, game_state.get('action', ''),
+                game_state.get('board', []), 1 - game_state.get('client_pos', 0),
+                parse_cards(game_state.get('hole_cards', []))
+            )
+        return self.opponent_range.as_list(self.opponent_range.preview(game_state))
+
+    def _hero_range(self, game_state: Dict) -> Optional[Range]:
+        """Our own range as the opponent sees it (None means uniform over the live combos)"""
+        if isinstance(self.fallback, BlueprintStrategy):
+            return opponent_range_from_blueprint(
+                self.fallback.policy, game_state.get('action', ''),
+                game_state.get('board', []), game_state.get('client_pos', 0), []
+            )
+        return None
+
+    def speculative_work(self, game_state: Dict) -> Optional[Callable[[threading.Event], Any]]:
+        """
+        Solves a predicted state of the current street, or only computes the
+        opponent range for a state on the next street, whose card is unknown
+        """
+        action = game_state.get('action', '')
+        action_info = ParseAction(action)
+        if 'error' in action_info or action_info['st'] == 0:
+            return None
+        board = list(game_state.get('board', []))
+        position = game_state.get('client_pos', 0)
+        hole = parse_cards(game_state.get('hole_cards', []))
+
+        if len(board) < action_info['st'] + 2:
+            def work(stop: threading.Event):
+                return {'action': action, 'range': self._opponent_range(game_state)}
+            return work
+
+        def work(stop: threading.Event):
+            policy = self.speculative_solver.solve(
+                action, position, hole, parse_cards(board),
+                self._opponent_range(game_state), self.time_budget, stop=stop,
+                hero_range=self._hero_range(game_state)
+            )
+            return {'action': action, 'policy': policy} if policy else None
+        return work
+
+    def use_precomputed(self, game_state: Dict, result: Any) -> None:
+        action = game_state.get('action', '')
+        if 'range' in result:
+            # 予測時に分からなかったカードを含む組み合わせを除く
+            dead = set(parse_cards(game_state.get('board', [])))
+            self._precomputed_ranges[action] = [
+                (combo, weight) for combo, weight in result['range']
+                if combo[0] not in dead and combo[1] not in dead
+            ]
+            return
+        policy = _map_policy(result['policy'], result['action'], action)
+        if policy:
+            self._precomputed[action] = policy
+
+    def _fallback_action(self, game_state: Dict, action_info: Dict) -> str:
+        """Blueprint action when a policy file is loaded, otherwise check/call"""
+        if isinstance(self.fallback, BlueprintStrategy):
+            return self.fallback.decide_action(game_state)
+        return 'c' if action_info['last_bettor'] != -1 else 'k'
+
+    def decision_values(self) -> Optional[Tuple[Dict[str, float], Dict[str, float]]]:
+        return self._last_decision
+
+    def decide_action(self, game_state: Dict) -> str:
+        self.update_game_state(game_state)
+        self._last_decision = None
+
+        try:
+            action_info = ParseAction(self.current_action)
+
+            if 'error' in action_info:
+                logging.error(f"Error parsing action: {action_info['error']}")
+                return 'f'
+
+            self._start_hand_if_needed()
+            self.opponent_range.update(game_state)
+            if action_info['st'] == 0:
+                return self.fallback.decide_action(game_state)
+
+            policy = self._precomputed.pop(self.current_action, None)
+            solved = policy is None
+            if solved:
+                hole = parse_cards(self.hole_cards)
+                opponent_range = self._precomputed_ranges.pop(self.current_action, None)
+                policy = self.solver.solve(
+                    self.current_action, self.position, hole, parse_cards(self.board),
+                    opponent_range or self._opponent_range(game_state), self.time_budget,
+                    hero_range=self._hero_range(game_state)
+                )
+            if not policy:
+                return self._fallback_action(game_state, action_info)
+            if solved and self.solver.last_action_values:
+                self._last_decision = (policy, self.solver.last_action_values)
+
+            logging.debug(
+                f"Re-solved {self.current_action!r} in {self.solver.last_iterations} "
+                f"iterations: {policy}"
+            )
+            actions = list(policy)
+            return self.rng.choices(actions, weights=[policy[a] for a in actions])[0]
+        except Exception as e:
+            logging.error(f"Error in ResolveStrategy: {str(e)}")
+            return 'f'
+
+    def observe_result(self, game_state: Dict) -> None:
+        """Learns the opponent's action frequencies from hands that reached showdown"""
+        if game_state.get('bot_hole_cards'):
+            self.opponent_range.update(game_state)
+            self.opponent_range.record_showdown(game_state['bot_hole_cards'])
+        self.opponent_range.model.sync()
+
+    def warm_up(self) -> None:
+        """Starts the solver workers so the first decision gets its full time budget"""
+        self.solver.warm_up()
+        self.fallback.warm_up()
+
+    def close(self) -> None:
+        """Shuts down the solver workers"""
+        self.solver.close()
+        self.speculative_solver.close()
+        if isinstance(self.fallback, BlueprintStrategy):
+            self.fallback.close()
+
+    def __str__(self) -> str:
+        return "Re-solving Strategy"
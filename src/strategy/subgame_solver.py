@@ -0,0 +1,561 @@
+# src/strategy/subgame_solver.py
+
+"""
+Anytime re-solver for the remainder of the current hand.
+
+The subgame starts at the current action history and uses a small action
+abstraction (fold, check/call, a few pot-fraction bets and all-in). It is
+solved with external-sampling Monte Carlo CFR: every iteration samples
+both players' hole cards from their ranges and the remaining board, so the
+average strategy improves continuously and can be read at any time.
+
+Our hand is dealt from our own range too, so the opponent's strategy
+responds to the range rather than to our actual cards. Each player's
+information sets include only their own hand, abstracted to a strength
+bucket on the visible board (see strength_bucket) so that the few hundred
+iterations of a short budget are shared between similar hands. Our actual
+hand is dealt on ACTUAL_HAND_SHARE of our traversals, so the root policy
+of its bucket, which is what the solve returns, gets most of the updates. Tables are keyed by the absolute
+action history and stay resident in the process that built them until the
+hand changes. Each worker slot is a process of its own, so slot i always
+continues its own tables and consecutive decisions of the same hand build
+on the earlier work; only the root results cross process boundaries.
+
+A solve whose root was visited fewer times than the threshold returns
+None, so callers fall back instead of sampling a near-uniform policy. The
+threshold is min_root_visits, lowered to EXPECTED_VISIT_SHARE of the visits
+the measured solve speed gives in the time budget (but never below
+MIN_ROOT_VISITS_FLOOR), so a slow host still uses its solves while a solve
+that fell well short of the usual speed is discarded.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sample.slumbot_api import ParseAction, BIG_BLIND, STACK_SIZE
+from utils.action_utils import street_actions
+from utils.cards import (
+    FLUSH, FULL_HOUSE, HIGH_CARD, ONE_PAIR, STRAIGHT, THREE_OF_A_KIND, TWO_PAIR, evaluate
+)
+
+BET_FRACTIONS = (0.5, 1.0)
+MAX_BETS_PER_STREET = 3
+# Root visits of our actual hand below which a solve is not trusted (upper
+# bound of the threshold, see SubgameSolver.root_visit_threshold)
+DEFAULT_MIN_ROOT_VISITS = 300
+MIN_ROOT_VISITS_FLOOR = 20
+EXPECTED_VISIT_SHARE = 0.5
+# Share of our traversals that deal our actual hand (the rest use our range)
+ACTUAL_HAND_SHARE = 0.75
+# Attempts at dealing non-overlapping hands before an iteration is skipped
+MAX_DEAL_ATTEMPTS = 20
+
+Range = Sequence[Tuple[Tuple[int, int], float]]
+Tables = Dict[str, List[float]]
+
+
+class SubgameNode:
+    """Public betting state of the subgame (no card information)"""
+
+    __slots__ = (
+        'history', 'street', 'to_act', 'street_bets', 'base', 'acted',
+        'bets', 'last_bet_size', 'terminal', 'folder', '_actions', '_children'
+    )
+
+    def __init__(self, history: str, street: int, to_act: int, street_bets: List[int],
+                 base: int, acted: int, bets: int, last_bet_size: int,
+                 terminal: Optional[str] = None, folder: int = -1):
+        self.history = history
+        self.street = street
+        self.to_act = to_act
+        self.street_bets = street_bets
+        self.base = base
+        self.acted = acted
+        self.bets = bets
+        self.last_bet_size = last_bet_size
+        self.terminal = terminal
+        self.folder = folder
+        self._actions: Optional[List[str]] = None
+        self._children: Dict[str, 'SubgameNode'] = {}
+
+    @classmethod
+    def from_action(cls, action: str) -> Optional['SubgameNode']:
+        """Builds the root node from an API action string, or None if the hand is over"""
+        info = ParseAction(action)
+        if 'error' in info or info['pos'] == -1:
+            return None
+        to_act = info['pos']
+        street_bets = [0, 0]
+        street_bets[1 - to_act] = info['street_last_bet_to']
+        street_bets[to_act] = info['street_last_bet_to'] - info['last_bet_size']
+        incrs = street_actions(action)
+        return cls(
+            history=action,
+            street=info['st'],
+            to_act=to_act,
+            street_bets=street_bets,
+            base=info['total_last_bet_to'] - info['street_last_bet_to'],
+            acted=len(incrs),
+            bets=sum(1 for incr in incrs if incr.startswith('b')),
+            last_bet_size=info['last_bet_size']
+        )
+
+    def total(self, player: int) -> int:
+        """Chips the player has put into the pot"""
+        return self.base + self.street_bets[player]
+
+    @property
+    def actions(self) -> List[str]:
+        if self._actions is None:
+            self._actions = self._legal_actions()
+        return self._actions
+
+    def _legal_actions(self) -> List[str]:
+        me, other = self.to_act, 1 - self.to_act
+        facing = self.street_bets[other] > self.street_bets[me]
+        actions = ['f', 'c'] if facing else ['k']
+
+        max_to = STACK_SIZE - self.base
+        if self.street_bets[other] < max_to and self.bets < MAX_BETS_PER_STREET:
+            min_raise = max(self.last_bet_size, BIG_BLIND)
+            min_to = min(self.street_bets[other] + min_raise, max_to)
+            pot = 2 * self.total(other)
+            sizes = {max_to}
+            for fraction in BET_FRACTIONS:
+                bet_to = self.street_bets[other] + int(fraction * pot)
+                sizes.add(min(max(bet_to, min_to), max_to))
+            actions += [f'b{size}' for size in sorted(sizes)]
+        return actions
+
+    def child(self, incr: str) -> 'SubgameNode':
+        node = self._children.get(incr)
+        if node is None:
+            node = self._apply(incr)
+            self._children[incr] = node
+        return node
+
+    def _apply(self, incr: str) -> 'SubgameNode':
+        me, other = self.to_act, 1 - self.to_act
+        bets = list(self.street_bets)
+        history = self.history + incr
+
+        if incr == 'f':
+            return SubgameNode(history, self.street, -1, bets, self.base, 0, 0, 0,
+                               terminal='fold', folder=me)
+
+        if incr in ('k', 'c'):
+            bets[me] = bets[other]
+            if self.acted >= 1:
+                # チェック/コールでストリート終了
+                total = self.base + bets[me]
+                if total >= STACK_SIZE or self.street == 3:
+                    return SubgameNode(history, self.street, -1, bets, self.base, 0, 0, 0,
+                                       terminal='showdown')
+                return SubgameNode(history + '/', self.street + 1, 0, [0, 0], total, 0, 0, 0)
+            return SubgameNode(history, self.street, other, bets, self.base,
+                               self.acted + 1, self.bets, 0)
+
+        bet_to = int(incr[1:])
+        bet_size = bet_to - bets[other]
+        bets[me] = bet_to
+        return SubgameNode(history, self.street, other, bets, self.base,
+                           self.acted + 1, self.bets + 1, bet_size)
+
+
+def strength_bucket(hand: Sequence[int], board: Sequence[int]) -> int:
+    """
+    Card abstraction of a hand on a visible board (3-5 cards), from 0 to 7
+
+    No made hand, a pair below the top board card (or only the board's
+    pair), top pair or better, two pair, trips, straight, flush, and full
+    house or better. Draws are not distinguished.
+    """
+    score = evaluate(list(hand) + list(board))
+    category = score >> 20
+    if category == HIGH_CARD:
+        return 0
+    if category == ONE_PAIR:
+        pair_rank = ((score >> 16) & 0xF) - 1
+        board_ranks = [card >> 2 for card in board]
+        if board_ranks.count(pair_rank) >= 2:
+            return 0
+        return 2 if pair_rank >= max(board_ranks) else 1
+    return {TWO_PAIR: 3, THREE_OF_A_KIND: 4, STRAIGHT: 5, FLUSH: 6}.get(category, 7)
+
+
+def _regret_matching(regrets: List[float]) -> List[float]:
+    positive = [r if r > 0 else 0.0 for r in regrets]
+    total = sum(positive)
+    if total > 0:
+        return [r / total for r in positive]
+    return [1.0 / len(regrets)] * len(regrets)
+
+
+def _normalize(values: List[float]) -> Optional[List[float]]:
+    total = sum(values)
+    if total <= 0:
+        return None
+    return [value / total for value in values]
+
+
+class _MCCFR:
+    """External-sampling MCCFR over a SubgameNode tree (regret matching+)"""
+
+    def __init__(self, root: SubgameNode, hero: int, hole_cards: Sequence[int],
+                 board: Sequence[int], opponent_range: Range, rng: random.Random,
+                 regrets: Optional[Tables] = None, strategy_sums: Optional[Tables] = None,
+                 hero_range: Optional[Range] = None):
+        self.root = root
+        self.hero = hero
+        self.hole_cards = tuple(sorted(hole_cards))
+        self.board = list(board)
+        self.rng = rng
+        self.regrets: Tables = regrets if regrets is not None else {}
+        self.strategy_sums: Tables = strategy_sums if strategy_sums is not None else {}
+        self.root_values = [0.0] * len(root.actions)
+        self.root_visits = 0
+
+        dead = set(self.hole_cards) | set(self.board)
+        self.combos = [combo for combo, weight in opponent_range
+                       if weight > 0 and combo[0] not in dead and combo[1] not in dead]
+        self.cum_weights = []
+        total = 0.0
+        for combo, weight in opponent_range:
+            if weight > 0 and combo[0] not in dead and combo[1] not in dead:
+                total += weight
+                self.cum_weights.append(total)
+        # 自分のレンジ（ボードと重なる組み合わせを除く）
+        board_cards = set(self.board)
+        if hero_range is None:
+            hero_range = uniform_range(self.board)
+        self.hero_combos = []
+        self.hero_cum_weights = []
+        total = 0.0
+        for combo, weight in hero_range:
+            if weight > 0 and combo[0] not in board_cards and combo[1] not in board_cards:
+                total += weight
+                self.hero_combos.append(tuple(sorted(combo)))
+                self.hero_cum_weights.append(total)
+        self.deck = [card for card in range(52) if card not in board_cards]
+
+        self.root_key = f"{_root_key(root.history, self.board)}|{strength_bucket(self.hole_cards, self.board)}"
+        self._buckets: Dict[Tuple[Tuple[int, int], str], int] = {}
+        self._hero_hand: Tuple[int, int] = self.hole_cards
+        self._opp_hand: Tuple[int, int] = (0, 0)
+        self._full_board: List[int] = []
+        self._showdown = 0
+
+    def _sample_deal(self, hero_hand: Optional[Tuple[int, int]] = None) -> bool:
+        """Deals both hands (ours is hero_hand if given) and the board; False if it failed"""
+        for _ in range(MAX_DEAL_ATTEMPTS):
+            hand = hero_hand
+            if hand is None:
+                if not self.hero_combos:
+                    return False
+                hand = self.rng.choices(self.hero_combos, cum_weights=self.hero_cum_weights)[0]
+            combo = self.rng.choices(self.combos, cum_weights=self.cum_weights)[0]
+            if combo[0] not in hand and combo[1] not in hand:
+                break
+        else:
+            return False
+        self._hero_hand = hand
+        self._opp_hand = combo
+        missing = 5 - len(self.board)
+        deck = [card for card in self.deck if card not in hand and card not in combo]
+        self._full_board = self.board + self.rng.sample(deck, missing)
+        hero_score = evaluate(list(hand) + self._full_board)
+        opp_score = evaluate(list(combo) + self._full_board)
+        # 勝敗はプレイヤー0の視点
+        result = (hero_score > opp_score) - (hero_score < opp_score)
+        self._showdown = result if self.hero == 0 else -result
+        return True
+
+    def _visible_board(self, street: int) -> str:
+        count = 0 if street == 0 else street + 2
+        return ''.join(chr(48 + card) for card in self._full_board[:count])
+
+    def _info_key(self, node: SubgameNode) -> str:
+        hand = self._hero_hand if node.to_act == self.hero else self._opp_hand
+        board = self._visible_board(node.street)
+        bucket = self._buckets.get((hand, board))
+        if bucket is None:
+            bucket = strength_bucket(hand, self._full_board[:node.street + 2])
+            self._buckets[(hand, board)] = bucket
+        return f"{node.history}|{board}|{bucket}"
+
+    def _utility(self, node: SubgameNode) -> float:
+        """Terminal utility for player 0"""
+        if node.terminal == 'fold':
+            return -node.total(0) if node.folder == 0 else node.total(1)
+        return self._showdown * node.total(1)
+
+    def _traverse(self, node: SubgameNode, traverser: int) -> float:
+        if node.terminal is not None:
+            utility = self._utility(node)
+            return utility if traverser == 0 else -utility
+
+        actions = node.actions
+        key = self._info_key(node)
+        regrets = self.regrets.get(key)
+        if regrets is None:
+            regrets = [0.0] * len(actions)
+            self.regrets[key] = regrets
+        strategy = _regret_matching(regrets)
+
+        if node.to_act == traverser:
+            values = [self._traverse(node.child(action), traverser) for action in actions]
+            node_value = sum(p * v for p, v in zip(strategy, values))
+            for i, value in enumerate(values):
+                regrets[i] = max(regrets[i] + value - node_value, 0.0)
+            if node is self.root and self._hero_hand == self.hole_cards:
+                # 根は到達確率が1なので、現在の戦略をそのまま平均戦略に加える
+                sums = self.strategy_sums.setdefault(key, [0.0] * len(actions))
+                for i, value in enumerate(values):
+                    self.root_values[i] += value
+                    sums[i] += strategy[i]
+                self.root_visits += 1
+            return node_value
+
+        sums = self.strategy_sums.setdefault(key, [0.0] * len(actions))
+        for i, p in enumerate(strategy):
+            sums[i] += p
+        index = self.rng.choices(range(len(actions)), weights=strategy)[0]
+        return self._traverse(node.child(actions[index]), traverser)
+
+    def run(self, deadline: float, stop: Optional[threading.Event] = None) -> int:
+        """
+        Runs iterations until the deadline (time.time) and returns the count
+
+        If stop is given, it is checked before every iteration and ends the
+        run early once set.
+        """
+        iterations = 0
+        if not self.combos:
+            return iterations
+        while time.time() < deadline and not (stop is not None and stop.is_set()):
+            actual = self.rng.random() < ACTUAL_HAND_SHARE
+            if self._sample_deal(self.hole_cards if actual else None):
+                self._traverse(self.root, self.hero)
+            if self._sample_deal():
+                self._traverse(self.root, 1 - self.hero)
+            iterations += 1
+        return iterations
+
+
+class _Tables:
+    """Regret and strategy tables of one hand"""
+
+    def __init__(self):
+        self.hand_id: Optional[int] = None
+        self.regrets: Tables = {}
+        self.strategy_sums: Tables = {}
+
+    def for_hand(self, hand_id: int) -> '_Tables':
+        if self.hand_id != hand_id:
+            self.hand_id = hand_id
+            self.regrets = {}
+            self.strategy_sums = {}
+        return self
+
+
+# ワーカープロセスのテーブル（ハンドが変わるまで保持）
+_worker_tables = _Tables()
+
+
+def _run_mccfr(hand_id: int, action: str, hero: int, hole_cards: List[int],
+               board: List[int], opponent_range: Range, deadline: float, seed: int,
+               tables: Optional[_Tables] = None, stop: Optional[threading.Event] = None,
+               hero_range: Optional[Range] = None):
+    """
+    Worker entry point: runs MCCFR until the deadline on this process' tables
+
+    Returns the root average-strategy sums, the summed root action values,
+    the number of root visits and the number of iterations.
+    """
+    tables = (tables or _worker_tables).for_hand(hand_id)
+    root = SubgameNode.from_action(action)
+    solver = _MCCFR(root, hero, hole_cards, board, opponent_range,
+                    random.Random(seed), tables.regrets, tables.strategy_sums, hero_range)
+    iterations = solver.run(deadline, stop)
+
+    root_sums = list(tables.strategy_sums.get(solver.root_key, [0.0] * len(root.actions)))
+    return root_sums, solver.root_values, solver.root_visits, iterations
+
+
+def _root_key(action: str, board: Sequence[int]) -> str:
+    return f"{action}|{''.join(chr(48 + card) for card in board)}"
+
+
+def uniform_range(dead_cards: Sequence[int] = ()) -> Range:
+    """Uniform prior over all hole-card combos not blocked by dead cards"""
+    dead = set(dead_cards)
+    return [(combo, 1.0) for combo in combinations(range(52), 2)
+            if combo[0] not in dead and combo[1] not in dead]
+
+
+def default_workers(processes: int = 1) -> int:
+    """One worker per spare CPU core, split evenly between session processes"""
+    return max((os.cpu_count() or 1) // max(processes, 1) - 1, 0)
+
+
+class SubgameSolver:
+    """
+    Time-bounded subgame re-solver with optional worker processes
+
+    With workers > 0 each decision runs one MCCFR instance per worker process
+    and merges the root strategies that arrive before the deadline. Every
+    worker is a single-process pool, so the same worker keeps the tables of
+    a hand from one decision to the next. With workers == 0 the solve runs
+    in the calling process on tables owned by this instance, so several
+    in-process solvers do not share state.
+    """
+
+    def __init__(self, workers: int = 0, overhead_ratio: float = 0.1,
+                 seed: Optional[int] = None,
+                 min_root_visits: int = DEFAULT_MIN_ROOT_VISITS):
+        self.workers = workers
+        self.overhead_ratio = overhead_ratio
+        self.min_root_visits = min_root_visits
+        self.rng = random.Random(seed)
+        self.hand_id = self.rng.getrandbits(63)
+        self.last_iterations = 0
+        self.last_root_visits = 0
+        # 1秒あたりの根の訪問回数（全ワーカーの合計、指数移動平均）
+        self.visit_rate: Optional[float] = None
+        self.last_action_values: Optional[Dict[str, float]] = None
+        self._root_policies: Dict[str, Dict[str, float]] = {}
+        self._tables = _Tables()
+        self._pools: List[ProcessPoolExecutor] = []
+
+    def _get_pools(self) -> List[ProcessPoolExecutor]:
+        if not self._pools:
+            self._pools = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        return self._pools
+
+    def warm_up(self) -> None:
+        """Starts the worker processes now instead of during the first solve"""
+        if self.workers > 0:
+            wait([pool.submit(os.getpid) for pool in self._get_pools()])
+
+    def reset(self) -> None:
+        """Starts a new hand (the worker tables are discarded on their next use)"""
+        self.hand_id += 1
+        self.last_action_values = None
+        self._root_policies = {}
+        # 実行中の解法が古いテーブルに書き込んでも、新しいハンドには影響しない
+        self._tables = _Tables()
+
+    def root_visit_threshold(self, time_budget: float) -> int:
+        """
+        Root visits a solve of time_budget seconds needs before it is used
+
+        min_root_visits, lowered to EXPECTED_VISIT_SHARE of the visits the
+        measured rate gives in the budget, and never below
+        MIN_ROOT_VISITS_FLOOR.
+        """
+        if self.visit_rate is None:
+            return min(self.min_root_visits, MIN_ROOT_VISITS_FLOOR)
+        expected = self.visit_rate * time_budget * (1 - self.overhead_ratio)
+        return min(self.min_root_visits,
+                   max(int(EXPECTED_VISIT_SHARE * expected), MIN_ROOT_VISITS_FLOOR))
+
+    def solve(self, action: str, hero: int, hole_cards: List[int], board: List[int],
+              opponent_range: Range, time_budget: float,
+              stop: Optional[threading.Event] = None,
+              hero_range: Optional[Range] = None) -> Optional[Dict[str, float]]:
+        """
+        Re-solves the subgame rooted at action within time_budget seconds
+
+        hero_range is our own range (uniform over the combos not blocked by
+        the board if None). Returns the average strategy of our actual hand
+        at the root as {action: probability}, or None if nothing could be
+        computed or the root was visited fewer times than
+        root_visit_threshold(time_budget). stop cancels an in-process solve
+        (workers == 0) between iterations.
+        """
+        start = time.time()
+        root = SubgameNode.from_action(action)
+        if root is None or root.to_act != hero:
+            return None
+
+        deadline = start + time_budget * (1 - self.overhead_ratio)
+        if self.workers <= 0:
+            results = [_run_mccfr(self.hand_id, action, hero, hole_cards, board,
+                                  opponent_range, deadline, self.rng.getrandbits(32),
+                                  self._tables, stop, hero_range)]
+        else:
+            futures = [
+                pool.submit(_run_mccfr, self.hand_id, action, hero, hole_cards, board,
+                            opponent_range, deadline, self.rng.getrandbits(32),
+                            None, None, hero_range)
+                for pool in self._get_pools()
+            ]
+            done, not_done = wait(futures, timeout=max(start + time_budget - time.time(), 0.0))
+            for future in not_done:
+                future.cancel()
+            results = []
+            for future in done:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logging.warning(f"Subgame worker failed: {str(e)}")
+
+        threshold = self.root_visit_threshold(time_budget)
+        self._merge(action, board, root, results, threshold)
+        if not (stop is not None and stop.is_set()):
+            self._update_visit_rate(results, deadline - start)
+        if self.last_root_visits < threshold:
+            logging.debug(f"Solve of {action!r} visited the root {self.last_root_visits} times "
+                          f"(minimum {threshold})")
+            return None
+        return self.root_policy(action, board)
+
+    def _update_visit_rate(self, results: list, seconds: float) -> None:
+        if not results or seconds <= 0:
+            return
+        rate = sum(visits for _, _, visits, _ in results) / seconds
+        self.visit_rate = rate if self.visit_rate is None else 0.7 * self.visit_rate + 0.3 * rate
+
+    def _merge(self, action: str, board: List[int], root: SubgameNode, results: list,
+               threshold: int) -> None:
+        root_sums = [0.0] * len(root.actions)
+        root_values = [0.0] * len(root.actions)
+        root_visits = 0
+        self.last_iterations = 0
+        # 平均戦略の和は根の訪問1回ごとに1増える（以前の判断の分も含む）
+        self.last_root_visits = 0
+
+        for sums, values, visits, iterations in results:
+            total = sum(sums)
+            if total > 0:
+                for i, value in enumerate(sums):
+                    root_sums[i] += value / total
+            for i, value in enumerate(values):
+                root_values[i] += value
+            root_visits += visits
+            self.last_iterations += iterations
+            self.last_root_visits += int(round(total))
+
+        probs = _normalize(root_sums)
+        if probs is not None and self.last_root_visits >= threshold:
+            self._root_policies[_root_key(action, board)] = dict(zip(root.actions, probs))
+        if root_visits:
+            self.last_action_values = {
+                incr: value / root_visits for incr, value in zip(root.actions, root_values)
+            }
+
+    def root_policy(self, action: str, board: List[int]) -> Optional[Dict[str, float]]:
+        """Best policy found so far at the root, or None if it was never solved"""
+        return self._root_policies.get(_root_key(action, board))
+
+    def close(self) -> None:
+        """Shuts down the worker processes"""
+        for pool in self._pools:
+            pool.shutdown(wait=False)
+        self._pools = []
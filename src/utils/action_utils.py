@@ -0,0 +1,31 @@
+# src/utils/action_utils.py
+
+from typing import List, Tuple
+
+
+def split_action(action: str) -> List[Tuple[str, str]]:
+    """
+    アクション文字列を (直前までの履歴, 増分アクション) のリストに分解
+
+    例: 'b200c/kb400' -> [('', 'b200'), ('b200', 'c'), ('b200c/', 'k'), ('b200c/k', 'b400')]
+    """
+    increments = []
+    i = 0
+    size = len(action)
+    while i < size:
+        c = action[i]
+        if c == '/':
+            i += 1
+            continue
+        j = i + 1
+        if c == 'b':
+            while j < size and action[j].isdigit():
+                j += 1
+        increments.append((action[:i], action[i:j]))
+        i = j
+    return increments
+
+
+def street_actions(action: str) -> List[str]:
+    """現在のストリートの増分アクションのリスト"""
+    return [incr for _, incr in split_action(action.rsplit('/', 1)[-1])]
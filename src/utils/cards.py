@@ -0,0 +1,190 @@
+# src/utils/cards.py
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+
+NUM_PREFLOP_CLASSES = 169
+
+# 役の強さ（評価値の上位ビット）
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+
+def parse_card(card: str) -> int:
+    """'Ac' 形式のカードを 0-51 の整数に変換（rank * 4 + suit）"""
+    if len(card) != 2 or card[0] not in RANKS or card[1] not in SUITS:
+        raise ValueError(f"Invalid card: {card}")
+    return RANKS.index(card[0]) * 4 + SUITS.index(card[1])
+
+
+def parse_cards(cards: Iterable[str]) -> List[int]:
+    """カード文字列のリストを整数のリストに変換"""
+    return [parse_card(card) for card in cards]
+
+
+def card_to_str(card: int) -> str:
+    """整数のカードを 'Ac' 形式に変換"""
+    return RANKS[card >> 2] + SUITS[card & 3]
+
+
+def preflop_class(card1: int, card2: int) -> int:
+    """
+    ハンドの169クラスのインデックスを返す
+
+    13x13 のグリッドで、ペアは対角線、スーテッドは (高ランク, 低ランク)、
+    オフスートは (低ランク, 高ランク) のセルに対応する。
+    """
+    rank1, rank2 = card1 >> 2, card2 >> 2
+    high, low = max(rank1, rank2), min(rank1, rank2)
+    if high == low or (card1 & 3) != (card2 & 3):
+        return low * 13 + high
+    return high * 13 + low
+
+
+def preflop_class_label(index: int) -> str:
+    """169クラスのインデックスを 'AKs' 形式のラベルに変換"""
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return f"{RANKS[row]}{RANKS[col]}s"
+    return f"{RANKS[col]}{RANKS[row]}o"
+
+
+def _straight_high(rank_mask: int) -> int:
+    """ランクのビットマスクからストレートの最高ランクを返す（なければ -1）"""
+    for high in range(12, 3, -1):
+        needed = 0b11111 << (high - 4)
+        if rank_mask & needed == needed:
+            return high
+    # A-2-3-4-5（ホイール）
+    if rank_mask & 0b1111 == 0b1111 and rank_mask & (1 << 12):
+        return 3
+    return -1
+
+
+def _score(category: int, kickers: Sequence[int]) -> int:
+    score = category
+    for i in range(5):
+        score = (score << 4) | (kickers[i] + 1 if i < len(kickers) else 0)
+    return score
+
+
+def evaluate(cards: Sequence[int]) -> int:
+    """
+    5-7枚のカードから最良の5枚の役を評価する
+
+    値が大きいほど強い役で、同じ値は引き分けを意味する。
+    上位ビットが役の種類（HIGH_CARD ... STRAIGHT_FLUSH）を表す。
+    """
+    rank_counts = [0] * 13
+    suit_masks = [0] * 4
+    rank_mask = 0
+    for card in cards:
+        rank = card >> 2
+        rank_counts[rank] += 1
+        suit_masks[card & 3] |= 1 << rank
+        rank_mask |= 1 << rank
+
+    for suit_mask in suit_masks:
+        if bin(suit_mask).count('1') >= 5:
+            high = _straight_high(suit_mask)
+            if high >= 0:
+                return _score(STRAIGHT_FLUSH, [high])
+            flush_ranks = [r for r in range(12, -1, -1) if suit_mask & (1 << r)]
+            return _score(FLUSH, flush_ranks[:5])
+
+    quads, trips, pairs, singles = [], [], [], []
+    for rank in range(12, -1, -1):
+        count = rank_counts[rank]
+        if count == 4:
+            quads.append(rank)
+        elif count == 3:
+            trips.append(rank)
+        elif count == 2:
+            pairs.append(rank)
+        elif count == 1:
+            singles.append(rank)
+
+    if quads:
+        kicker = max(trips + pairs + singles, default=-1)
+        return _score(FOUR_OF_A_KIND, [quads[0], kicker] if kicker >= 0 else [quads[0]])
+    if trips and (len(trips) > 1 or pairs):
+        pair = max(trips[1:] + pairs)
+        return _score(FULL_HOUSE, [trips[0], pair])
+
+    high = _straight_high(rank_mask)
+    if high >= 0:
+        return _score(STRAIGHT, [high])
+    if trips:
+        return _score(THREE_OF_A_KIND, [trips[0]] + singles[:2])
+    if len(pairs) >= 2:
+        kicker = max(pairs[2:] + singles, default=-1)
+        kickers = [pairs[0], pairs[1]] + ([kicker] if kicker >= 0 else [])
+        return _score(TWO_PAIR, kickers)
+    if pairs:
+        return _score(ONE_PAIR, [pairs[0]] + singles[:3])
+    return _score(HIGH_CARD, singles[:5])
+
+
+def hand_category(score: int) -> int:
+    """評価値から役の種類を取り出す"""
+    return score >> 20
+
+
+def hand_strength(hole_cards: Sequence[int], board: Sequence[int]) -> float:
+    """
+    現在のボードで、残りの全ての相手ハンドに対して勝つ割合（引き分けは0.5）
+
+    ボードが3枚未満の場合は0.5を返す。
+    """
+    if len(board) < 3:
+        return 0.5
+    own_score = evaluate(list(hole_cards) + list(board))
+    dead = set(hole_cards) | set(board)
+    live = [card for card in range(52) if card not in dead]
+    wins = ties = total = 0
+    for opp in combinations(live, 2):
+        opp_score = evaluate(list(opp) + list(board))
+        if own_score > opp_score:
+            wins += 1
+        elif own_score == opp_score:
+            ties += 1
+        total += 1
+    return (wins + 0.5 * ties) / total
+
+
+def combo_strengths(board: Sequence[int], dead: Iterable[int] = ()) -> Dict[Tuple[int, int], float]:
+    """
+    ボード上の全ての生きているハンドの強さ（他のハンドに勝つ割合）
+
+    hand_strength と同じ定義だが、全ハンドの評価値を一度だけ計算して
+    並べ替えるため、ハンドごとに呼ぶより大幅に速い（カード除外の影響は近似）。
+    """
+    excluded = set(board) | set(dead)
+    live = [card for card in range(52) if card not in excluded]
+    scored = sorted(
+        (evaluate(list(combo) + list(board)), combo) for combo in combinations(live, 2)
+    )
+    total = len(scored) - 1
+    strengths = {}
+    i = 0
+    while i < len(scored):
+        j = i
+        while j < len(scored) and scored[j][0] == scored[i][0]:
+            j += 1
+        value = (i + 0.5 * (j - i - 1)) / total if total > 0 else 0.5
+        for _, combo in scored[i:j]:
+            strengths[combo] = value
+        i = j
+    return strengths
@@ -0,0 +1,136 @@
+# src/utils/hand_eval.py
+
+"""
+NumPy版の役評価（utils.cards.evaluate と同じ評価値を返す）
+
+多数のハンドをまとめて評価するためのもので、1326通りのホールカード全てや
+複数のランアウトを一度に評価する用途を想定している。
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+from .cards import (
+    HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH,
+    FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH
+)
+
+NUM_COMBOS = 1326
+
+# 全ホールカードの組み合わせ (1326, 2) と、各カードを含む組み合わせのマスク (52, 1326)
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+CARD_MASK = np.zeros((52, NUM_COMBOS), dtype=bool)
+CARD_MASK[COMBOS[:, 0], np.arange(NUM_COMBOS)] = True
+CARD_MASK[COMBOS[:, 1], np.arange(NUM_COMBOS)] = True
+
+_RANK_BITS = 1 << np.arange(13, dtype=np.int64)
+
+
+def combo_index(card1: int, card2: int) -> int:
+    """ホールカードの組み合わせのインデックス（COMBOS の行番号）"""
+    low, high = min(card1, card2), max(card1, card2)
+    return low * (103 - low) // 2 + high - low - 1
+
+
+def _top_ranks(present: np.ndarray, k: int) -> np.ndarray:
+    """(N, 13) の真偽値から上位 k 個のランクを降順に返す（足りない分は -1）"""
+    reverse = present[:, ::-1]
+    order = np.argsort(~reverse, axis=1, kind='stable')[:, :k]
+    valid = np.take_along_axis(reverse, order, axis=1)
+    return np.where(valid, 12 - order, -1)
+
+
+def _without(present: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """present から指定ランク（-1 は無視）を除いたもの"""
+    return present & (np.arange(13) != ranks[:, None])
+
+
+def _encode(category: int, kickers: np.ndarray) -> np.ndarray:
+    score = np.full(kickers.shape[0], category, dtype=np.int64)
+    for i in range(5):
+        kicker = kickers[:, i] + 1 if i < kickers.shape[1] else 0
+        score = (score << 4) | kicker
+    return score
+
+
+def _straight_high(mask: np.ndarray) -> np.ndarray:
+    high = np.full(mask.shape[0], -1, dtype=np.int64)
+    for top in range(4, 13):
+        needed = 0b11111 << (top - 4)
+        high = np.where(mask & needed == needed, top, high)
+    wheel = (mask & 0b1111 == 0b1111) & (mask & (1 << 12) != 0)
+    return np.where((high < 0) & wheel, 3, high)
+
+
+def evaluate_many(cards: np.ndarray) -> np.ndarray:
+    """
+    (N, k) のカード配列（5 <= k <= 7）を評価し、(N,) の評価値を返す
+
+    値の定義は utils.cards.evaluate と同じ。
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    ranks = cards >> 2
+    suits = cards & 3
+    rank_counts = (ranks[:, :, None] == np.arange(13)).sum(axis=1)
+    suit_counts = (suits[:, :, None] == np.arange(4)).sum(axis=1)
+    rank_mask = (rank_counts > 0) @ _RANK_BITS
+
+    flush_suit = suit_counts.argmax(axis=1)
+    has_flush = suit_counts.max(axis=1) >= 5
+    in_flush = suits == flush_suit[:, None]
+    flush_mask = np.where(in_flush, 1 << ranks, 0).sum(axis=1)
+    flush_present = (flush_mask[:, None] & _RANK_BITS) != 0
+
+    quads = rank_counts == 4
+    trips = rank_counts == 3
+    pairs = rank_counts == 2
+    singles = rank_counts == 1
+
+    flush_high = _straight_high(flush_mask)
+    straight_high = _straight_high(rank_mask)
+    quad_rank = _top_ranks(quads, 1)[:, 0]
+    trip_ranks = _top_ranks(trips, 1)[:, 0]
+    pair_ranks = _top_ranks(pairs, 2)
+    full_house_pair = _top_ranks(_without(trips, trip_ranks) | pairs, 1)[:, 0]
+
+    candidates = [
+        (has_flush & (flush_high >= 0),
+         lambda: _encode(STRAIGHT_FLUSH, flush_high[:, None])),
+        (quad_rank >= 0,
+         lambda: _encode(FOUR_OF_A_KIND, np.column_stack(
+             [quad_rank, _top_ranks(_without(rank_counts > 0, quad_rank), 1)[:, 0]]))),
+        ((trip_ranks >= 0) & (full_house_pair >= 0),
+         lambda: _encode(FULL_HOUSE, np.column_stack([trip_ranks, full_house_pair]))),
+        (has_flush,
+         lambda: _encode(FLUSH, _top_ranks(flush_present, 5))),
+        (straight_high >= 0,
+         lambda: _encode(STRAIGHT, straight_high[:, None])),
+        (trip_ranks >= 0,
+         lambda: _encode(THREE_OF_A_KIND, np.column_stack(
+             [trip_ranks, _top_ranks(singles, 2)]))),
+        (pair_ranks[:, 1] >= 0,
+         lambda: _encode(TWO_PAIR, np.column_stack([pair_ranks, _top_ranks(
+             _without(_without(pairs, pair_ranks[:, 0]), pair_ranks[:, 1]) | singles, 1)]))),
+        (pair_ranks[:, 0] >= 0,
+         lambda: _encode(ONE_PAIR, np.column_stack(
+             [pair_ranks[:, :1], _top_ranks(singles, 3)]))),
+    ]
+
+    score = _encode(HIGH_CARD, _top_ranks(singles, 5))
+    decided = np.zeros(cards.shape[0], dtype=bool)
+    for condition, build in candidates:
+        condition = condition & ~decided
+        if condition.any():
+            score = np.where(condition, build(), score)
+            decided |= condition
+    return score
+
+
+def combo_scores(board) -> np.ndarray:
+    """全1326組み合わせをボードと合わせて評価（ボードと重なる組み合わせの値は無意味）"""
+    board = np.asarray(board, dtype=np.int64)
+    cards = np.concatenate(
+        [COMBOS, np.broadcast_to(board, (NUM_COMBOS, board.shape[0]))], axis=1
+    )
+    return evaluate_many(cards)
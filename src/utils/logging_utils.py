@@ -0,0 +1,105 @@
+# src/utils/logging_utils.py
+
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+# ハンドごとのログを出力するロガー（レベルを個別に設定可能）
+HAND_LOGGER_NAME = 'session.hand'
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    キューが満杯の場合はブロックせずにレコードを破棄する QueueHandler
+
+    メッセージの整形は呼び出し側ではなくリスナースレッドで行う。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 例外情報だけはトレースバックが変わる前にここで文字列化する
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingSentinelListener(QueueListener):
+    """停止時の終了マーカーだけは満杯のキューでも待って投入する"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """1レコード1行のJSON形式（extra={'hand': {...}} の内容も出力）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        hand = getattr(record, 'hand', None)
+        if hand is not None:
+            entry['hand'] = hand
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueuedLogging:
+    """ルートロガーをキュー経由のバックグラウンド書き込みに切り替える"""
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        level: int = logging.WARNING,
+        hand_level: Optional[int] = None,
+        queue_size: int = 10000
+    ):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.listener = _BlockingSentinelListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        logging.getLogger(HAND_LOGGER_NAME).setLevel(level if hand_level is None else hand_level)
+
+        self.listener.start()
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def stop(self) -> None:
+        """
+        キューに残ったレコードを書き出してリスナーを停止
+
+        停止後のログは元のハンドラーに直接書き込まれる。
+        """
+        self.listener.stop()
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+        for handler in self.listener.handlers:
+            handler.flush()
+            root.addHandler(handler)
@@ -2,13 +2,21 @@
 
 import time
 import logging
-from typing import Any, Callable, TypeVar, Optional
+from typing import Any, Callable, Dict, TypeVar, Optional
 from functools import wraps
 
-from sample.slumbot_api import NewHand, Login
+from sample.slumbot_api import NewHand, Login, Act, IllegalActionError, RequestTimeout, ServerError
 
 T = TypeVar('T')
 
+# 空のアクションによる状態の確認をサーバーが受け付けるか（None は未確認）。
+# API の文書にない使い方なので、空のアクション自体が拒否されたら以後は送らない
+_state_probe_supported: Optional[bool] = None
+# 空のアクション自体を拒否したエラーメッセージに含まれる語句（ハンド終了などとの区別）
+_UNSUPPORTED_PROBE_WORDS = ('empty', 'missing', 'required', 'no incr')
+# ハンドが終わっていて状態を確認できなかったことを示す probe_state の戻り値
+HAND_OVER: Dict[str, Any] = {'hand_over': True}
+
 def execute_with_retry(
     func: Callable[[], T],
     max_retries: int = 3,
@@ -67,4 +75,118 @@ def with_valid_token(func: Callable) -> Callable:
                 kwargs['current_token'] = None
                 
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def increment_applied(action_before: str, incr: str, action_after: str) -> Optional[bool]:
+    """
+    応答のアクション文字列から、送ったアクションが適用されたかを判定
+
+    Returns:
+    --------
+    Optional[bool]
+        適用済みなら True、未適用なら False、どちらとも言えない場合は None
+    """
+    if action_after == action_before:
+        return False
+    applied = action_before + incr
+    if action_after.startswith(applied):
+        # b300 と b3000 のような前方一致を除外
+        rest = action_after[len(applied):]
+        if not (incr[-1:].isdigit() and rest[:1].isdigit()):
+            return True
+    return None
+
+def probe_state(token: Optional[str], max_attempts: int = 3) -> Optional[Dict[str, Any]]:
+    """
+    空のアクションを送って現在のハンドの状態を取得する
+
+    空のアクションは状態を変えないので、タイムアウトした場合は再送する。
+    サーバーが空のアクション自体を拒否した場合や状態を返さない場合は
+    None を返し、以後は送らない。それ以外の理由での拒否（ハンドが終わって
+    いるなど）は HAND_OVER を返す（以後も送る）。max_attempts 回とも
+    タイムアウトした場合も None を返す。
+    """
+    global _state_probe_supported
+    if _state_probe_supported is False:
+        return None
+    for attempt in range(max_attempts):
+        try:
+            state = Act(token, '')
+        except RequestTimeout as e:
+            logging.warning(f"State probe timed out ({attempt + 1}/{max_attempts}): {str(e)}")
+            continue
+        except IllegalActionError as e:
+            message = str(e).lower()
+            if any(word in message for word in _UNSUPPORTED_PROBE_WORDS):
+                logging.warning(f"Server does not accept the state probe, disabling it: {str(e)}")
+                _state_probe_supported = False
+                return None
+            logging.warning(f"State probe rejected, the hand is over: {str(e)}")
+            return HAND_OVER
+        if 'action' not in state:
+            logging.warning(f"State probe returned no action, disabling it: {state!r}")
+            _state_probe_supported = False
+            return None
+        _state_probe_supported = True
+        return state
+    return None
+
+def act_with_reconciliation(
+    token: Optional[str],
+    action_before: str,
+    incr: str,
+    max_attempts: int = 3
+) -> Dict[str, Any]:
+    """
+    タイムアウト時に二重送信しない Act
+
+    接続タイムアウトはサーバーに届いていないのでそのまま再送する。
+    読み込みタイムアウトの場合は probe_state で現在の状態を取得し、
+    アクション文字列から適用済みかを判定して、未適用の場合だけ再送する。
+    状態を取得できない場合はタイムアウトの例外を、判定できない場合や
+    送ったアクションでハンドが終わっていた場合（結果は分からない）は
+    ServerError を送出する（いずれもハンドは破棄される）。
+
+    Parameters:
+    -----------
+    token : Optional[str]
+        APIトークン
+    action_before : str
+        送信前のアクション文字列
+    incr : str
+        送信するアクション
+    max_attempts : int
+        送信の最大回数
+    """
+    for attempt in range(max_attempts):
+        try:
+            return Act(token, incr)
+        except RequestTimeout as e:
+            if attempt == max_attempts - 1:
+                raise
+            if not e.sent:
+                logging.warning(f"Act {incr!r} connect timed out, resending")
+                continue
+            
+            logging.warning(f"Act {incr!r} timed out, checking whether it was applied")
+            state = probe_state(token)
+            if state is None:
+                # 適用済みかわからないので再送しない
+                raise e
+            if state is HAND_OVER:
+                # 送ったアクションが適用されてハンドが終わった（再送しない）
+                raise ServerError(
+                    f"Act {incr!r} was applied and ended the hand; its result is unknown",
+                    endpoint='act'
+                ) from e
+            applied = increment_applied(action_before, incr, state.get('action', ''))
+            if applied:
+                return state
+            if applied is None:
+                raise ServerError(
+                    f"Cannot reconcile act {incr!r}: {action_before!r} -> "
+                    f"{state.get('action')!r}",
+                    endpoint='act'
+                ) from e
+            token = state.get('token', token)
+            logging.warning(f"Act {incr!r} was not applied, resending")
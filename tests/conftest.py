@@ -0,0 +1,10 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+# src/main.py と同じく、src 配下のパッケージとプロジェクト直下の sample を import できるようにする
+project_root = Path(__file__).resolve().parent.parent
+for path in (project_root, project_root / 'src'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,71 @@
+# tests/test_batch_analysis.py
+
+import json
+import logging
+
+from analysis.batch_analysis import load_sessions, parse_session
+
+# 初期の SessionManager が --verbose で書いていた session.log（1ハンドごとの行はない）
+BASELINE_LOG = """\
+2024-01-10 12:00:00,000 - INFO - Starting poker session...
+2024-01-10 12:00:00,001 - INFO - Number of hands to play: 100
+2024-01-10 12:00:00,001 - INFO - Chunk size: 50
+2024-01-10 12:00:00,001 - INFO - Using strategy: simple
+2024-01-10 12:00:00,002 - INFO - Starting chunk 1/2 (50 hands)
+2024-01-10 12:05:00,000 - INFO -
+Session Summary:
+Completed chunks: 2/2 (100.0%)
+Hands played: 100/100
+Total duration: 0:05:00
+Performance: 0.3 hands/sec
+Final balance: -1,250 chips
+Average per hand: -12.5
+2024-01-10 12:05:00,001 - INFO - Session complete.
+"""
+
+
+def test_parse_session_reads_baseline_log_summary(tmp_path):
+    session = tmp_path / 'session_20240110_120000'
+    session.mkdir()
+    (session / 'session.log').write_text(BASELINE_LOG, encoding='utf-8')
+
+    result = parse_session(str(session))
+
+    assert result['strategy'] == 'simple'
+    assert result['winnings'] == []
+    assert result['summary'] == {'hands': 100, 'total': -1250}
+
+
+def test_parse_session_reads_hand_finished_lines(tmp_path):
+    session = tmp_path / 'session_20240110_120000'
+    session.mkdir()
+    (session / 'session.log').write_text(
+        "2024-01-10 12:00:00,000 - INFO - Hand finished: 'b200c/kk/kk/kk', winnings 200\n"
+        "2024-01-10 12:00:01,000 - INFO - Hand finished: 'f', winnings -50\n",
+        encoding='utf-8'
+    )
+
+    assert parse_session(str(session))['winnings'] == [200, -50]
+
+
+def test_load_sessions_warns_for_sessions_without_hands(tmp_path, caplog):
+    legacy = tmp_path / 'session_20240110_120000'
+    legacy.mkdir()
+    (legacy / 'session.log').write_text(BASELINE_LOG, encoding='utf-8')
+    empty = tmp_path / 'session_20240111_120000'
+    empty.mkdir()
+    (empty / 'session.log').write_text('', encoding='utf-8')
+    played = tmp_path / 'session_20240112_120000'
+    played.mkdir()
+    (played / 'hands.jsonl').write_text(
+        json.dumps({'winnings': 100, 'strategy': 'simple'}) + '\n', encoding='utf-8'
+    )
+
+    with caplog.at_level(logging.WARNING):
+        sessions = load_sessions(tmp_path, workers=1, use_cache=False)
+
+    assert [len(s['winnings']) for s in sessions] == [0, 0, 1]
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 2
+    assert 'session_20240110_120000' in warnings[0] and '100 hands' in warnings[0]
+    assert 'session_20240111_120000' in warnings[1]
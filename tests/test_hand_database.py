@@ -0,0 +1,50 @@
+# tests/test_hand_database.py
+
+import pytest
+
+from analysis.hand_database import FLOP, PREFLOP, RIVER, TURN, HandDatabase, hand_row
+
+BOARD = ['2c', '7d', 'Th', 'Ks', '3h']
+
+
+def _record(action, board, winnings=100):
+    return {'action': action, 'board': board, 'winnings': winnings, 'client_pos': 0,
+            'hole_cards': ['Ah', 'Ad'], 'bot_hole_cards': ['Kc', 'Kd'] if not action.endswith('f') else None}
+
+
+@pytest.mark.parametrize('action, board, street', [
+    ('b20000c', BOARD, RIVER),
+    ('b20000c///', BOARD, RIVER),
+    ('b200c/b19800c', BOARD, RIVER),
+    ('b200c/b19800c//', BOARD, RIVER),
+    ('b200c/kk/kk/kk', BOARD, RIVER),
+    ('b200f', [], PREFLOP),
+    ('b200c/b400f', BOARD[:3], FLOP),
+    ('b200c/kk/b400f', BOARD[:4], TURN),
+])
+def test_final_street_does_not_depend_on_the_action_format(action, board, street):
+    row = hand_row(_record(action, board), 'session', 'simple')
+    assert row[3] == street
+
+
+@pytest.fixture
+def database(tmp_path):
+    with HandDatabase(tmp_path / 'hands.db') as db:
+        yield db
+
+
+def test_ev_by_preflop_class_uses_a_covering_index(database):
+    sql = 'SELECT preflop_class, COUNT(*), AVG(winnings) FROM hands GROUP BY preflop_class'
+    plan = ' '.join(row[3] for row in database.query('EXPLAIN QUERY PLAN ' + sql))
+    assert 'COVERING INDEX' in plan
+
+
+def test_ev_by_preflop_class(database):
+    database.insert_hands([
+        hand_row(_record('b200f', [], -100), 's1', 'simple'),
+        hand_row(_record('b20000c', BOARD, 20000), 's1', 'simple'),
+        hand_row(_record('b200c/kk/kk/kk', BOARD, 200), 's2', 'resolve'),
+    ])
+    assert database.ev_by_preflop_class() == [('AA', 3, pytest.approx(20100 / 3))]
+    assert database.ev_by_preflop_class('resolve') == [('AA', 1, 200.0)]
+    assert database.spot_results(min_street=RIVER) == (2, 10100.0)
@@ -0,0 +1,46 @@
+# tests/test_hand_eval.py
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from utils.cards import evaluate, parse_cards
+from utils.hand_eval import evaluate_many
+
+# 役の種類ごとの境界になりやすい手
+SPECIAL_HANDS = [
+    'Ah 2h 3h 4h 5h Kd Kc',     # A-5 のストレートフラッシュ
+    'Ts Js Qs Ks As 9s 8s',     # 7枚とも同じスート
+    'Ah 2d 3c 4s 5h 9d Td',     # ホイール
+    '2h 3h 4h 5h 7h 6d 8c',     # フラッシュとストレートが別
+    'Kh Kd Kc 7s 7h 7d 2c',     # スリーカード2組
+    'Qh Qd 9c 9s 4h 4d Ac',     # ツーペア3組
+    '8h 8d 8c 8s Kh Kd Kc',     # クワッズとスリーカード
+    '8h 8d 8c 8s 2h 3d 4c',
+    '5h 5d Tc Ts Ah',
+    '2c 3d 4h 5s 7c 8d 9h',
+]
+
+
+def _random_hands(rng: np.random.Generator, count: int, size: int) -> np.ndarray:
+    return np.array([rng.choice(52, size, replace=False) for _ in range(count)])
+
+
+@pytest.mark.parametrize('size', [5, 6, 7])
+def test_evaluate_many_matches_evaluate(size):
+    hands = _random_hands(np.random.default_rng(size), 3000, size)
+    expected = [evaluate(hand.tolist()) for hand in hands]
+    assert evaluate_many(hands).tolist() == expected
+
+
+@pytest.mark.parametrize('hand', SPECIAL_HANDS)
+def test_special_hands(hand):
+    cards = parse_cards(hand.split())
+    assert evaluate_many(np.array([cards])).tolist() == [evaluate(cards)]
+
+
+@pytest.mark.parametrize('hand', SPECIAL_HANDS)
+def test_evaluate_is_best_five_cards(hand):
+    cards = parse_cards(hand.split())
+    assert evaluate(cards) == max(evaluate(list(five)) for five in combinations(cards, 5))
@@ -0,0 +1,69 @@
+# tests/test_legal_actions.py
+
+import random
+
+import pytest
+
+from sample.slumbot_api import ParseAction
+from strategy.legal_actions import LegalActions
+
+
+def _accepted(action: str) -> bool:
+    info = ParseAction(action)
+    return isinstance(info, dict) and 'error' not in info
+
+
+def _reachable_actions(count: int, seed: int = 0):
+    """LegalActions が選んだアクションだけで進めたハンド途中のアクション列"""
+    rng = random.Random(seed)
+    actions = []
+    while len(actions) < count:
+        action = ''
+        while True:
+            legal = LegalActions.from_action(action)
+            if legal is None:
+                break
+            actions.append(action)
+            choices = [legal.check_or_call(), legal.pot_bet(rng.choice((0.33, 0.75, 1.5))),
+                       legal.bet(legal.min_bet_to), legal.all_in()]
+            incr = rng.choice(choices)
+            after = action + incr
+            info = ParseAction(after)
+            if info['st'] > ParseAction(action)['st'] and info['pos'] != -1:
+                after += '/'
+            action = after
+    return actions
+
+
+@pytest.mark.parametrize('action', _reachable_actions(300))
+def test_bet_bounds_match_parse_action(action):
+    legal = LegalActions.from_action(action)
+    if not legal.can_bet:
+        return
+    assert _accepted(action + f'b{legal.min_bet_to}')
+    assert _accepted(action + f'b{legal.max_bet_to}')
+    assert not _accepted(action + f'b{legal.max_bet_to + 1}')
+    if legal.min_bet_to < legal.max_bet_to:
+        assert not _accepted(action + f'b{legal.min_bet_to - 1}')
+
+
+@pytest.mark.parametrize('action', _reachable_actions(300, seed=1))
+def test_check_fold_call_match_parse_action(action):
+    legal = LegalActions.from_action(action)
+    assert _accepted(action + 'k') == legal.can_check
+    assert _accepted(action + 'c') == legal.can_call
+    assert _accepted(action + legal.check_or_call())
+    if legal.can_fold:
+        assert _accepted(action + 'f')
+
+
+@pytest.mark.parametrize('action', _reachable_actions(100, seed=2))
+def test_sanitize_returns_accepted_actions(action):
+    legal = LegalActions.from_action(action)
+    for incr in ('f', 'k', 'c', 'b0', 'b1', 'b99999', f'b{legal.street_bet_to + 1}', 'x'):
+        assert _accepted(action + legal.sanitize(incr))
+
+
+def test_finished_or_invalid_actions_have_no_legal_set():
+    assert LegalActions.from_action('f') is None
+    assert LegalActions.from_action('b200k') is None
@@ -0,0 +1,81 @@
+# tests/test_protocol.py
+
+import json
+import socket
+import struct
+import threading
+
+import pytest
+
+from distributed.protocol import MAX_MESSAGE_SIZE, parse_address, recv_message, send_message
+
+
+@pytest.fixture
+def pair():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+
+def test_messages_round_trip_in_order(pair):
+    left, right = pair
+    messages = [
+        {'type': 'hello', 'worker': 'w1'},
+        {'type': 'results', 'job_id': 3, 'winnings': [100, -50, 0]},
+        {'type': 'job', 'job_id': 4, 'hands': 10, 'strategy': 'simple', 'strategy_options': {}},
+        {'type': 'done'},
+    ]
+    for message in messages:
+        send_message(left, message)
+    assert [recv_message(right) for _ in messages] == messages
+
+
+def test_message_split_across_reads(pair):
+    left, right = pair
+    message = {'type': 'results', 'job_id': 1, 'winnings': list(range(-500, 500))}
+    data = json.dumps(message).encode('utf-8')
+    frame = struct.pack('>I', len(data)) + data
+
+    def send_slowly():
+        for i in range(0, len(frame), 7):
+            left.sendall(frame[i:i + 7])
+
+    sender = threading.Thread(target=send_slowly)
+    sender.start()
+    assert recv_message(right) == message
+    sender.join()
+
+
+def test_large_message(pair):
+    left, right = pair
+    message = {'type': 'results', 'job_id': 2, 'winnings': [12345] * 200000}
+    sender = threading.Thread(target=send_message, args=(left, message))
+    sender.start()
+    assert recv_message(right) == message
+    sender.join()
+
+
+def test_closed_connection_returns_none(pair):
+    left, right = pair
+    left.close()
+    assert recv_message(right) is None
+
+
+def test_truncated_message_returns_none(pair):
+    left, right = pair
+    left.sendall(struct.pack('>I', 100) + b'{"type":')
+    left.close()
+    assert recv_message(right) is None
+
+
+def test_oversized_header_is_rejected(pair):
+    left, right = pair
+    left.sendall(struct.pack('>I', MAX_MESSAGE_SIZE + 1))
+    with pytest.raises(ValueError):
+        recv_message(right)
+
+
+def test_parse_address():
+    assert parse_address('example.com:7000') == ('example.com', 7000)
+    assert parse_address(':7000') == ('localhost', 7000)
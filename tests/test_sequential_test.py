@@ -0,0 +1,92 @@
+# tests/test_sequential_test.py
+
+import math
+
+import numpy as np
+import pytest
+
+from analysis.sequential_test import ConfidenceSequence
+from sample.slumbot_api import BIG_BLIND
+
+# 1ハンドの収支の標準偏差（チップ）。実際のセッションと同程度
+HAND_SD = 5000
+
+
+def _poker_like(rng: np.random.Generator, size: int) -> np.ndarray:
+    """小さな損益が多く、まれにスタック全体が動く平均 0 の収支"""
+    values = np.array([-100, 100, -300, 300, -2000, 2000, -20000, 20000])
+    probs = np.array([0.3, 0.3, 0.15, 0.15, 0.0475, 0.0475, 0.0025, 0.0025])
+    return rng.choice(values, size=size, p=probs / probs.sum())
+
+
+@pytest.mark.parametrize('sample', ['normal', 'poker_like'])
+def test_coverage_holds_at_every_check(sample):
+    rng = np.random.default_rng(1)
+    alpha, runs, hands, true_mean = 0.05, 200, 5000, 0.0
+    failures = 0
+    for _ in range(runs):
+        if sample == 'normal':
+            data = rng.normal(true_mean, HAND_SD, hands)
+        else:
+            data = _poker_like(rng, hands)
+        sequence = ConfidenceSequence(alpha=alpha, planned_hands=hands, min_hands=500)
+        for count, value in enumerate(data.tolist(), 1):
+            sequence.update(value)
+            if count >= 500 and count % 100 == 0:
+                lower, upper = sequence.interval()
+                if not lower <= true_mean * 100 / BIG_BLIND <= upper:
+                    failures += 1
+                    break
+    # 全ての確認時点で同時に成り立つので、外れる割合は alpha 以下になるはず
+    assert failures / runs <= alpha + 0.03
+
+
+def test_radius_close_to_fixed_sample_interval_at_planned_hands():
+    rng = np.random.default_rng(2)
+    sequence = ConfidenceSequence(planned_hands=10000, min_hands=1000)
+    for value in rng.normal(0, HAND_SD, 10000).tolist():
+        sequence.update(value)
+    lower, upper = sequence.interval()
+    fixed = 1.96 * math.sqrt(sequence.variance / sequence.hands)
+    # 常に有効な区間の分だけ広いが、rho を分散で調整していれば数倍にはならない
+    assert fixed < (upper - lower) / 2 < 2 * fixed
+
+
+def test_radius_scales_with_the_data():
+    rng = np.random.default_rng(3)
+    data = rng.normal(10, HAND_SD, 3000).tolist()
+    small = ConfidenceSequence(planned_hands=3000, min_hands=500)
+    large = ConfidenceSequence(planned_hands=3000, min_hands=500)
+    for value in data:
+        small.update(value)
+        large.update(value * 10)
+    small_lower, small_upper = small.interval()
+    large_lower, large_upper = large.interval()
+    assert large_upper - large_lower == pytest.approx(10 * (small_upper - small_lower))
+
+
+def test_radius_shrinks_and_pilot_variance_is_fixed():
+    rng = np.random.default_rng(4)
+    sequence = ConfidenceSequence(planned_hands=5000, min_hands=500)
+    widths = []
+    for count, value in enumerate(rng.normal(0, HAND_SD, 5000).tolist(), 1):
+        sequence.update(value)
+        if count == 500:
+            pilot = sequence.pilot_variance
+        if count % 1000 == 0:
+            lower, upper = sequence.interval()
+            widths.append(upper - lower)
+    assert sequence.pilot_variance == pilot
+    assert widths == sorted(widths, reverse=True)
+
+
+def test_no_decision_before_min_hands():
+    early = ConfidenceSequence(min_hands=200)
+    ready = ConfidenceSequence(min_hands=100)
+    assert ready.interval() is None
+    for _ in range(50):
+        for value in (1000, 1100):
+            early.update(value)
+            ready.update(value)
+    assert ready.is_conclusive()
+    assert not early.is_conclusive()
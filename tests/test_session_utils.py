@@ -0,0 +1,73 @@
+# tests/test_session_utils.py
+
+import pytest
+
+import utils.session_utils as session_utils
+from sample.slumbot_api import RequestTimeout, ServerError, SetTransport
+from utils.session_utils import act_with_reconciliation, increment_applied
+
+
+class ScriptedServer:
+    """呼ばれた順に responses の要素を返す（例外は送出する）"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.incrs = []
+
+    def __call__(self, endpoint, data):
+        self.incrs.append(data.get('incr'))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture(autouse=True)
+def reset_probe():
+    session_utils._state_probe_supported = None
+    yield
+    session_utils._state_probe_supported = None
+    SetTransport(None)
+
+
+def _timeout():
+    return RequestTimeout('read timed out', sent=True, endpoint='act')
+
+
+def test_applied_action_is_not_resent():
+    server = ScriptedServer([_timeout(), (200, {'action': 'b200c/k', 'token': 't'})])
+    SetTransport(server)
+    state = act_with_reconciliation('t', 'b200c/', 'k')
+    assert state['action'] == 'b200c/k'
+    assert server.incrs == ['k', '']
+
+
+def test_unapplied_action_is_resent():
+    server = ScriptedServer([_timeout(), (200, {'action': 'b200c/', 'token': 't'}),
+                             (200, {'action': 'b200c/k', 'token': 't'})])
+    SetTransport(server)
+    assert act_with_reconciliation('t', 'b200c/', 'k')['action'] == 'b200c/k'
+    assert server.incrs == ['k', '', 'k']
+
+
+def test_hand_over_does_not_disable_the_probe():
+    server = ScriptedServer([_timeout(), (400, {'error_msg': 'Hand is over'})])
+    SetTransport(server)
+    with pytest.raises(ServerError):
+        act_with_reconciliation('t', 'b200c/kb400', 'c')
+    assert server.incrs == ['c', '']
+    assert session_utils._state_probe_supported is not False
+
+
+def test_rejected_empty_increment_disables_the_probe():
+    server = ScriptedServer([_timeout(), (400, {'error_msg': 'Missing incr'})])
+    SetTransport(server)
+    with pytest.raises(RequestTimeout):
+        act_with_reconciliation('t', 'b200c/', 'k')
+    assert session_utils._state_probe_supported is False
+
+
+def test_increment_applied():
+    assert increment_applied('b200c/', 'k', 'b200c/') is False
+    assert increment_applied('b200c/', 'k', 'b200c/kb400') is True
+    assert increment_applied('b200c/', 'b300', 'b200c/b3000') is None
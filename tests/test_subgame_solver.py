@@ -0,0 +1,49 @@
+# tests/test_subgame_solver.py
+
+import random
+
+from strategy.subgame_solver import (
+    MIN_ROOT_VISITS_FLOOR, SubgameNode, SubgameSolver, _MCCFR, strength_bucket, uniform_range
+)
+from utils.cards import parse_cards
+
+BOARD = parse_cards(['Ks', '8c', '3d', '2h'])
+
+
+def test_strength_buckets():
+    assert strength_bucket(parse_cards(['Ah', 'Qd']), BOARD) == 0
+    assert strength_bucket(parse_cards(['8h', '7d']), BOARD) == 1
+    assert strength_bucket(parse_cards(['Ah', 'Kd']), BOARD) == 2
+    assert strength_bucket(parse_cards(['Kh', '8d']), BOARD) == 3
+    assert strength_bucket(parse_cards(['3h', '3s']), BOARD) == 4
+    assert strength_bucket(parse_cards(['Th', 'Jd']), parse_cards(['9s', '8c', '7d'])) == 5
+    # ボードのペアだけでは役なしと同じ
+    assert strength_bucket(parse_cards(['Ah', 'Qd']), parse_cards(['Ks', 'Kc', '3d'])) == 0
+
+
+def test_opponent_information_sets_do_not_depend_on_our_hand():
+    """相手の情報集合は自分の手札によらない（相手から自分の手札が見えない）"""
+    hole = parse_cards(['Ah', 'Kd'])
+    root = SubgameNode.from_action('b200c/kk/')
+    solver = _MCCFR(root, 0, hole, BOARD, uniform_range(hole + BOARD), random.Random(1))
+    assert solver._sample_deal(tuple(sorted(hole)))
+    opponent_node = root.child('k')
+    opponent_key = solver._info_key(opponent_node)
+    our_key = solver._info_key(root)
+
+    solver._hero_hand = tuple(sorted(parse_cards(['7s', '6s'])))
+    assert solver._info_key(opponent_node) == opponent_key
+    assert solver._info_key(root) != our_key
+
+
+def test_threshold_follows_the_measured_speed():
+    solver = SubgameSolver(workers=0, seed=0, min_root_visits=300)
+    assert solver.root_visit_threshold(0.2) == MIN_ROOT_VISITS_FLOOR
+    hole = parse_cards(['Ah', 'Kd'])
+    policy = solver.solve('b200c/kk/', 0, hole, BOARD, uniform_range(hole + BOARD), 0.2)
+    assert policy is not None
+    assert abs(sum(policy.values()) - 1) < 1e-9
+    expected = solver.visit_rate * 0.2 * (1 - solver.overhead_ratio)
+    assert solver.root_visit_threshold(0.2) == min(300, max(int(expected / 2), MIN_ROOT_VISITS_FLOOR))
+    solver.visit_rate = 1e6
+    assert solver.root_visit_threshold(0.2) == 300
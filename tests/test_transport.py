@@ -0,0 +1,120 @@
+# tests/test_transport.py
+
+import json
+
+import pytest
+
+import sample.slumbot_api as slumbot_api
+from api.transport import RecordingTransport, ReplayTransport
+from sample.slumbot_api import Act, IllegalActionError, NewHand, RequestTimeout, SetTransport, TransportError
+
+
+class FakeServer:
+    """記録する側の通信先。呼ばれた順に responses の要素を返す（例外は送出する）"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, endpoint, data):
+        self.requests.append((endpoint, dict(data)))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+RESPONSES = [
+    (200, {'token': 't1', 'action': '', 'client_pos': 0, 'hole_cards': ['Ac', 'Kd'], 'board': []}),
+    RequestTimeout('read timed out', sent=True, endpoint='act'),
+    (200, {'token': 't1', 'action': 'b200c/', 'client_pos': 0, 'hole_cards': ['Ac', 'Kd'],
+           'board': ['2c', '7d', 'Th']}),
+    (400, {'error_msg': 'Illegal action'}),
+    TransportError('connection reset', endpoint='act'),
+]
+
+
+def _exchange():
+    """RESPONSES に対応する一連のリクエストを送り、結果（または例外の種類）を返す"""
+    results = []
+    calls = [
+        lambda: NewHand(None),
+        lambda: Act('t1', 'c'),
+        lambda: Act('t1', 'c'),
+        lambda: Act('t1', 'b1'),
+        lambda: Act('t1', 'k'),
+    ]
+    for call in calls:
+        try:
+            results.append(call())
+        except TransportError as e:
+            results.append((type(e).__name__, getattr(e, 'sent', None)))
+        except IllegalActionError as e:
+            results.append((type(e).__name__, e.status_code))
+    return results
+
+
+@pytest.fixture(autouse=True)
+def restore_transport():
+    yield
+    SetTransport(None)
+
+
+def test_replay_returns_what_was_recorded(tmp_path):
+    cassette = tmp_path / 'cassette.jsonl'
+    recorder = RecordingTransport(cassette, post=FakeServer(RESPONSES))
+    SetTransport(recorder)
+    recorded = _exchange()
+    recorder.close()
+
+    replay = ReplayTransport(cassette, strict=True)
+    SetTransport(replay)
+    assert _exchange() == recorded
+    assert recorded[1] == ('RequestTimeout', True)
+    assert recorded[3] == ('IllegalActionError', 400)
+    assert recorded[4] == ('TransportError', None)
+    assert replay.requests == len(RESPONSES)
+    assert replay.mismatches == 0
+
+
+def test_password_is_not_recorded(tmp_path):
+    cassette = tmp_path / 'cassette.jsonl'
+    recorder = RecordingTransport(cassette, post=FakeServer([(200, {'token': 't'})]))
+    recorder('login', {'username': 'user', 'password': 'secret'})
+    recorder.close()
+    entry = json.loads(cassette.read_text(encoding='utf-8'))
+    assert entry['request'] == {'username': 'user', 'password': '***'}
+    assert 'secret' not in cassette.read_text(encoding='utf-8')
+
+
+def test_replay_mismatch_and_exhaustion(tmp_path):
+    cassette = tmp_path / 'cassette.jsonl'
+    recorder = RecordingTransport(cassette, post=FakeServer(RESPONSES[:1]))
+    SetTransport(recorder)
+    NewHand(None)
+    recorder.close()
+
+    lenient = ReplayTransport(cassette)
+    assert lenient('act', {'token': 't1', 'incr': 'c'})[0] == 200
+    assert lenient.mismatches == 1
+    with pytest.raises(TransportError):
+        lenient('new_hand', {})
+
+    with pytest.raises(TransportError):
+        ReplayTransport(cassette, strict=True)('act', {'token': 't1', 'incr': 'c'})
+
+    looped = ReplayTransport(cassette, loop=True)
+    assert [looped('new_hand', {})[1]['token'] for _ in range(3)] == ['t1'] * 3
+
+
+def test_empty_cassette_is_rejected(tmp_path):
+    cassette = tmp_path / 'empty.jsonl'
+    cassette.write_text('', encoding='utf-8')
+    with pytest.raises(ValueError):
+        ReplayTransport(cassette)
+
+
+def test_set_transport_none_restores_http_post():
+    SetTransport(FakeServer([]))
+    SetTransport(None)
+    assert slumbot_api.transport is slumbot_api.HttpPost
@@ -0,0 +1,67 @@
+# tests/test_variance_reduction.py
+
+from itertools import combinations
+
+import pytest
+
+from analysis.variance_reduction import VarianceReducedEstimator
+from utils.cards import evaluate, parse_cards
+
+BOARD = ['2c', '7d', 'Th', 'Ks', '3h']
+
+
+def _hand(action, winnings, hero=('Ah', 'Ad'), bot=('Kc', 'Kd'), board=BOARD):
+    return {
+        'action': action, 'winnings': winnings, 'hole_cards': list(hero),
+        'bot_hole_cards': list(bot) if bot else None, 'board': list(board),
+    }
+
+
+def _exact_equity(hero, bot, board):
+    hero, bot, board = parse_cards(list(hero)), parse_cards(list(bot)), parse_cards(list(board))
+    remaining = [c for c in range(52) if c not in hero + bot + board]
+    total = 0.0
+    runouts = list(combinations(remaining, 5 - len(board)))
+    for runout in runouts:
+        full = board + list(runout)
+        ours, theirs = evaluate(hero + full), evaluate(bot + full)
+        total += 1.0 if ours > theirs else 0.5 if ours == theirs else 0.0
+    return total / len(runouts)
+
+
+@pytest.mark.parametrize('actions', [('b20000c', 'b20000c///'), ('b200b20000c', 'b200b20000c///')])
+def test_preflop_all_in_is_the_same_in_both_formats(actions):
+    estimator = VarianceReducedEstimator(samples=20000, seed=0)
+    adjusted = [estimator.adjusted_winnings(_hand(action, 20000)) for action in actions]
+    # AA 対 KK はおよそ 82%
+    for value in adjusted:
+        assert value == pytest.approx(40000 * 0.82 - 20000, abs=800)
+    assert adjusted[0] == pytest.approx(adjusted[1], abs=800)
+
+
+@pytest.mark.parametrize('action', ['b200c/b19800c', 'b200c/b19800c//', 'b200c/kb19800c', 'b200c/kb19800c//'])
+def test_flop_all_in_uses_equity_on_the_flop(action):
+    estimator = VarianceReducedEstimator(seed=0)
+    hero, bot = ('Ah', 'Kh'), ('Qc', 'Qd')
+    hand = _hand(action, -20000, hero, bot)
+    equity = _exact_equity(hero, bot, BOARD[:3])
+    # 残りの中間項はフロップが配られた分（ポット 400）だけ
+    flop_term = estimator.chance_correction(dict(hand, action='b200c', winnings=0))
+    adjusted = estimator.adjusted_winnings(hand)
+    assert abs(flop_term) <= 400
+    assert adjusted == pytest.approx(40000 * equity - 20000 - flop_term, abs=400 * 0.2)
+
+
+def test_all_in_against_hidden_cards_uses_a_random_hand():
+    estimator = VarianceReducedEstimator(samples=20000, seed=0)
+    adjusted = estimator.adjusted_winnings(_hand('b20000c', -20000, bot=None))
+    # AA は無作為な手に対しておよそ 85%
+    assert adjusted == pytest.approx(40000 * 0.85 - 20000, abs=800)
+
+
+def test_hands_without_all_in_keep_the_street_terms():
+    estimator = VarianceReducedEstimator(seed=0)
+    hand = _hand('b200c/kk/kk/kk', 200)
+    assert estimator.chance_correction(hand) != 0.0
+    folded = _hand('b200f', -100, board=[])
+    assert estimator.chance_correction(folded) == 0.0
@@ -0,0 +1,51 @@
+# tests/test_worker.py
+
+import logging
+
+from distributed.worker import Worker
+
+
+def _local(strategy):
+    # ワーカー自身のコマンドラインから作られるオプションの代わり
+    if strategy == 'resolve':
+        return {'policy_file': '/srv/policy.bin', 'workers': 2, 'time_budget': 2.0,
+                'min_root_visits': 300}
+    return {}
+
+
+def test_coordinator_cannot_set_paths_or_workers(caplog):
+    worker = Worker(('127.0.0.1', 0), local_strategy_options=_local)
+    job = {'job_id': 1, 'hands': 10, 'strategy': 'resolve', 'strategy_options': {
+        'policy_file': '/etc/passwd', 'workers': 512, 'state_file': '/tmp/overwrite',
+        'time_budget': 0.5, 'min_root_visits': 100,
+    }}
+
+    with caplog.at_level(logging.WARNING):
+        options = worker._strategy_options(job)
+
+    assert options == {'policy_file': '/srv/policy.bin', 'workers': 2, 'time_budget': 0.5,
+                       'min_root_visits': 100}
+    # ワーカー側にない state_file だけを警告する
+    assert [r.getMessage() for r in caplog.records] == [
+        'Ignoring strategy option from coordinator: state_file'
+    ]
+
+
+def test_coordinator_options_must_have_the_expected_type():
+    worker = Worker(('127.0.0.1', 0), local_strategy_options=_local)
+    job = {'job_id': 1, 'hands': 10, 'strategy': 'resolve', 'strategy_options': {
+        'time_budget': '1e9', 'min_root_visits': True,
+    }}
+
+    options = worker._strategy_options(job)
+
+    assert options['time_budget'] == 2.0
+    assert options['min_root_visits'] == 300
+
+
+def test_missing_or_malformed_options_use_local_config():
+    worker = Worker(('127.0.0.1', 0))
+    assert worker._strategy_options({'job_id': 1, 'hands': 10, 'strategy': 'simple'}) == {}
+    assert worker._strategy_options(
+        {'job_id': 1, 'hands': 10, 'strategy': 'simple', 'strategy_options': ['x']}
+    ) == {}